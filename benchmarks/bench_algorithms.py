@@ -0,0 +1,59 @@
+"""
+Compare the math engines against the original one-step-at-a-time loops.
+
+Run from the project root:
+
+    python -m benchmarks.bench_algorithms
+"""
+
+import time
+from typing import Callable
+
+from src.algorithms.factorial import factorial
+from src.algorithms.fibonacci import fibonacci
+
+
+def _fib_loop(n: int) -> int:
+    a, b = 0, 1
+    for _ in range(n):
+        a, b = b, a + b
+    return a
+
+
+def _fact_loop(n: int) -> int:
+    result = 1
+    for i in range(2, n + 1):
+        result *= i
+    return result
+
+
+def _best_of(fn: Callable[[int], int], n: int, repeat: int = 3) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(n)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+CASES = [
+    ("fib", _fib_loop, fibonacci, [10_000, 100_000, 300_000]),
+    ("factorial", _fact_loop, factorial, [10_000, 50_000, 100_000]),
+]
+
+
+def main() -> None:
+    print(f"{'op':<10}{'n':>10}{'loop (s)':>12}{'engine (s)':>12}{'speed-up':>10}")
+    for name, loop_fn, engine_fn, sizes in CASES:
+        for n in sizes:
+            assert loop_fn(n) == engine_fn(n)
+            loop_t = _best_of(loop_fn, n)
+            engine_t = _best_of(engine_fn, n)
+            print(
+                f"{name:<10}{n:>10}{loop_t:>12.4f}{engine_t:>12.4f}"
+                f"{loop_t / engine_t:>9.1f}x"
+            )
+
+
+if __name__ == "__main__":
+    main()
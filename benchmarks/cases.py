@@ -0,0 +1,152 @@
+"""
+Benchmark definitions: raw engines, the cache codec, the service layer
+(cold and warm cache) and the HTTP path through the Flask test client.
+"""
+
+from typing import Callable
+from typing import List
+from typing import Optional
+
+from src.algorithms.factorial import factorial
+from src.algorithms.fibonacci import fibonacci
+from src.algorithms.formatting import to_decimal
+from src.algorithms.modular import fact_mod
+from src.algorithms.modular import fib_mod
+from src.algorithms.modular import pow_mod
+from src.algorithms.power import power
+from src.utils.codec import IntCodec
+
+P = 1_000_000_007
+
+
+class Benchmark:
+    """
+    One timed operation. ``setup`` runs before every call and is not
+    timed (use it to empty caches); benchmarks with a setup are timed one
+    call at a time, others are calibrated to ``min_time`` per round.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        fn: Callable[[], object],
+        setup: Optional[Callable[[], None]] = None,
+    ):
+        self.name = name
+        self.fn = fn
+        self.setup = setup
+
+
+def _sizes(quick: bool, full: List[int], short: List[int]) -> List[int]:
+    return short if quick else full
+
+
+def algorithm_cases(quick: bool) -> List[Benchmark]:
+    cases = []
+    for n in _sizes(quick, [1_000, 100_000, 1_000_000], [1_000, 100_000]):
+        cases.append(Benchmark(f"algo.fib[{n}]", lambda n=n: fibonacci(n)))
+    for n in _sizes(quick, [1_000, 10_000, 100_000], [1_000, 10_000]):
+        cases.append(Benchmark(f"algo.factorial[{n}]", lambda n=n: factorial(n)))
+    for e in _sizes(quick, [1_000, 100_000, 1_000_000], [1_000, 100_000]):
+        cases.append(Benchmark(f"algo.pow[3^{e}]", lambda e=e: power(3, e)))
+    for n in _sizes(quick, [10**6, 10**18], [10**18]):
+        cases.append(Benchmark(f"algo.fib_mod[{n}]", lambda n=n: fib_mod(n, P)))
+        cases.append(Benchmark(f"algo.pow_mod[{n}]", lambda n=n: pow_mod(3, n, P)))
+    for n in _sizes(quick, [10**5, 10**7], [10**5]):
+        cases.append(Benchmark(f"algo.fact_mod[{n}]", lambda n=n: fact_mod(n, P)))
+    for bits in _sizes(quick, [10_000, 1_000_000], [10_000]):
+        value = 3 ** int(bits / 1.585)
+        cases.append(
+            Benchmark(f"algo.to_decimal[{bits}b]", lambda v=value: to_decimal(v))
+        )
+    return cases
+
+
+def codec_cases(quick: bool) -> List[Benchmark]:
+    codec = IntCodec()
+    cases = []
+    for bits in _sizes(quick, [1_000, 100_000, 1_000_000], [1_000, 100_000]):
+        value = factorial(bits // 8)  # many trailing zero bits, like real results
+        blob = codec.encode(value)
+        cases.append(
+            Benchmark(f"codec.encode[{bits}b]", lambda v=value: codec.encode(v))
+        )
+        cases.append(
+            Benchmark(f"codec.decode[{bits}b]", lambda b=blob: codec.decode(b))
+        )
+    return cases
+
+
+def service_cases(quick: bool, redis) -> List[Benchmark]:
+    from src.services import fact_service
+    from src.services import fib_service
+    from src.services import pow_service
+    from .standins import clear_cache
+
+    calls = [
+        ("fib", [1_000, 100_000] if quick else [1_000, 100_000, 1_000_000]),
+        ("factorial", [1_000, 10_000] if quick else [1_000, 10_000, 50_000]),
+        ("pow", [1_000, 100_000] if quick else [1_000, 100_000, 1_000_000]),
+    ]
+    services = {
+        "fib": fib_service,
+        "factorial": fact_service,
+        "pow": lambda n: pow_service(3, n),
+    }
+    cases = []
+    for op, sizes in calls:
+        fn = services[op]
+        for n in sizes:
+            cases.append(
+                Benchmark(
+                    f"service.{op}.cold[{n}]",
+                    lambda fn=fn, n=n: fn(n),
+                    setup=lambda: clear_cache(redis),
+                )
+            )
+            cases.append(Benchmark(f"service.{op}.warm[{n}]", lambda fn=fn, n=n: fn(n)))
+    return cases
+
+
+def http_cases(quick: bool) -> List[Benchmark]:
+    from flask_jwt_extended import create_access_token
+    from src.app import create_app
+
+    app = create_app()
+    with app.app_context():
+        token = create_access_token(identity="bench")
+    client = app.test_client()
+    client.environ_base["HTTP_AUTHORIZATION"] = f"Bearer {token}"
+    batch = {"items": [{"op": "fib", "args": {"n": n}} for n in range(100)]}
+
+    def get(url: str) -> Callable[[], object]:
+        def call():
+            rv = client.get(url)
+            assert rv.status_code == 200, rv.data
+            return rv
+
+        return call
+
+    def post_batch():
+        rv = client.post("/api/math/batch", json=batch)
+        assert rv.status_code == 200, rv.data
+        return rv
+
+    cases = [
+        Benchmark("http.pow[2^8]", get("/api/math/pow?base=2&exp=8")),
+        Benchmark("http.fib[1000]", get("/api/math/fib?n=1000")),
+        Benchmark(
+            "http.fib.summary[100000]", get("/api/math/fib?n=100000&format=summary")
+        ),
+        Benchmark("http.batch[100]", post_batch),
+    ]
+    if not quick:
+        cases.append(
+            Benchmark("http.factorial[20000]", get("/api/math/factorial?n=20000"))
+        )
+        cases.append(
+            Benchmark(
+                "http.fib.range[0..1000]", get("/api/math/fib/range?start=0&end=1000")
+            )
+        )
+    return cases
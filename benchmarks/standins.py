@@ -0,0 +1,77 @@
+"""
+In-process stand-ins for Redis, Kafka and the request-log database, so the
+service layer and the HTTP path can be benchmarked without a network.
+"""
+
+import atexit
+import os
+import shutil
+import tempfile
+from typing import Any
+from typing import Dict
+from typing import List
+from typing import Optional
+from typing import Tuple
+
+from src import services
+from src.config import Config
+from src.utils.log_writer import BatchLogWriter
+
+
+class DictRedis:
+    """Implements the RedisCache methods TieredCache and SingleFlight use."""
+
+    def __init__(self):
+        self.data: Dict[str, Any] = {}
+
+    def get(self, key: str) -> Optional[Any]:
+        return self.data.get(key)
+
+    def set(self, key: str, value: Any, ex: Optional[int] = None) -> None:
+        self.data[key] = value
+
+    def get_many(self, keys: List[str]) -> List[Optional[Any]]:
+        return [self.data.get(k) for k in keys]
+
+    def set_many(self, items: List[Tuple[str, Any, Optional[int]]]) -> None:
+        for key, value, _ in items:
+            self.data[key] = value
+
+    def acquire_lease(self, key: str, token: str, ttl_ms: int) -> Optional[bool]:
+        return self.data.setdefault(f"lease:{key}", token) == token
+
+    def release_lease(self, key: str, token: str) -> None:
+        if self.data.get(f"lease:{key}") == token:
+            del self.data[f"lease:{key}"]
+
+
+class NullKafka:
+    """Accepts and discards messages, like a producer with no brokers."""
+
+    def send(self, topic: str, value: dict) -> None:
+        pass
+
+    def close(self, timeout: Optional[float] = None) -> None:
+        pass
+
+
+def install() -> DictRedis:
+    """
+    Point the service layer at the stand-ins (and away from any result
+    table and the real SQLite file); returns the fake Redis.
+    """
+    redis = DictRedis()
+    services.cache.l2 = redis
+    services.kafka = NullKafka()  # type: ignore[assignment]
+    services.tables = None
+    services._log_writer = BatchLogWriter(lambda rows: None, max_queue=100_000)
+    tmp = tempfile.mkdtemp(prefix="bench-")
+    atexit.register(shutil.rmtree, tmp, True)
+    Config.SQLALCHEMY_DATABASE_URI = f"sqlite:///{os.path.join(tmp, 'requests.db')}"
+    return redis
+
+
+def clear_cache(redis: DictRedis) -> None:
+    """Empty both cache tiers."""
+    services.cache.l1.clear()
+    redis.data.clear()
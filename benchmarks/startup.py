@@ -0,0 +1,113 @@
+"""
+Cold-start benchmark: wall time of fresh interpreters doing common
+startup work, each checked against a target.
+
+    python -m benchmarks.startup [--rounds 7] [--json]
+
+Times are medians over ``rounds`` subprocess runs, reported as overhead
+on top of a bare ``python -c pass`` so targets hold across machines.
+Exits with status 1 if any case misses its target.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from typing import Dict
+from typing import List
+from typing import NamedTuple
+from typing import Optional
+from typing import Sequence
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class StartupCase(NamedTuple):
+    name: str
+    argv: Sequence[str]  # interpreter arguments
+    target: Optional[float]  # max seconds above the bare interpreter
+
+
+CASES = [
+    StartupCase("python", ["-c", "pass"], None),
+    # Math commands must not import Flask, SQLAlchemy, Redis or Kafka
+    StartupCase("cli.fib", ["-m", "src.cli", "fib", "10"], 0.15),
+    StartupCase("cli.help", ["-m", "src.cli", "--help"], 0.15),
+    # The web stack is dominated by third-party imports; these guard regressions
+    StartupCase("import.app", ["-c", "import src.app"], 2.0),
+    StartupCase(
+        "create_app", ["-c", "from src.app import create_app; create_app()"], 2.5
+    ),
+]
+
+
+def time_command(argv: Sequence[str], rounds: int) -> List[float]:
+    """Wall-clock seconds of ``rounds`` fresh ``python <argv>`` runs."""
+    times = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        subprocess.run(
+            [sys.executable, *argv],
+            cwd=ROOT,
+            check=True,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        times.append(time.perf_counter() - start)
+    return times
+
+
+def evaluate(medians: Dict[str, float], cases: Sequence[StartupCase]) -> List[dict]:
+    """Rows of {name, median, overhead, target, status} against the "python" case."""
+    bare = medians.get("python", 0.0)
+    rows = []
+    for case in cases:
+        overhead = max(0.0, medians[case.name] - bare)
+        if case.target is None:
+            status = "-"
+        else:
+            status = "ok" if overhead <= case.target else "missed"
+        rows.append(
+            {
+                "name": case.name,
+                "median": medians[case.name],
+                "overhead": overhead,
+                "target": case.target,
+                "status": status,
+            }
+        )
+    return rows
+
+
+def run(rounds: int = 7, cases: Sequence[StartupCase] = CASES) -> List[dict]:
+    medians = {
+        case.name: statistics.median(time_command(case.argv, rounds)) for case in cases
+    }
+    return evaluate(medians, cases)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.startup")
+    parser.add_argument("--rounds", type=int, default=7)
+    parser.add_argument("--json", action="store_true", help="print rows as JSON")
+    args = parser.parse_args(argv)
+
+    rows = run(args.rounds)
+    if args.json:
+        print(json.dumps(rows, indent=2))
+    else:
+        print(f"{'case':<16}{'median (ms)':>12}{'overhead':>10}{'target':>8}  status")
+        for row in rows:
+            target = "-" if row["target"] is None else f"{row['target'] * 1e3:.0f}"
+            print(
+                f"{row['name']:<16}{row['median'] * 1e3:>12.1f}"
+                f"{row['overhead'] * 1e3:>10.1f}{target:>8}  {row['status']}"
+            )
+    return 1 if any(row["status"] == "missed" for row in rows) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
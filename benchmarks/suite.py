@@ -0,0 +1,196 @@
+"""
+Benchmark suite with JSON results and a regression gate.
+
+Run from the project root (no Redis, Kafka or network needed):
+
+    python -m benchmarks.suite run --out bench.json [--quick] [--filter service.]
+    python -m benchmarks.suite compare baseline.json bench.json [--threshold 0.25]
+
+``compare`` exits with status 1 if any benchmark's median time grew by
+more than the threshold (relative) against the baseline.
+"""
+
+import argparse
+import json
+import platform
+import statistics
+import sys
+import time
+from datetime import datetime
+from datetime import timezone
+from typing import Dict
+from typing import List
+
+from .cases import Benchmark
+from .cases import algorithm_cases
+from .cases import codec_cases
+from .cases import http_cases
+from .cases import service_cases
+
+GROUPS = ("algo", "codec", "service", "http")
+
+
+def measure(bench: Benchmark, rounds: int, min_time: float) -> Dict[str, float]:
+    """Time ``bench`` over ``rounds`` rounds; seconds per call."""
+    number = 1
+    if bench.setup is None:
+        start = time.perf_counter()
+        bench.fn()  # warm-up and calibration
+        elapsed = time.perf_counter() - start
+        number = max(1, int(min_time / elapsed)) if elapsed > 0 else 1000
+    times = []
+    for _ in range(rounds):
+        if bench.setup is not None:
+            bench.setup()
+        start = time.perf_counter()
+        for _ in range(number):
+            bench.fn()
+        times.append((time.perf_counter() - start) / number)
+    return {
+        "median": statistics.median(times),
+        "min": min(times),
+        "max": max(times),
+        "rounds": rounds,
+        "number": number,
+    }
+
+
+def collect(quick: bool, groups: List[str]) -> List[Benchmark]:
+    cases: List[Benchmark] = []
+    if "algo" in groups:
+        cases += algorithm_cases(quick)
+    if "codec" in groups:
+        cases += codec_cases(quick)
+    if "service" in groups or "http" in groups:
+        from .standins import install
+
+        redis = install()
+        if "service" in groups:
+            cases += service_cases(quick, redis)
+        if "http" in groups:
+            cases += http_cases(quick)
+    return cases
+
+
+def run(
+    quick: bool = False,
+    groups: List[str] = list(GROUPS),
+    name_filter: str = "",
+    rounds: int = 5,
+    min_time: float = 0.05,
+    echo=print,
+) -> dict:
+    results = {}
+    for bench in collect(quick, groups):
+        if name_filter not in bench.name:
+            continue
+        results[bench.name] = measure(bench, rounds, min_time)
+        echo(f"{bench.name:<40}{results[bench.name]['median'] * 1e3:>12.4f} ms")
+    return {
+        "meta": {
+            "created": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "quick": quick,
+            "rounds": rounds,
+        },
+        "benchmarks": results,
+    }
+
+
+def compare(baseline: dict, current: dict, threshold: float) -> List[dict]:
+    """
+    Rows of {name, baseline, current, ratio, status} for benchmarks in
+    either file; status is "regressed", "improved", "ok", "new" or "missing".
+    """
+    base, cur = baseline["benchmarks"], current["benchmarks"]
+    rows = []
+    for name in sorted(set(base) | set(cur)):
+        if name not in base or name not in cur:
+            rows.append(
+                {
+                    "name": name,
+                    "baseline": base.get(name, {}).get("median"),
+                    "current": cur.get(name, {}).get("median"),
+                    "ratio": None,
+                    "status": "new" if name not in base else "missing",
+                }
+            )
+            continue
+        ratio = cur[name]["median"] / base[name]["median"]
+        if ratio > 1 + threshold:
+            status = "regressed"
+        elif ratio < 1 / (1 + threshold):
+            status = "improved"
+        else:
+            status = "ok"
+        rows.append(
+            {
+                "name": name,
+                "baseline": base[name]["median"],
+                "current": cur[name]["median"],
+                "ratio": ratio,
+                "status": status,
+            }
+        )
+    return rows
+
+
+def _ms(seconds) -> str:
+    return "-" if seconds is None else f"{seconds * 1e3:.4f}"
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.suite")
+    sub = parser.add_subparsers(dest="command", required=True)
+    run_p = sub.add_parser("run", help="run benchmarks and write JSON results")
+    run_p.add_argument("--out", default="-", help="output file ('-' for stdout)")
+    run_p.add_argument("--quick", action="store_true", help="fewer, smaller inputs")
+    run_p.add_argument("--group", action="append", choices=GROUPS)
+    run_p.add_argument("--filter", default="", help="substring of benchmark names")
+    run_p.add_argument("--rounds", type=int, default=5)
+    run_p.add_argument("--min-time", type=float, default=0.05)
+    cmp_p = sub.add_parser("compare", help="fail if results regressed")
+    cmp_p.add_argument("baseline")
+    cmp_p.add_argument("current")
+    cmp_p.add_argument("--threshold", type=float, default=0.25)
+    args = parser.parse_args(argv)
+
+    if args.command == "run":
+        results = run(
+            quick=args.quick,
+            groups=args.group or list(GROUPS),
+            name_filter=args.filter,
+            rounds=args.rounds,
+            min_time=args.min_time,
+            echo=lambda line: print(line, file=sys.stderr),
+        )
+        text = json.dumps(results, indent=2, sort_keys=True)
+        if args.out == "-":
+            print(text)
+        else:
+            with open(args.out, "w") as f:
+                f.write(text + "\n")
+        return 0
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.current) as f:
+        current = json.load(f)
+    rows = compare(baseline, current, args.threshold)
+    print(f"{'benchmark':<40}{'base (ms)':>12}{'now (ms)':>12}{'ratio':>8}  status")
+    for row in rows:
+        ratio = "-" if row["ratio"] is None else f"{row['ratio']:.2f}"
+        print(
+            f"{row['name']:<40}{_ms(row['baseline']):>12}{_ms(row['current']):>12}"
+            f"{ratio:>8}  {row['status']}"
+        )
+    regressed = [row["name"] for row in rows if row["status"] == "regressed"]
+    if regressed:
+        print(f"\n{len(regressed)} regression(s) above {args.threshold:.0%}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,21 @@
+# Production server: gunicorn -c gunicorn.conf.py
+# Settings come from src/config.py (SERVE_* / WARM_* environment variables).
+from src import serving
+from src.config import Config
+
+wsgi_app = "src.wsgi:app"
+bind = Config.SERVE_BIND
+# Build and warm the app once in the master; workers inherit it on fork
+preload_app = True
+workers = Config.SERVE_WORKERS
+worker_class = "gthread"
+threads = Config.SERVE_THREADS
+# Recycle workers after a jittered number of requests (RSS limit: post_request)
+max_requests = Config.SERVE_MAX_REQUESTS
+max_requests_jitter = Config.SERVE_MAX_REQUESTS_JITTER
+timeout = Config.SERVE_TIMEOUT
+graceful_timeout = Config.SERVE_GRACEFUL_TIMEOUT
+keepalive = Config.SERVE_KEEPALIVE
+
+post_request = serving.post_request
+worker_exit = serving.worker_exit
@@ -0,0 +1,58 @@
+"""
+Cheap up-front cost estimates for the math operations.
+
+The estimate is the bit length of the result, which is what drives both
+the memory needed and (super-linearly) the time spent multiplying.
+"""
+
+import math
+from typing import Callable
+from .modular import fact_mod_steps
+
+# F(n) ~ phi^n / sqrt(5)
+LOG2_PHI = math.log2((1 + math.sqrt(5)) / 2)
+_LOG2_SQRT5 = math.log2(5) / 2
+
+
+def pow_bits(base: int, exp: int) -> int:
+    """Estimated bit length of base ** exp."""
+    if exp <= 0 or abs(base) <= 1:
+        return 1
+    return int(exp * math.log2(abs(base))) + 1
+
+
+def fib_bits(n: int) -> int:
+    """Estimated bit length of F(n)."""
+    return max(1, int(n * LOG2_PHI - _LOG2_SQRT5) + 1)
+
+
+def fact_bits(n: int) -> int:
+    """Estimated bit length of n! (via log-gamma)."""
+    if n < 2:
+        return 1
+    return int(math.lgamma(n + 1) / math.log(2)) + 1
+
+
+def range_bits(bits: Callable[[int], int], start: int, end: int) -> int:
+    """
+    Estimated total bit length of terms start..end of a growing sequence.
+
+    Trapezoid rule over ``bits``: exact for Fibonacci (linear), an upper
+    bound for factorials (convex).
+    """
+    return -(-(end - start + 1) * (bits(start) + bits(end)) // 2)
+
+
+def pow_mod_bits(base: int, exp: int, mod: int) -> int:
+    """Work estimate for modular pow: square-and-multiply over residues."""
+    return max(1, abs(exp).bit_length()) * mod.bit_length()
+
+
+def fib_mod_bits(n: int, mod: int) -> int:
+    """Work estimate for F(n) mod m: fast doubling over residues."""
+    return max(1, n.bit_length()) * mod.bit_length()
+
+
+def fact_mod_bits(n: int, mod: int) -> int:
+    """Work estimate for n! mod m: one residue-sized product per factor."""
+    return max(1, fact_mod_steps(n, mod)) * mod.bit_length()
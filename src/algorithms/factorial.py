@@ -0,0 +1,113 @@
+"""
+Factorial engine.
+
+Multiplying 2..n one at a time into a single accumulator makes every step
+a huge-by-small multiplication, which is close to quadratic overall.
+The functions here multiply balanced product trees instead, so the big
+multiplications happen between operands of similar size and CPython's
+Karatsuba multiplication can do its job.
+
+``factorial`` additionally uses the binary-split decomposition
+
+    n! = 2^(n - popcount(n)) * prod_i oddpart((n >> i)!)
+
+so the power of two becomes a single shift and only odd factors are
+multiplied.
+"""
+
+from typing import Dict
+from typing import Iterable
+from typing import Optional
+from typing import Tuple
+
+# Below this many factors a plain loop beats recursing further
+_LEAF_SIZE = 16
+
+
+def range_product(lo: int, hi: int) -> int:
+    """
+    Return lo * (lo + 1) * ... * hi, or 1 for an empty range.
+    """
+    if hi < lo:
+        return 1
+    if hi - lo < _LEAF_SIZE:
+        result = lo
+        for i in range(lo + 1, hi + 1):
+            result *= i
+        return result
+    mid = (lo + hi) // 2
+    return range_product(lo, mid) * range_product(mid + 1, hi)
+
+
+def _odd_product(lo: int, hi: int) -> int:
+    """
+    Return the product of the odd numbers lo, lo + 2, ..., <= hi (lo odd).
+    """
+    if hi < lo:
+        return 1
+    count = (hi - lo) // 2 + 1
+    if count <= _LEAF_SIZE:
+        result = lo
+        for i in range(lo + 2, hi + 1, 2):
+            result *= i
+        return result
+    mid = lo + 2 * (count // 2)
+    return _odd_product(lo, mid - 2) * _odd_product(mid, hi)
+
+
+def factorial(n: int) -> int:
+    """
+    Return n! using binary splitting over the odd factors.
+    """
+    if n < 0:
+        raise ValueError("n must be >= 0")
+    inner = outer = 1
+    for i in range(n.bit_length() - 1, -1, -1):
+        # Odd numbers in ((n >> (i + 1)), n >> i]
+        lo = (n >> (i + 1)) + 1
+        lo |= 1
+        inner *= _odd_product(lo, n >> i)
+        outer *= inner
+    return outer << (n - bin(n).count("1"))
+
+
+def factorial_many(ns: Iterable[int]) -> Dict[int, int]:
+    """
+    Return {n: n!} for several n, sharing one running product.
+
+    Inputs are visited in increasing order, so each factorial only
+    multiplies in the factors between it and the previous input.
+    """
+    results: Dict[int, int] = {}
+    acc: Optional[int] = None
+    prev = 0
+    for n in sorted(set(ns)):
+        acc = factorial(n) if acc is None else acc * range_product(prev + 1, n)
+        results[n] = acc
+        prev = n
+    return results
+
+
+def factorial_from(
+    n: int, start: int, start_value: int, step: int, max_new: int
+) -> Tuple[int, Dict[int, int]]:
+    """
+    Return (n!, checkpoints), resuming from start! == start_value.
+
+    Every multiple of ``step`` passed on the way to n is recorded in
+    ``checkpoints`` ({k: k!}). If start is more than ``max_new`` steps
+    below n, walking would cost more than it saves, so the last multiple
+    of ``step`` below n is computed directly instead.
+    """
+    checkpoints: Dict[int, int] = {}
+    base = n // step * step
+    if base - start > max_new * step:
+        start, start_value = base, factorial(base)
+        checkpoints[base] = start_value
+    acc = start_value
+    k = start
+    for boundary in range((start // step + 1) * step, n + 1, step):
+        acc *= range_product(k + 1, boundary)
+        k = boundary
+        checkpoints[boundary] = acc
+    return acc * range_product(k + 1, n), checkpoints
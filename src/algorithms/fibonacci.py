@@ -0,0 +1,128 @@
+"""
+Fibonacci engine.
+
+``fib_pair`` uses fast doubling, which needs O(log n) big-integer
+multiplications instead of the O(n) additions of the naive loop:
+
+    F(2k)   = F(k) * (2*F(k+1) - F(k))
+    F(2k+1) = F(k)^2 + F(k+1)^2
+
+The 2x2 matrix power form is kept as a fallback / cross-check.
+"""
+
+from typing import Dict
+from typing import Iterable
+from typing import Optional
+from typing import Tuple
+
+FibPair = Tuple[int, int]
+
+
+def fib_pair(n: int) -> FibPair:
+    """
+    Return (F(n), F(n+1)) using fast doubling.
+    """
+    if n < 0:
+        raise ValueError("n must be >= 0")
+    a, b = 0, 1
+    # Walk the bits of n from the most significant one down
+    for bit in bin(n)[2:]:
+        c = a * ((b << 1) - a)
+        d = a * a + b * b
+        if bit == "1":
+            a, b = d, c + d
+        else:
+            a, b = c, d
+    return a, b
+
+
+def fib_pair_matrix(n: int) -> FibPair:
+    """
+    Return (F(n), F(n+1)) by raising [[1, 1], [1, 0]] to the n-th power.
+    """
+    if n < 0:
+        raise ValueError("n must be >= 0")
+    # Matrix stored as (m00, m01, m11); it is symmetric so m10 == m01
+    r00, r01, r11 = 1, 0, 1
+    m00, m01, m11 = 1, 1, 0
+    while n:
+        if n & 1:
+            r00, r01, r11 = (
+                r00 * m00 + r01 * m01,
+                r00 * m01 + r01 * m11,
+                r01 * m01 + r11 * m11,
+            )
+        m00, m01, m11 = (
+            m00 * m00 + m01 * m01,
+            m01 * (m00 + m11),
+            m01 * m01 + m11 * m11,
+        )
+        n >>= 1
+    # [[F(n+1), F(n)], [F(n), F(n-1)]]
+    return r01, r00
+
+
+def fibonacci(n: int) -> int:
+    """
+    Return the n-th Fibonacci number.
+    """
+    return fib_pair(n)[0]
+
+
+def fib_advance(pair: FibPair, d: int) -> FibPair:
+    """
+    Given (F(m), F(m+1)), return (F(m+d), F(m+d+1)) for d >= 0.
+
+    Uses F(m+d) = F(m+1)F(d) + F(m)F(d-1), so only the much smaller
+    pair for d has to be computed from scratch.
+    """
+    if d < 0:
+        raise ValueError("d must be >= 0")
+    if d == 0:
+        return pair
+    fm, fm1 = pair
+    fd, fd1 = fib_pair(d)
+    fd_1 = fd1 - fd
+    return fm1 * fd + fm * fd_1, fm1 * fd1 + fm * fd
+
+
+def fibonacci_many(ns: Iterable[int]) -> Dict[int, int]:
+    """
+    Return {n: F(n)} for several n, sharing work between them.
+
+    Indices are visited in increasing order and each one is reached by
+    advancing from the previous pair instead of starting from zero.
+    """
+    results: Dict[int, int] = {}
+    pair: Optional[FibPair] = None
+    prev = 0
+    for n in sorted(set(ns)):
+        pair = fib_pair(n) if pair is None else fib_advance(pair, n - prev)
+        results[n] = pair[0]
+        prev = n
+    return results
+
+
+def fib_from(
+    n: int, start: int, start_pair: FibPair, step: int, max_new: int
+) -> Tuple[int, Dict[int, FibPair]]:
+    """
+    Return (F(n), checkpoints), resuming from (F(start), F(start+1)).
+
+    Every multiple of ``step`` passed on the way to n is recorded in
+    ``checkpoints`` ({k: (F(k), F(k+1))}). If start is more than
+    ``max_new`` steps below n, the last multiple of ``step`` below n is
+    computed directly instead of walking up to it.
+    """
+    checkpoints: Dict[int, FibPair] = {}
+    base = n // step * step
+    if base - start > max_new * step:
+        start, start_pair = base, fib_pair(base)
+        checkpoints[base] = start_pair
+    pair = start_pair
+    k = start
+    for boundary in range((start // step + 1) * step, n + 1, step):
+        pair = fib_advance(pair, boundary - k)
+        k = boundary
+        checkpoints[boundary] = pair
+    return fib_advance(pair, n - k)[0], checkpoints
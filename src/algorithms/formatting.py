@@ -0,0 +1,179 @@
+"""
+Big-integer output formats.
+
+CPython's int -> str conversion is quadratic and, past
+``sys.get_int_max_str_digits()``, refuses to run at all. ``to_decimal``
+instead splits the integer in halves by bit position and recombines the
+halves with ``decimal.Decimal`` arithmetic, whose C implementation
+multiplies huge numbers in sub-quadratic time; turning the final Decimal
+into text is linear.
+
+The other encodings (hex, two's-complement bytes, summary) avoid decimal
+conversion altogether.
+"""
+
+import base64
+import decimal
+import hashlib
+import json
+from typing import Dict
+from typing import Iterator
+from typing import Tuple
+from typing import TypedDict
+
+# Below this many bits plain str() is fast and within the digit limit
+_STR_MAX_BITS = 8192
+# Recursion leaves are converted to Decimal directly
+_LEAF_BITS = 128
+
+
+def to_decimal(n: int) -> str:
+    """
+    Return the decimal representation of n in sub-quadratic time.
+    """
+    if n < 0:
+        return "-" + to_decimal(-n)
+    if n.bit_length() <= _STR_MAX_BITS:
+        return str(n)
+
+    D = decimal.Decimal
+    two = D(2)
+    powers: Dict[int, decimal.Decimal] = {}
+
+    def pow2(w: int) -> decimal.Decimal:
+        # 2**w as an exact Decimal, memoised across the recursion
+        result = powers.get(w)
+        if result is None:
+            if w <= _LEAF_BITS:
+                result = two**w
+            elif w - 1 in powers:
+                result = powers[w - 1] + powers[w - 1]
+            else:
+                half = w >> 1
+                result = pow2(half) * pow2(w - half)
+            powers[w] = result
+        return result
+
+    def convert(value: int, w: int) -> decimal.Decimal:
+        if w <= _LEAF_BITS:
+            return D(value)
+        half = w >> 1
+        hi = value >> half
+        lo = value - (hi << half)
+        return convert(lo, half) + convert(hi, w - half) * pow2(half)
+
+    with decimal.localcontext() as ctx:
+        ctx.prec = decimal.MAX_PREC
+        ctx.Emax = decimal.MAX_EMAX
+        ctx.Emin = decimal.MIN_EMIN
+        ctx.traps[decimal.Inexact] = True
+        return str(convert(n, n.bit_length()))
+
+
+def iter_chunks(text: str, size: int) -> Iterator[str]:
+    """
+    Yield ``text`` in slices of at most ``size`` characters.
+    """
+    for i in range(0, len(text), size):
+        yield text[i : i + size]
+
+
+def to_hex(n: int) -> str:
+    return hex(n)
+
+
+def to_bytes(n: int) -> bytes:
+    """
+    Big-endian two's-complement bytes (the shortest that hold n).
+    """
+    return n.to_bytes(n.bit_length() // 8 + 1, "big", signed=True)
+
+
+def to_base64(n: int) -> str:
+    return base64.b64encode(to_bytes(n)).decode("ascii")
+
+
+def _leading_digits(n: int, k: int) -> Tuple[int, int]:
+    """
+    Return (first k digits, digit count) of a positive n.
+
+    n is approximated from its top bits to k + 40 significant digits.
+    Unless those digits sit right at a boundary (a run of 0s or 9s after
+    the first k), the approximation is exact for our purposes; otherwise
+    the candidate is corrected against 10**m = 5**m << m, which only needs
+    multiplications.
+    """
+    shift = max(0, n.bit_length() - 4 * (k + 40))
+    with decimal.localcontext() as ctx:
+        ctx.prec = k + 40
+        ctx.Emax = decimal.MAX_EMAX
+        approx = decimal.Decimal(n >> shift) * decimal.Decimal(2) ** shift
+    coeff = "".join(map(str, approx.as_tuple().digits)).ljust(k + 40, "0")
+    digits = approx.adjusted() + 1
+    margin = coeff[k : k + 30]
+    if margin.strip("0") and margin.strip("9"):
+        return int(coeff[:k]), digits
+
+    while True:
+        m = digits - k
+        scale = 5**m
+        lead = int(coeff[:k])
+        while (lead * scale) << m > n:
+            lead -= 1
+        while ((lead + 1) * scale) << m <= n:
+            lead += 1
+        if lead >= 10**k:
+            digits += 1
+        elif lead < 10 ** (k - 1):
+            digits -= 1
+        else:
+            return lead, digits
+        coeff = str(lead).ljust(k, "0")
+
+
+class ResultSummary(TypedDict):
+    sign: int
+    bit_length: int
+    digits: int
+    leading_digits: str
+    trailing_digits: str
+    sha256: str
+
+
+def summarize(n: int, k: int = 20) -> ResultSummary:
+    """
+    Describe n without converting it fully to decimal: sign, bit length,
+    digit count, first/last ``k`` digits and a SHA-256 of ``to_bytes(n)``.
+    """
+    magnitude = abs(n)
+    if magnitude.bit_length() <= _STR_MAX_BITS:
+        text = str(magnitude)
+        digits, leading, trailing = len(text), text[:k], text[-k:]
+    else:
+        lead, digits = _leading_digits(magnitude, k)
+        leading, trailing = str(lead), str(magnitude % 10**k).zfill(k)
+    return {
+        "sign": -1 if n < 0 else 1,
+        "bit_length": magnitude.bit_length(),
+        "digits": digits,
+        "leading_digits": leading,
+        "trailing_digits": trailing,
+        "sha256": hashlib.sha256(to_bytes(n)).hexdigest(),
+    }
+
+
+def json_dumps(obj) -> str:
+    """
+    json.dumps for plain data, but integers are written with ``to_decimal``
+    so arbitrarily large values serialize (and quickly).
+    """
+    if isinstance(obj, bool) or obj is None:
+        return json.dumps(obj)
+    if isinstance(obj, int):
+        return to_decimal(obj)
+    if isinstance(obj, dict):
+        items = (f"{json.dumps(str(k))}: {json_dumps(v)}" for k, v in obj.items())
+        return "{" + ", ".join(items) + "}"
+    if isinstance(obj, (list, tuple)):
+        return "[" + ", ".join(json_dumps(v) for v in obj) + "]"
+    return json.dumps(obj)
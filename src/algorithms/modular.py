@@ -0,0 +1,133 @@
+"""
+Modular variants of the math engines.
+
+These never build the full integer, so they answer huge-n queries in
+microseconds (or, for factorial, in O(min(n, p - n)) small multiplications).
+"""
+
+from functools import lru_cache
+from .factorial import range_product
+
+# Pisano periods are precomputed for moduli up to this size
+PISANO_MAX_MOD = 10_000
+
+# Consecutive factors multiplied as plain ints before each reduction
+_BLOCK = 256
+
+# Deterministic Miller-Rabin bases for n < 3.3 * 10**24
+_MR_BASES = (2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37, 41)
+# Smallest strong pseudoprime to all of _MR_BASES
+_MR_EXACT_BELOW = 3_317_044_064_679_887_385_961_981
+
+
+def pow_mod(base: int, exp: int, mod: int) -> int:
+    """
+    Return base ** exp % mod (negative exp uses the modular inverse).
+    """
+    return pow(base, exp, mod)
+
+
+@lru_cache(maxsize=256)
+def pisano_period(m: int) -> int:
+    """
+    Return the period of F(n) mod m (m >= 2). It is at most 6m.
+    """
+    a, b = 0, 1
+    for i in range(1, 6 * m + 1):
+        a, b = b, (a + b) % m
+        if a == 0 and b == 1:
+            return i
+    raise ValueError(f"No Pisano period found for {m}")  # pragma: no cover
+
+
+def fib_mod(n: int, mod: int) -> int:
+    """
+    Return F(n) mod m using fast doubling on residues.
+    """
+    if n < 0:
+        raise ValueError("n must be >= 0")
+    if mod == 1:
+        return 0
+    if mod <= PISANO_MAX_MOD:
+        n %= pisano_period(mod)
+    a, b = 0, 1
+    for bit in bin(n)[2:]:
+        c = a * ((b << 1) - a) % mod
+        d = (a * a + b * b) % mod
+        if bit == "1":
+            a, b = d, (c + d) % mod
+        else:
+            a, b = c, d
+    return a
+
+
+def is_probable_prime(n: int) -> bool:
+    """
+    Miller-Rabin test; deterministic for n < 3.3 * 10**24.
+    """
+    if n < 2:
+        return False
+    for p in _MR_BASES:
+        if n % p == 0:
+            return n == p
+    d, s = n - 1, 0
+    while not d & 1:
+        d >>= 1
+        s += 1
+    for a in _MR_BASES:
+        x = pow(a, d, n)
+        if x in (1, n - 1):
+            continue
+        for _ in range(s - 1):
+            x = x * x % n
+            if x == n - 1:
+                break
+        else:
+            return False
+    return True
+
+
+def range_product_mod(lo: int, hi: int, mod: int) -> int:
+    """
+    Return lo * ... * hi mod m, reducing once per block of factors.
+    """
+    result = 1 % mod
+    for start in range(lo, hi + 1, _BLOCK):
+        result = result * range_product(start, min(start + _BLOCK - 1, hi)) % mod
+    return result
+
+
+def _use_wilson(n: int, mod: int) -> bool:
+    # Only where the primality test is exact: a composite m would give a
+    # wrong (non-zero) answer instead of a slow one
+    return mod - 1 - n < n and mod < _MR_EXACT_BELOW and is_probable_prime(mod)
+
+
+def fact_mod_steps(n: int, mod: int) -> int:
+    """
+    Number of factors ``fact_mod`` multiplies for (n, m).
+    """
+    if n >= mod:
+        return 0
+    if _use_wilson(n, mod):
+        return mod - 1 - n
+    return n
+
+
+def fact_mod(n: int, mod: int) -> int:
+    """
+    Return n! mod m.
+
+    n >= m gives 0 (m is one of the factors). For prime p close above n,
+    Wilson's theorem (p - 1)! = -1 (mod p) lets us multiply the shorter
+    range n+1 .. p-1 and invert instead (for p below 3.3 * 10**24, where
+    primality is certain).
+    """
+    if n < 0:
+        raise ValueError("n must be >= 0")
+    if n >= mod:
+        return 0
+    if _use_wilson(n, mod):
+        tail = range_product_mod(n + 1, mod - 1, mod)
+        return -pow(tail, -1, mod) % mod
+    return range_product_mod(2, n, mod)
@@ -0,0 +1,40 @@
+"""
+Integer powers.
+
+``power`` exists so the pow computation can be shipped to a worker
+process by reference like the other engines.
+"""
+
+from typing import Dict
+from typing import Iterable
+from typing import List
+from typing import Optional
+from typing import Tuple
+
+
+def power(base: int, exp: int) -> int:
+    """
+    Return base ** exp.
+    """
+    return base**exp
+
+
+def power_many(pairs: Iterable[Tuple[int, int]]) -> Dict[Tuple[int, int], int]:
+    """
+    Return {(base, exp): base ** exp} for several pairs (exp >= 0).
+
+    Exponents of the same base are visited in increasing order and each
+    power is built from the previous one.
+    """
+    results: Dict[Tuple[int, int], int] = {}
+    by_base: Dict[int, List[int]] = {}
+    for base, exp in pairs:
+        by_base.setdefault(base, []).append(exp)
+    for base, exps in by_base.items():
+        acc: Optional[int] = None
+        prev = 0
+        for exp in sorted(set(exps)):
+            acc = base**exp if acc is None else acc * base ** (exp - prev)
+            results[(base, exp)] = acc
+            prev = exp
+    return results
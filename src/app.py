@@ -1,12 +1,18 @@
 from flask import Flask
 from prometheus_flask_exporter import PrometheusMetrics
 
-from flasgger import Swagger
 from .database import db
+from .log_store import upgrade_schema
 from .config import Config
 from .controllers.math_controller import math_bp
 from .controllers.auth_controller import auth_bp
-from flask_jwt_extended import JWTManager
+from .controllers.admin_controller import admin_bp
+from .controllers.admin_controller import init_profiling
+from .utils.auth_cache import CachingJWTManager
+from .utils.auth_cache import ClaimsCache
+from .utils.auth_cache import LoginThrottle
+from .utils.auth_cache import TTLCache
+from .utils.instrument import init_http_metrics
 
 swagger_template = {
     "swagger": "2.0",
@@ -32,19 +38,45 @@ def create_app():
 
     # Load settings
     app.config.from_object(Config)
-    Swagger(app, template=swagger_template)
-    JWTManager(app)
+    if Config.SWAGGER_ENABLED:
+        # Imported here so deployments without /apidocs skip flasgger entirely
+        from flasgger import Swagger
+
+        Swagger(app, template=swagger_template)
+    # Each distinct token is signature-checked once per claims-cache entry
+    claims_cache = None
+    if Config.JWT_CLAIMS_CACHE_SIZE:
+        claims_cache = ClaimsCache(
+            Config.JWT_CLAIMS_CACHE_SIZE, Config.JWT_CLAIMS_CACHE_TTL
+        )
+    CachingJWTManager(app, claims_cache=claims_cache)
+    app.extensions["login_users"] = TTLCache(
+        "user", Config.LOGIN_USER_CACHE_SIZE, Config.LOGIN_USER_CACHE_TTL
+    )
+    app.extensions["login_throttle"] = LoginThrottle(
+        Config.LOGIN_MAX_FAILURES,
+        Config.LOGIN_FAILURE_WINDOW,
+        Config.LOGIN_LOCKOUT,
+        Config.LOGIN_MAX_LOCKOUT,
+    )
     # Initialize extensions
     db.init_app(app)
-    PrometheusMetrics(app)  # Exposes /metrics for monitoring
+    # Exposes /metrics; request metrics are our own so the ASGI app shares them
+    PrometheusMetrics(app, export_defaults=False)
+    init_http_metrics(app)
 
-    # Ensure tables exist
+    # Ensure tables exist (upgrading a pre-rollup request_logs first)
     with app.app_context():
+        upgrade_schema()
         db.create_all()
 
     # Register your math Blueprint
     app.register_blueprint(math_bp)
     app.register_blueprint(auth_bp)
+    # Opt-in, admin-only profiling surface
+    if Config.PROFILING_ENABLED:
+        app.register_blueprint(admin_bp)
+        init_profiling(app)
 
     return app
 
@@ -0,0 +1,9 @@
+"""ASGI entry point: the Flask app is built and warmed once, then wrapped."""
+
+from .app import create_app
+from .async_app import create_asgi_app
+from .serving import warm
+
+flask_app = create_app()
+warm(flask_app)
+app = create_asgi_app(flask_app)
@@ -0,0 +1,526 @@
+"""
+ASGI variant of the auth and single-value math endpoints.
+
+pow / fib / factorial and /auth/login are served on the event loop:
+table and cache hits (L1, then Redis via redis.asyncio) never occupy a
+thread, while misses run the regular services on an executor, with their
+Kafka records sent through the async producer when aiokafka is installed.
+Only the common, well-formed case is handled natively; every other
+request (other routes, invalid input, auth failures, profiled requests)
+is passed to the Flask app through a small WSGI bridge, so responses match
+it exactly. Both paths record the same HTTP request metrics.
+"""
+
+import asyncio
+import contextvars
+import io
+import logging
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+from typing import Awaitable
+from typing import Callable
+from typing import Dict
+from typing import Iterable
+from typing import Optional
+from typing import Tuple
+from typing import Union
+from urllib.parse import parse_qsl
+from flask import Flask
+from flask_jwt_extended import decode_token
+from flask_jwt_extended.exceptions import JWTExtendedException
+from jwt import PyJWTError
+from pydantic import ValidationError
+from . import services
+from .config import Config
+from .algorithms.formatting import iter_chunks
+from .algorithms.formatting import json_dumps
+from .algorithms.formatting import summarize
+from .algorithms.formatting import to_base64
+from .algorithms.formatting import to_decimal
+from .algorithms.formatting import to_hex
+from .controllers.auth_controller import authenticate
+from .controllers.math_controller import handle_compute_error
+from .schemas import EncodedResultOutput
+from .schemas import FormatInput
+from .schemas import LoginInput
+from .schemas import NInput
+from .schemas import PowInput
+from .schemas import ResultFormat
+from .schemas import ResultOutput
+from .schemas import ResultSummaryOutput
+from .utils.cache import AsyncRedisCache
+from .utils.cache import AsyncTieredCache
+from .utils.compute_pool import ComputeError
+from .utils.http_cache import choose_encoding
+from .utils.http_cache import compress_chunks
+from .utils.http_cache import etag_matches
+from .utils.http_cache import quote_etag
+from .utils.http_cache import result_etag
+from .utils.instrument import count_lookup
+from .utils.instrument import observe_http
+from .utils.instrument import observe_result
+from .utils.instrument import stage
+from .utils.metrics import HTTP_REQUEST_EXCEPTIONS
+from .utils.kafka_logger import AIOKafkaProducer
+from .utils.kafka_logger import AsyncKafkaLogger
+
+logger = logging.getLogger(__name__)
+
+Scope = Dict[str, Any]
+Receive = Callable[[], Awaitable[dict]]
+Send = Callable[[dict], Awaitable[None]]
+
+_END = object()
+
+
+class _Response:
+    def __init__(
+        self,
+        status: int,
+        chunks: Iterable[Union[str, bytes]],
+        headers: Optional[Dict[str, str]] = None,
+        content_type: Optional[str] = "application/json",
+    ):
+        self.status = status
+        self.chunks = chunks
+        self.headers = {"Content-Type": content_type} if content_type else {}
+        self.headers.update(headers or {})
+
+
+def _header(scope: Scope, name: bytes) -> str:
+    """The first request header called ``name`` (lower-case), or ''."""
+    return next((v for k, v in scope["headers"] if k == name), b"").decode("latin-1")
+
+
+async def _read_body(receive: Receive) -> bytes:
+    body = b""
+    while True:
+        message = await receive()
+        body += message.get("body", b"")
+        if not message.get("more_body"):
+            return body
+
+
+def _environ(scope: Scope, body: bytes) -> dict:
+    """WSGI environ for an ASGI HTTP scope (PEP 3333 string handling)."""
+    server = scope.get("server") or ("localhost", 80)
+    client = scope.get("client") or ("", 0)
+    environ = {
+        "REQUEST_METHOD": scope["method"],
+        "SCRIPT_NAME": scope.get("root_path", "").encode().decode("latin-1"),
+        "PATH_INFO": scope["path"].encode().decode("latin-1"),
+        "QUERY_STRING": scope["query_string"].decode("latin-1"),
+        "SERVER_NAME": server[0],
+        "SERVER_PORT": str(server[1]),
+        "SERVER_PROTOCOL": f"HTTP/{scope.get('http_version', '1.1')}",
+        "REMOTE_ADDR": client[0],
+        "CONTENT_LENGTH": str(len(body)),
+        "wsgi.version": (1, 0),
+        "wsgi.url_scheme": scope.get("scheme", "http"),
+        "wsgi.input": io.BytesIO(body),
+        "wsgi.errors": sys.stderr,
+        "wsgi.multithread": True,
+        "wsgi.multiprocess": True,
+        "wsgi.run_once": False,
+    }
+    for raw_name, raw_value in scope["headers"]:
+        name = raw_name.decode("latin-1").upper().replace("-", "_")
+        value = raw_value.decode("latin-1")
+        if name in ("CONTENT_TYPE", "CONTENT_LENGTH"):
+            environ[name] = value
+            continue
+        key = f"HTTP_{name}"
+        environ[key] = f"{environ[key]},{value}" if key in environ else value
+    return environ
+
+
+class AsyncMathApp:
+    """ASGI application; build it with ``create_asgi_app``."""
+
+    def __init__(
+        self,
+        flask_app: Flask,
+        cache: AsyncTieredCache,
+        kafka: Optional[AsyncKafkaLogger],
+        executor: ThreadPoolExecutor,
+    ):
+        self.flask_app = flask_app
+        self.cache = cache
+        self.kafka = kafka
+        self.executor = executor
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self._routes: Dict[Tuple[str, str], Callable] = {
+            ("GET", "/api/math/pow"): self._pow,
+            ("GET", "/api/math/fib"): self._fib,
+            ("GET", "/api/math/factorial"): self._fact,
+            ("POST", "/auth/login"): self._login,
+        }
+        self._profile_header = (
+            Config.PROFILE_HEADER.lower().encode("latin-1")
+            if Config.PROFILING_ENABLED
+            else None
+        )
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "lifespan":
+            await self._lifespan(receive, send)
+            return
+        if scope["type"] != "http":
+            return
+        self.loop = asyncio.get_running_loop()
+        start = time.perf_counter()
+        body = await _read_body(receive)
+        handler = self._routes.get((scope["method"], scope["path"]))
+        if handler is not None and self._profile_header is not None:
+            # Profiled requests get Flask's profiling hooks
+            if any(k == self._profile_header for k, _ in scope["headers"]):
+                handler = None
+        response = None
+        if handler is not None:
+            try:
+                response = await handler(scope, body)
+            except Exception:
+                logger.exception("Unhandled error in %s", scope["path"])
+                HTTP_REQUEST_EXCEPTIONS.labels(method=scope["method"], status=500).inc()
+                response = _Response(
+                    500, ["Internal Server Error"], content_type="text/plain"
+                )
+        if response is None:
+            await self._bridge(scope, body, send)
+            return
+        # Bridged requests are recorded by the Flask app's own hooks
+        observe_http(
+            scope["method"], scope["path"], response.status, time.perf_counter() - start
+        )
+        await self._send(send, response)
+
+    # ——— Executor helpers ———
+    def _kafka_sink(self, topic: str, message: dict) -> None:
+        # Called from executor threads; the send itself runs on the loop
+        coro = self.kafka.send(topic, message)  # type: ignore[union-attr]
+        asyncio.run_coroutine_threadsafe(coro, self.loop)  # type: ignore[arg-type]
+
+    def _in_app(self, fn: Callable, args: tuple) -> Any:
+        token = services.kafka_sink.set(
+            self._kafka_sink if self.kafka is not None else None
+        )
+        try:
+            with self.flask_app.app_context():
+                return fn(*args)
+        finally:
+            services.kafka_sink.reset(token)
+
+    async def _offload(self, fn: Callable, *args) -> Any:
+        """Run fn(*args) on the executor, inside a Flask app context."""
+        return await asyncio.get_running_loop().run_in_executor(
+            self.executor, self._in_app, fn, args
+        )
+
+    # ——— Responses ———
+    def _json(
+        self, obj: Any, status: int = 200, headers: Optional[Dict[str, str]] = None
+    ) -> _Response:
+        # Serialized exactly as Flask's jsonify does for dict return values
+        text = self.flask_app.json.dumps(obj, separators=(",", ":")) + "\n"
+        return _Response(status, [text], headers)
+
+    def _render(self, value: int, fmt: ResultFormat) -> _Response:
+        if fmt == "hex":
+            return self._json(
+                EncodedResultOutput(result=to_hex(value), format=fmt).model_dump()
+            )
+        if fmt == "base64-bytes":
+            return self._json(
+                EncodedResultOutput(result=to_base64(value), format=fmt).model_dump()
+            )
+        if fmt == "summary":
+            return self._json(ResultSummaryOutput(**summarize(value)).model_dump())
+        if value.bit_length() < Config.STREAM_RESULT_MIN_BITS:
+            return _Response(200, [json_dumps(ResultOutput(result=value).model_dump())])
+        text = to_decimal(value)
+        return _Response(
+            200, ['{"result": ', *iter_chunks(text, Config.STREAM_CHUNK_BYTES), "}"]
+        )
+
+    def _cacheable(
+        self, response: _Response, etag: str, encoding: Optional[str]
+    ) -> _Response:
+        """Add the result's caching headers and compress as the Flask routes do."""
+        response.headers["ETag"] = quote_etag(etag)
+        response.headers["Cache-Control"] = Config.RESULT_CACHE_CONTROL
+        if not Config.HTTP_COMPRESS_MIN_BYTES:
+            return response
+        response.headers["Vary"] = "Accept-Encoding"
+        if encoding is not None:
+            body = "".join(response.chunks).encode()  # type: ignore[arg-type]
+            if len(body) >= Config.HTTP_COMPRESS_MIN_BYTES:
+                level = Config.HTTP_COMPRESS_LEVEL
+                response.chunks = [b"".join(compress_chunks([body], encoding, level))]
+                response.headers["Content-Encoding"] = encoding
+        return response
+
+    def _render_cacheable(
+        self, value: int, fmt: ResultFormat, etag: str, encoding: Optional[str]
+    ) -> _Response:
+        return self._cacheable(self._render(value, fmt), etag, encoding)
+
+    async def _result(
+        self, value: int, fmt: ResultFormat, etag: str, encoding: Optional[str]
+    ) -> _Response:
+        if value.bit_length() < Config.ASGI_INLINE_RENDER_BITS:
+            return self._render_cacheable(value, fmt, etag, encoding)
+        return await asyncio.get_running_loop().run_in_executor(
+            self.executor, self._render_cacheable, value, fmt, etag, encoding
+        )
+
+    async def _send(self, send: Send, response: _Response) -> None:
+        headers = [
+            (k.lower().encode(), v.encode()) for k, v in response.headers.items()
+        ]
+        chunks = [c.encode() if isinstance(c, str) else c for c in response.chunks]
+        if len(chunks) == 1:
+            headers.append((b"content-length", str(len(chunks[0])).encode()))
+        await send(
+            {
+                "type": "http.response.start",
+                "status": response.status,
+                "headers": headers,
+            }
+        )
+        for chunk in chunks:
+            await send({"type": "http.response.body", "body": chunk, "more_body": True})
+        await send({"type": "http.response.body", "body": b""})
+
+    # ——— Auth ———
+    def _authorized(self, scope: Scope) -> bool:
+        """True for a valid 'Bearer <access token>'; anything else goes to Flask."""
+        parts = _header(scope, b"authorization").split()
+        if len(parts) != 2 or parts[0] != "Bearer":
+            return False
+        with stage("jwt"):
+            try:
+                with self.flask_app.app_context():
+                    claims = decode_token(parts[1])
+            except (PyJWTError, JWTExtendedException):
+                return False
+        return claims.get("type") == "access"
+
+    async def _login(self, scope: Scope, body: bytes) -> Optional[_Response]:
+        content_type = dict(scope["headers"]).get(b"content-type", b"")
+        if not content_type.startswith(b"application/json"):
+            return None
+        try:
+            data = LoginInput.model_validate_json(body)
+        except ValidationError:
+            return None
+
+        body, status, *headers = await self._offload(
+            authenticate, data.username, data.password
+        )
+        return self._json(body, status, *headers)
+
+    # ——— Math ———
+    async def _serve(
+        self,
+        scope: Scope,
+        endpoint: str,
+        args: Tuple[int, ...],
+        mod: Optional[int],
+        fmt: ResultFormat,
+        service: Callable,
+    ) -> _Response:
+        """
+        304 for a matching If-None-Match, then table, then async cache;
+        misses run ``service`` on the executor.
+        """
+        etag = result_etag(endpoint, args, mod, fmt)
+        if etag_matches(_header(scope, b"if-none-match"), etag):
+            return self._cacheable(_Response(304, [], content_type=None), etag, None)
+        encoding = choose_encoding(_header(scope, b"accept-encoding"))
+        value = services.table_lookup(endpoint, args, mod)
+        if value is not None:
+            label = "fact" if endpoint == "factorial" else endpoint
+            count_lookup(label, "table")
+            return await self._result(observe_result(label, value), fmt, etag, encoding)
+        key, _, cost = services.request_plan(endpoint, args, mod)
+        op = key.split(":", 1)[0]
+        try:
+            services.compute_pool.check(cost)
+            with stage("cache_get", op):
+                value = await self.cache.get_int(key)
+            if value is not None:
+                count_lookup(op, "hit")
+                observe_result(op, value)
+            else:
+                value = await self._offload(service, *args, mod)
+        except ComputeError as e:
+            return self._json(*handle_compute_error(e))
+        except ValueError:
+            if endpoint != "pow":
+                raise
+            # Negative exponent with a base that has no inverse modulo 'mod'
+            return self._json({"msg": "'base' is not invertible modulo 'mod'"}, 400)
+        return await self._result(value, fmt, etag, encoding)
+
+    def _query(
+        self, scope: Scope, names: Tuple[str, ...]
+    ) -> Optional[Tuple[Dict[str, int], ResultFormat]]:
+        """(ints for ``names``, format), or None if Flask should answer."""
+        args: Dict[str, str] = {}
+        for k, v in parse_qsl(scope["query_string"].decode("latin-1"), True):
+            args.setdefault(k, v)
+        try:
+            fmt = FormatInput.model_validate(
+                {k: v for k, v in args.items() if k == "format"}
+            )
+            ints = {k: int(args[k]) for k in names if k in args}
+        except (ValidationError, ValueError):
+            return None
+        return ints, fmt.format
+
+    async def _pow(self, scope: Scope, body: bytes) -> Optional[_Response]:
+        if (
+            not self._authorized(scope)
+            or (parsed := self._query(scope, ("base", "exp", "mod"))) is None
+        ):
+            return None
+        try:
+            data = PowInput(**parsed[0])
+        except ValidationError:
+            return None
+        if data.exp < 0 and data.mod is None:
+            return None
+        return await self._serve(
+            scope,
+            "pow",
+            (data.base, data.exp),
+            data.mod,
+            parsed[1],
+            services.pow_service,
+        )
+
+    async def _n_route(self, scope: Scope, endpoint: str, service: Callable):
+        if (
+            not self._authorized(scope)
+            or (parsed := self._query(scope, ("n", "mod"))) is None
+        ):
+            return None
+        try:
+            data = NInput(**parsed[0])
+        except ValidationError:
+            return None
+        return await self._serve(
+            scope, endpoint, (data.n,), data.mod, parsed[1], service
+        )
+
+    async def _fib(self, scope: Scope, body: bytes) -> Optional[_Response]:
+        return await self._n_route(scope, "fib", services.fib_service)
+
+    async def _fact(self, scope: Scope, body: bytes) -> Optional[_Response]:
+        return await self._n_route(scope, "factorial", services.fact_service)
+
+    # ——— Everything else: the Flask app ———
+    async def _bridge(self, scope: Scope, body: bytes, send: Send) -> None:
+        """Run the Flask app on the executor, streaming its body as it is produced."""
+        started: Dict[str, Any] = {}
+
+        def start_response(status, headers, exc_info=None):
+            started["status"] = int(status.split(" ", 1)[0])
+            started["headers"] = [
+                (k.lower().encode("latin-1"), v.encode("latin-1")) for k, v in headers
+            ]
+            return lambda data: None
+
+        loop = asyncio.get_running_loop()
+        # Streamed bodies push Flask's request context on the first chunk and
+        # pop it after the last, possibly on another executor thread: run every
+        # step in one Context so those context variables follow the response
+        context = contextvars.copy_context()
+
+        def step(fn: Callable, *args) -> Awaitable[Any]:
+            return loop.run_in_executor(self.executor, context.run, fn, *args)
+
+        environ = _environ(scope, body)
+        result = await step(self._in_app, self.flask_app, (environ, start_response))
+        chunks = iter(result)
+        try:
+            chunk = await step(next, chunks, _END)
+            await send(
+                {
+                    "type": "http.response.start",
+                    "status": started["status"],
+                    "headers": started["headers"],
+                }
+            )
+            while chunk is not _END:
+                if chunk:
+                    await send(
+                        {"type": "http.response.body", "body": chunk, "more_body": True}
+                    )
+                chunk = await step(next, chunks, _END)
+            await send({"type": "http.response.body", "body": b""})
+        finally:
+            if hasattr(result, "close"):
+                await step(result.close)
+
+    # ——— Lifespan ———
+    async def _lifespan(self, receive: Receive, send: Send) -> None:
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                self.loop = asyncio.get_running_loop()
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                await self.aclose()
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    async def aclose(self, timeout: float = 5.0) -> None:
+        """Drain the async producer, then the services' own buffers."""
+        if self.kafka is not None:
+            await self.kafka.close(timeout)
+        await self.cache.l2.close()
+        await asyncio.get_running_loop().run_in_executor(
+            self.executor, services.shutdown, timeout
+        )
+        self.executor.shutdown(wait=True)
+
+
+def create_asgi_app(
+    flask_app: Flask,
+    l2: Optional[AsyncRedisCache] = None,
+    kafka: Optional[AsyncKafkaLogger] = None,
+) -> AsyncMathApp:
+    """
+    Wrap ``flask_app`` in the ASGI app. ``l2`` defaults to an async Redis
+    client sharing the sync one's circuit breaker; ``kafka`` to an async
+    producer when aiokafka is installed (otherwise records go through the
+    synchronous KafkaLogger on the executor).
+    """
+    if l2 is None:
+        l2 = AsyncRedisCache(
+            Config.REDIS_URL,
+            socket_timeout=Config.REDIS_SOCKET_TIMEOUT,
+            connect_timeout=Config.REDIS_CONNECT_TIMEOUT,
+            max_connections=Config.REDIS_MAX_CONNECTIONS,
+            breaker=services.cache.l2.breaker,
+        )
+    if kafka is None and AIOKafkaProducer is not None:
+        kafka = AsyncKafkaLogger(
+            bootstrap_servers=Config.KAFKA_BOOTSTRAP,
+            client_id=Config.KAFKA_CLIENT_ID,
+            linger_ms=Config.KAFKA_LINGER_MS,
+            batch_size=Config.KAFKA_BATCH_SIZE,
+            spill_size=Config.KAFKA_SPILL_SIZE,
+            retry_backoff=Config.KAFKA_RETRY_BACKOFF,
+        )
+    return AsyncMathApp(
+        flask_app,
+        AsyncTieredCache(services.cache, l2),
+        kafka,
+        ThreadPoolExecutor(
+            Config.ASGI_EXECUTOR_THREADS, thread_name_prefix="asgi-executor"
+        ),
+    )
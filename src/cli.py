@@ -1,16 +1,29 @@
+import json
 import sys
 import click
 from functools import wraps
-from sqlalchemy.exc import IntegrityError
-from .app import create_app
-from .database import db
-from .models import User
-from .services import pow_service
-from .services import fib_service
-from .services import fact_service
+from .algorithms.factorial import factorial as factorial_engine
+from .algorithms.fibonacci import fibonacci as fibonacci_engine
+from .algorithms.formatting import to_decimal
+from .algorithms.power import power as power_engine
+from .config import Config
+from .utils.tables import build_table
+
+# The web stack (Flask, SQLAlchemy, JWT, Redis / Kafka clients) is imported
+# by the commands that use it, so the math commands start in milliseconds.
 
 # ——— App and context decorator ———
-app = create_app()
+_app = None
+
+
+def get_app():
+    """The Flask app, created on first use."""
+    global _app
+    if _app is None:
+        from .app import create_app
+
+        _app = create_app()
+    return _app
 
 
 def with_app_context(f):
@@ -18,12 +31,35 @@ def with_app_context(f):
 
     @wraps(f)
     def wrapped(*args, **kwargs):
-        with app.app_context():
+        with get_app().app_context():
             return f(*args, **kwargs)
 
     return wrapped
 
 
+def _compute(use_service: bool, service_name: str, engine, *args) -> None:
+    """Print engine(*args), or go through the named service with --service."""
+    try:
+        if use_service:
+            from . import services
+
+            with get_app().app_context():
+                value = getattr(services, service_name)(*args)
+        else:
+            value = engine(*args)
+    except ValueError as e:
+        raise click.BadParameter(str(e))
+    click.echo(to_decimal(value))
+
+
+service_option = click.option(
+    "--service",
+    "use_service",
+    is_flag=True,
+    help="Go through the service layer (table, cache, request log).",
+)
+
+
 # ——— CLI group ———
 @click.group()
 def cli():
@@ -35,26 +71,119 @@ def cli():
 @cli.command()
 @click.argument("base", type=int)
 @click.argument("exp", type=int)
-@with_app_context
-def power(base, exp):
+@service_option
+def power(base, exp, use_service):
     """Compute BASE raised to the EXP power."""
-    click.echo(pow_service(base, exp))
+    if exp < 0:
+        raise click.BadParameter("must be >= 0", param_hint="EXP")
+    _compute(use_service, "pow_service", power_engine, base, exp)
 
 
 @cli.command(name="fib")
 @click.argument("n", type=int)
-@with_app_context
-def fibonacci(n):
+@service_option
+def fibonacci(n, use_service):
     """Compute the N-th Fibonacci number."""
-    click.echo(fib_service(n))
+    _compute(use_service, "fib_service", fibonacci_engine, n)
 
 
 @cli.command(name="fact")
 @click.argument("n", type=int)
-@with_app_context
-def factorial(n):
+@service_option
+def factorial(n, use_service):
     """Compute N! (factorial)."""
-    click.echo(fact_service(n))
+    _compute(use_service, "fact_service", factorial_engine, n)
+
+
+# ——— Precomputed tables ———
+@cli.command("build-tables")
+@click.option("--path", default=Config.TABLE_PATH, show_default=True)
+@click.option("--fib-max", default=Config.TABLE_FIB_MAX, show_default=True)
+@click.option("--fact-max", default=Config.TABLE_FACT_MAX, show_default=True)
+def build_tables(path, fib_max, fact_max):
+    """Write the mmap'ed table of F(0..FIB_MAX) and 0!..FACT_MAX!."""
+    size = build_table(path, fib_max, fact_max)
+    click.echo(f"✅ Wrote {size / 2**20:.1f} MiB to {path}")
+
+
+# ——— Load testing ———
+def _print_window(stats: dict) -> None:
+    click.echo(
+        f"[{stats['elapsed']:>7.1f}s] {stats['throughput']:>8.1f} req/s  "
+        f"p50 {stats['p50_ms']:.1f}  p95 {stats['p95_ms']:.1f}  "
+        f"p99 {stats['p99_ms']:.1f}  max {stats['max_ms']:.1f} ms  "
+        f"errors {stats['errors']}"
+    )
+
+
+@cli.command("loadtest")
+@click.option("--url", default="http://127.0.0.1:5000", show_default=True)
+@click.option("--duration", default=30.0, show_default=True, help="Seconds.")
+@click.option("--concurrency", default=8, show_default=True, help="Workers.")
+@click.option("--rate", type=float, help="Open-loop requests/s (default: closed loop).")
+@click.option(
+    "--mix", default=Config.LOADTEST_MIX, show_default=True, help="op:max=weight,..."
+)
+@click.option("--replay", is_flag=True, help="Replay inputs from request_logs.")
+@click.option("--replay-limit", default=10_000, show_default=True)
+@click.option("--interval", default=5.0, show_default=True, help="Report period.")
+@click.option("--user", default="loadtest", show_default=True, help="JWT identity.")
+@click.option("--seed", type=int)
+@click.option("--json", "as_json", is_flag=True, help="Print the summary as JSON.")
+@with_app_context
+def loadtest(
+    url,
+    duration,
+    concurrency,
+    rate,
+    mix,
+    replay,
+    replay_limit,
+    interval,
+    user,
+    seed,
+    as_json,
+):
+    """Drive a weighted mix of /api/math requests against a running server."""
+    from flask_jwt_extended import create_access_token
+    from sqlalchemy import select
+    from .database import db
+    from .loadtest import LoadTest
+    from .loadtest import ReplayMix
+    from .loadtest import RequestMix
+    from .models import RequestLog
+
+    try:
+        if replay:
+            rows = db.session.execute(
+                select(RequestLog.endpoint, RequestLog.input_value)
+                .order_by(RequestLog.id.desc())
+                .limit(replay_limit)
+            ).all()
+            next_path = ReplayMix(rows, seed=seed)
+        else:
+            next_path = RequestMix(mix, seed=seed)
+    except ValueError as e:
+        raise click.BadParameter(str(e))
+    test = LoadTest(
+        url,
+        next_path,
+        create_access_token(identity=user),
+        duration=duration,
+        concurrency=concurrency,
+        rate=rate,
+        interval=interval,
+    )
+    summary = test.run(report=None if as_json else _print_window)
+    if as_json:
+        click.echo(json.dumps(summary, indent=2))
+        return
+    click.echo(
+        f"Total: {summary['requests']} requests, {summary['throughput']:.1f} req/s, "
+        f"p50 {summary['p50_ms']:.1f} / p95 {summary['p95_ms']:.1f} / "
+        f"p99 {summary['p99_ms']:.1f} / max {summary['max_ms']:.1f} ms, "
+        f"error rate {summary['error_rate']:.2%} {summary['statuses']}"
+    )
 
 
 # ——— Create user command ———
@@ -63,6 +192,10 @@ def factorial(n):
 @with_app_context
 def create_user(username):
     """Create a new user USERNAME; prompts for password."""
+    from sqlalchemy.exc import IntegrityError
+    from .database import db
+    from .models import User
+
     pwd = click.prompt("Password", hide_input=True, confirmation_prompt=True)
     user = User(username=username)
     user.set_password(pwd)
@@ -80,6 +213,8 @@ def create_user(username):
 @with_app_context
 def clear_db():
     """Drop & recreate all tables."""
+    from .database import db
+
     db.drop_all()
     db.create_all()
     click.echo("✅ Database cleared and schema re-created.")
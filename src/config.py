@@ -12,11 +12,148 @@ class Config:
         os.path.abspath(os.path.dirname(__file__)), "..", "instance", "requests.db"
     )
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    # SQLite pragmas applied to every connection
+    SQLITE_JOURNAL_MODE = os.getenv("SQLITE_JOURNAL_MODE", "WAL")
+    SQLITE_SYNCHRONOUS = os.getenv("SQLITE_SYNCHRONOUS", "NORMAL")
+    SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", 5000))
+    SQLITE_CACHE_SIZE_KB = int(os.getenv("SQLITE_CACHE_SIZE_KB", 20_000))
+    # Request log pipeline (background group commit into request_logs)
+    LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", 10000))
+    LOG_BATCH_SIZE = int(os.getenv("LOG_BATCH_SIZE", 200))
+    LOG_FLUSH_INTERVAL = float(os.getenv("LOG_FLUSH_INTERVAL", 0.5))
+    LOG_OVERFLOW_POLICY = os.getenv("LOG_OVERFLOW_POLICY", "block")
+    LOG_SAMPLE_RATE = float(os.getenv("LOG_SAMPLE_RATE", 0.1))
+    # Retention (raw rows / rollups) and rollup bucket width
+    LOG_RETENTION_DAYS = float(os.getenv("LOG_RETENTION_DAYS", 7))
+    STATS_RETENTION_DAYS = float(os.getenv("STATS_RETENTION_DAYS", 90))
+    STATS_BUCKET_SECONDS = int(os.getenv("STATS_BUCKET_SECONDS", 3600))
+    LOG_PURGE_INTERVAL = float(os.getenv("LOG_PURGE_INTERVAL", 300))
+    STATS_MAX_TOP = int(os.getenv("STATS_MAX_TOP", 100))
     # Redis (caching)
     REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+    REDIS_SOCKET_TIMEOUT = float(os.getenv("REDIS_SOCKET_TIMEOUT", 0.25))
+    REDIS_CONNECT_TIMEOUT = float(os.getenv("REDIS_CONNECT_TIMEOUT", 0.25))
+    REDIS_MAX_CONNECTIONS = int(os.getenv("REDIS_MAX_CONNECTIONS", 50))
+    # Circuit breaker: consecutive failures to open, then probe with backoff
+    REDIS_BREAKER_FAILURES = int(os.getenv("REDIS_BREAKER_FAILURES", 2))
+    REDIS_BREAKER_BACKOFF = float(os.getenv("REDIS_BREAKER_BACKOFF", 0.5))
+    REDIS_BREAKER_MAX_BACKOFF = float(os.getenv("REDIS_BREAKER_MAX_BACKOFF", 30))
+    # In-process L1 cache in front of Redis (per worker, sized in bytes)
+    L1_CACHE_MAX_BYTES = int(os.getenv("L1_CACHE_MAX_BYTES", 64 * 1024 * 1024))
+    L1_CACHE_MAX_ITEM_BYTES = int(os.getenv("L1_CACHE_MAX_ITEM_BYTES", 1024 * 1024))
+    # Cached value encoding (binary ints, compressed above a threshold)
+    CACHE_COMPRESSION = os.getenv("CACHE_COMPRESSION", "zlib")  # zlib, lz4, none
+    CACHE_COMPRESS_THRESHOLD = int(os.getenv("CACHE_COMPRESS_THRESHOLD", 4096))
+    # Size-aware TTLs (seconds; 0 = no expiry) and the largest value kept in Redis
+    CACHE_SMALL_VALUE_BYTES = int(os.getenv("CACHE_SMALL_VALUE_BYTES", 64 * 1024))
+    CACHE_TTL_SMALL = int(os.getenv("CACHE_TTL_SMALL", 7 * 24 * 3600)) or None
+    CACHE_TTL_LARGE = int(os.getenv("CACHE_TTL_LARGE", 3600)) or None
+    CACHE_MAX_VALUE_BYTES = int(os.getenv("CACHE_MAX_VALUE_BYTES", 64 * 1024 * 1024))
     # Kafka (logging/streaming)
     KAFKA_BOOTSTRAP = os.getenv("KAFKA_BOOTSTRAP", "localhost:9092")
     KAFKA_CLIENT_ID = os.getenv("KAFKA_CLIENT_ID", "math-service")
+    KAFKA_LINGER_MS = int(os.getenv("KAFKA_LINGER_MS", 20))
+    KAFKA_BATCH_SIZE = int(os.getenv("KAFKA_BATCH_SIZE", 64 * 1024))
+    KAFKA_MAX_BLOCK_MS = int(os.getenv("KAFKA_MAX_BLOCK_MS", 100))
+    KAFKA_SPILL_SIZE = int(os.getenv("KAFKA_SPILL_SIZE", 10000))
+    KAFKA_RETRY_BACKOFF = float(os.getenv("KAFKA_RETRY_BACKOFF", 5))
+    # Broker protocol version, e.g. "2.0" (default: probe, for at most the timeout)
+    KAFKA_API_VERSION = (
+        tuple(int(p) for p in os.getenv("KAFKA_API_VERSION", "").split(".") if p)
+        or None
+    )
+    KAFKA_API_VERSION_TIMEOUT_MS = int(os.getenv("KAFKA_API_VERSION_TIMEOUT_MS", 500))
+    # Math API
+    BATCH_MAX_ITEMS = int(os.getenv("BATCH_MAX_ITEMS", 100))
+    RANGE_MAX_TERMS = int(os.getenv("RANGE_MAX_TERMS", 10000))
+    # Admission control, by estimated result size in bits
+    COMPUTE_INLINE_MAX_BITS = int(os.getenv("COMPUTE_INLINE_MAX_BITS", 2_000_000))
+    COMPUTE_MAX_BITS = int(os.getenv("COMPUTE_MAX_BITS", 200_000_000))
+    # Process pool for expensive computations
+    COMPUTE_POOL_WORKERS = int(os.getenv("COMPUTE_POOL_WORKERS", 2))
+    COMPUTE_POOL_MAX_PENDING = int(os.getenv("COMPUTE_POOL_MAX_PENDING", 4))
+    COMPUTE_CPU_SECONDS = float(os.getenv("COMPUTE_CPU_SECONDS", 30))
+    COMPUTE_MEMORY_BYTES = int(os.getenv("COMPUTE_MEMORY_BYTES", 2 * 1024**3)) or None
+    COMPUTE_TIMEOUT = float(os.getenv("COMPUTE_TIMEOUT", 60))
+    # Single-flight: cross-worker Redis leases for results of at least this size
+    SINGLEFLIGHT_LEASE_MIN_BITS = int(os.getenv("SINGLEFLIGHT_LEASE_MIN_BITS", 100_000))
+    SINGLEFLIGHT_LEASE_TTL = float(os.getenv("SINGLEFLIGHT_LEASE_TTL", 60))
+    SINGLEFLIGHT_WAIT_TIMEOUT = float(os.getenv("SINGLEFLIGHT_WAIT_TIMEOUT", 30))
+    SINGLEFLIGHT_POLL_INTERVAL = float(os.getenv("SINGLEFLIGHT_POLL_INTERVAL", 0.05))
+
+    # Checkpoint ladder for incremental Fibonacci / factorial
+    CHECKPOINT_STEP = int(os.getenv("CHECKPOINT_STEP", 1000))
+    CHECKPOINT_PROBE = int(os.getenv("CHECKPOINT_PROBE", 4))
+    CHECKPOINT_MAX_NEW = int(os.getenv("CHECKPOINT_MAX_NEW", 4))
+    CHECKPOINT_MIN_N = int(os.getenv("CHECKPOINT_MIN_N", 5000))
+
+    # Precomputed result table (python -m src.cli build-tables), mmap'ed
+    TABLE_PATH = os.getenv(
+        "TABLE_PATH",
+        os.path.join(
+            os.path.abspath(os.path.dirname(__file__)), "..", "instance", "tables.bin"
+        ),
+    )
+    TABLE_FIB_MAX = int(os.getenv("TABLE_FIB_MAX", 10_000))
+    TABLE_FACT_MAX = int(os.getenv("TABLE_FACT_MAX", 10_000))
+    TABLE_VERIFY = os.getenv("TABLE_VERIFY", "true").lower() == "true"
+
+    # Pre-fork production server (gunicorn -c gunicorn.conf.py)
+    SERVE_BIND = os.getenv("SERVE_BIND", "0.0.0.0:5000")
+    SERVE_WORKERS = int(os.getenv("SERVE_WORKERS", os.cpu_count() or 1))
+    SERVE_THREADS = int(os.getenv("SERVE_THREADS", 4))
+    SERVE_MAX_REQUESTS = int(os.getenv("SERVE_MAX_REQUESTS", 10000))  # 0 = never
+    SERVE_MAX_REQUESTS_JITTER = int(os.getenv("SERVE_MAX_REQUESTS_JITTER", 1000))
+    SERVE_MAX_RSS_MB = int(os.getenv("SERVE_MAX_RSS_MB", 1024))  # 0 = no limit
+    SERVE_TIMEOUT = int(os.getenv("SERVE_TIMEOUT", 120))
+    SERVE_GRACEFUL_TIMEOUT = int(os.getenv("SERVE_GRACEFUL_TIMEOUT", 30))
+    SERVE_KEEPALIVE = int(os.getenv("SERVE_KEEPALIVE", 5))
+    SERVE_DRAIN_TIMEOUT = float(os.getenv("SERVE_DRAIN_TIMEOUT", 10))
+    # Warm-up before fork: hottest inputs of the last WARM_HOURS into L1
+    WARM_TOP = int(os.getenv("WARM_TOP", 200))
+    WARM_HOURS = float(os.getenv("WARM_HOURS", 24))
+    WARM_MAX_BITS = int(os.getenv("WARM_MAX_BITS", 50_000_000))
+
+    # ASGI variant (uvicorn src.asgi:app): executor for misses and Flask routes
+    ASGI_EXECUTOR_THREADS = int(os.getenv("ASGI_EXECUTOR_THREADS", 16))
+    # Results at least this large are serialized on the executor, not the loop
+    ASGI_INLINE_RENDER_BITS = int(os.getenv("ASGI_INLINE_RENDER_BITS", 20_000))
+
+    # Default request mix for `cli loadtest` (op:max_n=weight,...)
+    LOADTEST_MIX = os.getenv("LOADTEST_MIX", "fib:10000=5,factorial:2000=3,pow:1000=2")
+
+    # On-demand profiling (admin JWT only; hooks are not installed when off)
+    PROFILING_ENABLED = os.getenv("PROFILING_ENABLED", "false").lower() == "true"
+    ADMIN_USERS = [u for u in os.getenv("ADMIN_USERS", "").split(",") if u]
+    PROFILE_HEADER = os.getenv("PROFILE_HEADER", "X-Profile")
+    PROFILE_TOP = int(os.getenv("PROFILE_TOP", 50))
+    PROFILE_SAMPLE_INTERVAL = float(os.getenv("PROFILE_SAMPLE_INTERVAL", 0.005))
+    PROFILE_MAX_SECONDS = float(os.getenv("PROFILE_MAX_SECONDS", 60))
+    # Streamed responses are flushed to the client in chunks of about this size
+    STREAM_CHUNK_BYTES = int(os.getenv("STREAM_CHUNK_BYTES", 64 * 1024))
+    # Decimal results above this size are converted lazily and streamed
+    STREAM_RESULT_MIN_BITS = int(os.getenv("STREAM_RESULT_MIN_BITS", 100_000))
+    # HTTP caching of pow / fib / factorial results (pure functions of the query);
+    # "public, ..." lets shared caches serve them without checking the JWT
+    RESULT_CACHE_CONTROL = os.getenv(
+        "RESULT_CACHE_CONTROL", "private, max-age=31536000, immutable"
+    )
+    # gzip / deflate result bodies of at least this many bytes (0 = off)
+    HTTP_COMPRESS_MIN_BYTES = int(os.getenv("HTTP_COMPRESS_MIN_BYTES", 1024))
+    HTTP_COMPRESS_LEVEL = int(os.getenv("HTTP_COMPRESS_LEVEL", 1))
+    # Swagger UI at /apidocs (the spec is built once per process outside debug)
+    SWAGGER_ENABLED = os.getenv("SWAGGER_ENABLED", "true").lower() == "true"
+    # Verified JWT claims, cached by token digest (never past the token's exp)
+    JWT_CLAIMS_CACHE_SIZE = int(os.getenv("JWT_CLAIMS_CACHE_SIZE", 10000))  # 0 = off
+    JWT_CLAIMS_CACHE_TTL = float(os.getenv("JWT_CLAIMS_CACHE_TTL", 300))
+    # User records for /auth/login (password changes apply after the TTL)
+    LOGIN_USER_CACHE_SIZE = int(os.getenv("LOGIN_USER_CACHE_SIZE", 10000))  # 0 = off
+    LOGIN_USER_CACHE_TTL = float(os.getenv("LOGIN_USER_CACHE_TTL", 60))
+    # Failed-login throttling per username (lockout doubles up to the max)
+    LOGIN_MAX_FAILURES = int(os.getenv("LOGIN_MAX_FAILURES", 5))
+    LOGIN_FAILURE_WINDOW = float(os.getenv("LOGIN_FAILURE_WINDOW", 300))
+    LOGIN_LOCKOUT = float(os.getenv("LOGIN_LOCKOUT", 30))
+    LOGIN_MAX_LOCKOUT = float(os.getenv("LOGIN_MAX_LOCKOUT", 300))
     # Login
     JWT_SECRET_KEY = os.getenv("JWT_SECRET_KEY", "super-secret-change-me")
     JWT_ACCESS_TOKEN_EXPIRES = False  # or set a timedelta
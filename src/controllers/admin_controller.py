@@ -0,0 +1,154 @@
+import threading
+from functools import wraps
+from flask import Blueprint
+from flask import Flask
+from flask import Response
+from flask import g
+from flask import request
+from flask_jwt_extended import get_jwt_identity
+from flask_jwt_extended import verify_jwt_in_request
+from ..config import Config
+from ..utils.profiling import PROFILE_FORMATS
+from ..utils.profiling import RequestProfile
+from ..utils.profiling import SamplingProfiler
+
+admin_bp = Blueprint("admin", __name__, url_prefix="/api/admin")
+
+# One profile per worker at a time (cProfile is process-wide on 3.12+)
+_profile_lock = threading.Lock()
+
+
+def _admin_error():
+    """Return an error response unless the request carries an admin JWT."""
+    verify_jwt_in_request()
+    if get_jwt_identity() not in Config.ADMIN_USERS:
+        return {"msg": "Admin access required"}, 403
+    return None
+
+
+def admin_required(fn):
+    @wraps(fn)
+    def wrapper(*args, **kwargs):
+        error = _admin_error()
+        if error:
+            return error
+        return fn(*args, **kwargs)
+
+    return wrapper
+
+
+@admin_bp.route("/profile/sample", methods=["POST"])
+@admin_required
+def sample_profile():
+    """
+    Sample This Worker
+    ---
+    summary: Run the sampling profiler over every thread of this worker.
+    description: >
+      Blocks for 'seconds' while sampling, then returns collapsed stacks
+      ("thread;file:func;... count" per line) for flamegraph.pl or speedscope.
+      Only available with PROFILING_ENABLED and to users in ADMIN_USERS.
+    tags:
+      - Admin
+    produces:
+      - text/plain
+    parameters:
+      - name: seconds
+        in: query
+        type: number
+        required: false
+        default: 5
+        description: Sampling duration (up to PROFILE_MAX_SECONDS)
+      - name: interval
+        in: query
+        type: number
+        required: false
+        description: Seconds between samples (default PROFILE_SAMPLE_INTERVAL)
+    security:
+      - Bearer: []
+    responses:
+      200:
+        description: Collapsed stacks
+      400:
+        description: Invalid duration or interval
+      401:
+        description: Unauthorized
+      403:
+        description: Not an admin
+      409:
+        description: Another profile is running on this worker
+    """
+    try:
+        seconds = float(request.args.get("seconds", 5))
+        interval = float(request.args.get("interval", Config.PROFILE_SAMPLE_INTERVAL))
+    except ValueError:
+        return {"msg": "Invalid 'seconds' or 'interval'"}, 400
+    if not 0 < seconds <= Config.PROFILE_MAX_SECONDS or not 0 < interval <= seconds:
+        return {
+            "msg": f"'seconds' must be in (0, {Config.PROFILE_MAX_SECONDS}] "
+            "and 'interval' in (0, seconds]"
+        }, 400
+    if not _profile_lock.acquire(blocking=False):
+        return {"msg": "A profile is already running on this worker"}, 409
+    try:
+        dump = SamplingProfiler(interval).run(seconds)
+    finally:
+        _profile_lock.release()
+    return Response(dump, mimetype="text/plain")
+
+
+def init_profiling(app: Flask) -> None:
+    """
+    Profile math requests that carry the PROFILE_HEADER ("pstats" or
+    "collapsed") and an admin JWT: the response body is replaced by the
+    profile dump, the original status moves to X-Profiled-Status.
+    Only called when PROFILING_ENABLED, so requests pay nothing otherwise.
+    """
+    header = Config.PROFILE_HEADER
+
+    @app.before_request
+    def start_profile():
+        if request.blueprint != "math" or header not in request.headers:
+            return None
+        error = _admin_error()
+        if error:
+            return error
+        fmt = request.headers[header].strip().lower() or "pstats"
+        if fmt not in PROFILE_FORMATS:
+            return {
+                "msg": f"'{header}' must be one of {', '.join(PROFILE_FORMATS)}"
+            }, 400
+        if not _profile_lock.acquire(blocking=False):
+            return {"msg": "A profile is already running on this worker"}, 409
+        g.profile = RequestProfile(
+            fmt, interval=Config.PROFILE_SAMPLE_INTERVAL, top=Config.PROFILE_TOP
+        )
+        g.profile.start()
+        return None
+
+    @app.after_request
+    def finish_profile(response):
+        profile = g.pop("profile", None)
+        if profile is None:
+            return response
+        try:
+            # Streamed bodies are produced here, so drain them while profiling
+            response.get_data()
+            dump = profile.stop()
+        finally:
+            _profile_lock.release()
+        return Response(
+            dump,
+            mimetype="text/plain",
+            headers={
+                "X-Profiled-Status": str(response.status_code),
+                "X-Profile-Format": profile.fmt,
+            },
+        )
+
+    @app.teardown_request
+    def abandon_profile(exc):
+        profile = g.pop("profile", None)
+        if profile is not None:
+            profile.stop()
+            _profile_lock.release()
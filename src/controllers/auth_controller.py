@@ -1,7 +1,10 @@
+import math
 from flask import Blueprint
+from flask import current_app
 from flask import request
 from flask import jsonify
 from flask_jwt_extended import create_access_token
+from werkzeug.security import check_password_hash
 from ..models import User
 from pydantic import ValidationError
 from src.schemas import LoginInput, LoginOutput
@@ -10,6 +13,38 @@ from src.schemas import LoginInput, LoginOutput
 auth_bp = Blueprint("auth", __name__, url_prefix="/auth")
 
 
+def authenticate(username: str, password: str):
+    """
+    Check credentials and issue a token; returns a Flask (body, status[,
+    headers]) tuple. Throttled usernames are refused before the user
+    lookup and the password hash check.
+    """
+    throttle = current_app.extensions["login_throttle"]
+    users = current_app.extensions["login_users"]
+    wait = throttle.retry_after(username)
+    if wait:
+        return (
+            {"msg": "Too many failed logins, try again later"},
+            429,
+            {"Retry-After": str(math.ceil(wait))},
+        )
+
+    password_hash = users.get(username)
+    if password_hash is None:
+        user = User.query.filter_by(username=username).first()
+        if user is not None:
+            password_hash = user.password_hash
+            users.put(username, password_hash)
+    if password_hash is None or not check_password_hash(password_hash, password):
+        throttle.record_failure(username)
+        return {"msg": "Bad username or password"}, 401
+
+    throttle.record_success(username)
+    token = create_access_token(identity=username)
+    # Use Pydantic for output serialization, but keep old format
+    return LoginOutput(access_token=token).model_dump(), 200
+
+
 @auth_bp.route("/login", methods=["POST"])
 def login():
     """
@@ -59,16 +94,12 @@ def login():
             msg:
               type: string
               example: "Bad username or password"
+      429:
+        description: Too many failed logins for this username (see Retry-After)
     """
     try:
         data = LoginInput.model_validate(request.get_json())
     except ValidationError as e:
         return {"msg": "Invalid input", "errors": e.errors()}, 400
 
-    user = User.query.filter_by(username=data.username).first()
-    if not user or not user.check_password(data.password):
-        return {"msg": "Bad username or password"}, 401
-
-    token = create_access_token(identity=data.username)
-    # Use Pydantic for output serialization, but keep old format
-    return LoginOutput(access_token=token).model_dump(), 200
+    return authenticate(data.username, data.password)
@@ -1,17 +1,146 @@
+from typing import Callable
+from typing import Optional
+from typing import Tuple
 from flask import Blueprint
+from flask import Response
 from flask import abort
+from flask import make_response
+from flask import stream_with_context
 from ..services import pow_service
 from ..services import fib_service
 from ..services import fact_service
-from flask_jwt_extended import jwt_required
+from ..services import batch_service
+from ..services import fib_range_service
+from ..services import fact_range_service
+from ..services import stats_service
+from ..config import Config
+from ..algorithms.formatting import iter_chunks
+from ..algorithms.formatting import json_dumps
+from ..algorithms.formatting import summarize
+from ..algorithms.formatting import to_base64
+from ..algorithms.formatting import to_decimal
+from ..algorithms.formatting import to_hex
+from ..utils.compute_pool import ComputationTooExpensive
+from ..utils.compute_pool import ComputeBusy
+from ..utils.compute_pool import ComputeError
+from ..utils.http_cache import choose_encoding
+from ..utils.http_cache import compress_chunks
+from ..utils.http_cache import etag_matches
+from ..utils.http_cache import quote_etag
+from ..utils.http_cache import result_etag
+from ..utils.instrument import timed_jwt_required
 from flask import request
 from pydantic import ValidationError
 from src.schemas import PowInput
 from src.schemas import NInput, ResultOutput
+from src.schemas import BatchInput
+from src.schemas import RangeInput
+from src.schemas import BatchItemOutput
+from src.schemas import BatchOutput
+from src.schemas import EncodedResultOutput
+from src.schemas import FormatInput
+from src.schemas import ResultFormat
+from src.schemas import ResultSummaryOutput
+from src.schemas import StatsInput
+from src.schemas import StatsOutput
 
 math_bp = Blueprint("math", __name__, url_prefix="/api/math")
 
 
+@math_bp.errorhandler(ComputeError)
+def handle_compute_error(e: ComputeError):
+    """Map admission-control failures to fast client-facing errors."""
+    if isinstance(e, ComputationTooExpensive):
+        return {
+            "msg": str(e),
+            "estimated_bits": e.estimated_bits,
+            "limit_bits": e.limit_bits,
+        }, 413
+    if isinstance(e, ComputeBusy):
+        return {"msg": str(e)}, 503, {"Retry-After": "1"}
+    return {"msg": str(e)}, 422
+
+
+def _parse_format():
+    """Validate ?format= into one of the ResultFormat values."""
+    try:
+        data = FormatInput(**{k: v for k, v in request.args.items() if k == "format"})
+    except ValidationError:
+        return None, (
+            {"msg": "Invalid 'format' (dec, hex, base64-bytes or summary)"},
+            400,
+        )
+    return data.format, None
+
+
+def _result_response(result: int, fmt: ResultFormat):
+    """Serialize a result in the requested format."""
+    if fmt == "hex":
+        return EncodedResultOutput(result=to_hex(result), format=fmt).model_dump(), 200
+    if fmt == "base64-bytes":
+        return (
+            EncodedResultOutput(result=to_base64(result), format=fmt).model_dump(),
+            200,
+        )
+    if fmt == "summary":
+        return ResultSummaryOutput(**summarize(result)).model_dump(), 200
+    if result.bit_length() < Config.STREAM_RESULT_MIN_BITS:
+        body = json_dumps(ResultOutput(result=result).model_dump())
+        return Response(body, mimetype="application/json")
+
+    # Huge decimal: convert after the headers are out and send it in chunks
+    def stream():
+        yield '{"result": '
+        yield from iter_chunks(to_decimal(result), Config.STREAM_CHUNK_BYTES)
+        yield "}"
+
+    return Response(stream(), mimetype="application/json")
+
+
+# ——— HTTP caching of results ———
+def _with_cache_headers(response: Response, etag: str) -> Response:
+    response.headers["ETag"] = quote_etag(etag)
+    response.headers["Cache-Control"] = Config.RESULT_CACHE_CONTROL
+    if Config.HTTP_COMPRESS_MIN_BYTES:
+        response.vary.add("Accept-Encoding")
+    return response
+
+
+def _compress(response: Response) -> Response:
+    """gzip / deflate the body if the client accepts it and it is large enough."""
+    encoding = choose_encoding(request.headers.get("Accept-Encoding"))
+    if encoding is None or not Config.HTTP_COMPRESS_MIN_BYTES:
+        return response
+    level = Config.HTTP_COMPRESS_LEVEL
+    if response.is_streamed:
+        response.response = compress_chunks(response.iter_encoded(), encoding, level)
+    else:
+        data = response.get_data()
+        if len(data) < Config.HTTP_COMPRESS_MIN_BYTES:
+            return response
+        response.set_data(b"".join(compress_chunks([data], encoding, level)))
+    response.headers["Content-Encoding"] = encoding
+    return response
+
+
+def _cached_result(
+    op: str,
+    args: Tuple[int, ...],
+    mod: Optional[int],
+    fmt: ResultFormat,
+    compute: Callable[[], int],
+):
+    """
+    Serve a result with its ETag and Cache-Control headers; a matching
+    If-None-Match gets 304 before ``compute`` (table, cache, pool) runs.
+    """
+    etag = result_etag(op, args, mod, fmt)
+    if etag_matches(request.headers.get("If-None-Match"), etag):
+        return _with_cache_headers(Response(status=304), etag)
+    response = make_response(_result_response(compute(), fmt))
+    return _compress(_with_cache_headers(response, etag))
+
+
 def _parse_int_arg(arg_name: str):
     """Helper to get and validate an integer query param."""
     val = request.args.get(arg_name)
@@ -21,7 +150,7 @@ def _parse_int_arg(arg_name: str):
 
 
 @math_bp.route("/pow", methods=["GET"])
-@jwt_required()
+@timed_jwt_required()
 def pow_route():
     """
     Calculate Power
@@ -40,8 +169,25 @@ def pow_route():
         in: query
         type: integer
         required: true
-        description: Exponent (integer)
+        description: Exponent (integer; may be negative when 'mod' is given)
         example: 8
+      - name: mod
+        in: query
+        type: integer
+        required: false
+        description: Optional modulus (>= 1); returns base^exp mod m
+        example: 1000000007
+      - name: format
+        in: query
+        type: string
+        required: false
+        enum: [dec, hex, base64-bytes, summary]
+        default: dec
+        description: >
+          Result encoding. dec returns a JSON integer (streamed for huge values);
+          hex and base64-bytes (big-endian two's complement) return a string;
+          summary returns sign, bit length, digit count, leading/trailing digits
+          and a SHA-256 of the base64-bytes payload.
     security:
       - Bearer: []
     responses:
@@ -53,6 +199,8 @@ def pow_route():
             result:
               type: integer
               example: 256
+      304:
+        description: Not modified (If-None-Match matched the result's ETag)
       400:
         description: Missing or invalid parameters
         schema:
@@ -60,24 +208,43 @@ def pow_route():
           properties:
             msg:
               type: string
-              example: "Missing or invalid 'base' or 'exp'"
+              example: "Missing or invalid 'base', 'exp' or 'mod'"
       401:
         description: Unauthorized
+      413:
+        description: Estimated result size exceeds the configured limit
+      503:
+        description: Too many expensive computations in progress
     """
     try:
         # Convert args to dict, filter only fields PowInput expects
-        query_args = {k: request.args.get(k) for k in ["base", "exp"]}
+        query_args = {k: request.args.get(k) for k in ["base", "exp", "mod"]}
         # Pydantic validates types; will raise if missing/invalid
         data = PowInput(**{k: int(v) for k, v in query_args.items() if v is not None})
     except (ValidationError, ValueError, TypeError):
-        return {"msg": "Missing or invalid 'base' or 'exp'"}, 400
+        return {"msg": "Missing or invalid 'base', 'exp' or 'mod'"}, 400
+    fmt, error = _parse_format()
+    if error:
+        return error
+    if data.exp < 0 and data.mod is None:
+        # base**-k is not an integer; only the modular inverse is
+        return {"msg": "Negative 'exp' requires 'mod'"}, 400
 
-    result = pow_service(data.base, data.exp)
-    return ResultOutput(result=result).model_dump(), 200
+    try:
+        return _cached_result(
+            "pow",
+            (data.base, data.exp),
+            data.mod,
+            fmt,
+            lambda: pow_service(data.base, data.exp, data.mod),
+        )
+    except ValueError:
+        # Negative exponent with a base that has no inverse modulo 'mod'
+        return {"msg": "'base' is not invertible modulo 'mod'"}, 400
 
 
 @math_bp.route("/fib", methods=["GET"])
-@jwt_required()
+@timed_jwt_required()
 def fib_route():
     """
     Calculate Fibonacci Number
@@ -92,6 +259,23 @@ def fib_route():
         required: true
         description: The index (n >= 0)
         example: 10
+      - name: mod
+        in: query
+        type: integer
+        required: false
+        description: Optional modulus (>= 1); returns F(n) mod m
+        example: 1000000007
+      - name: format
+        in: query
+        type: string
+        required: false
+        enum: [dec, hex, base64-bytes, summary]
+        default: dec
+        description: >
+          Result encoding. dec returns a JSON integer (streamed for huge values);
+          hex and base64-bytes (big-endian two's complement) return a string;
+          summary returns sign, bit length, digit count, leading/trailing digits
+          and a SHA-256 of the base64-bytes payload.
     security:
       - Bearer: []
     responses:
@@ -103,6 +287,8 @@ def fib_route():
             result:
               type: integer
               example: 55
+      304:
+        description: Not modified (If-None-Match matched the result's ETag)
       400:
         description: Missing or invalid parameter
         schema:
@@ -110,22 +296,30 @@ def fib_route():
           properties:
             msg:
               type: string
-              example: "Missing or invalid 'n'"
+              example: "Missing or invalid 'n' or 'mod'"
       401:
         description: Unauthorized
+      413:
+        description: Estimated result size exceeds the configured limit
+      503:
+        description: Too many expensive computations in progress
     """
     try:
-        query_args = {k: request.args.get(k) for k in ["n"]}
+        query_args = {k: request.args.get(k) for k in ["n", "mod"]}
         data = NInput(**{k: int(v) for k, v in query_args.items() if v is not None})
     except (ValidationError, ValueError, TypeError):
-        return {"msg": "Missing or invalid 'n'"}, 400
+        return {"msg": "Missing or invalid 'n' or 'mod'"}, 400
+    fmt, error = _parse_format()
+    if error:
+        return error
 
-    result = fib_service(data.n)
-    return ResultOutput(result=result).model_dump(), 200
+    return _cached_result(
+        "fib", (data.n,), data.mod, fmt, lambda: fib_service(data.n, data.mod)
+    )
 
 
 @math_bp.route("/factorial", methods=["GET"])
-@jwt_required()
+@timed_jwt_required()
 def fact_route():
     """
     Calculate Factorial
@@ -140,6 +334,23 @@ def fact_route():
         required: true
         description: The input integer (n >= 0)
         example: 5
+      - name: mod
+        in: query
+        type: integer
+        required: false
+        description: Optional modulus (>= 1); returns n! mod m
+        example: 1000000007
+      - name: format
+        in: query
+        type: string
+        required: false
+        enum: [dec, hex, base64-bytes, summary]
+        default: dec
+        description: >
+          Result encoding. dec returns a JSON integer (streamed for huge values);
+          hex and base64-bytes (big-endian two's complement) return a string;
+          summary returns sign, bit length, digit count, leading/trailing digits
+          and a SHA-256 of the base64-bytes payload.
     security:
       - Bearer: []
     responses:
@@ -151,6 +362,8 @@ def fact_route():
             result:
               type: integer
               example: 120
+      304:
+        description: Not modified (If-None-Match matched the result's ETag)
       400:
         description: Missing or invalid parameter
         schema:
@@ -158,15 +371,342 @@ def fact_route():
           properties:
             msg:
               type: string
-              example: "Missing or invalid 'n'"
+              example: "Missing or invalid 'n' or 'mod'"
       401:
         description: Unauthorized
+      413:
+        description: Estimated result size exceeds the configured limit
+      503:
+        description: Too many expensive computations in progress
     """
     try:
-        query_args = {k: request.args.get(k) for k in ["n"]}
+        query_args = {k: request.args.get(k) for k in ["n", "mod"]}
         data = NInput(**{k: int(v) for k, v in query_args.items() if v is not None})
     except (ValidationError, ValueError, TypeError):
-        return {"msg": "Missing or invalid 'n'"}, 400
+        return {"msg": "Missing or invalid 'n' or 'mod'"}, 400
+    fmt, error = _parse_format()
+    if error:
+        return error
+
+    return _cached_result(
+        "factorial", (data.n,), data.mod, fmt, lambda: fact_service(data.n, data.mod)
+    )
+
+
+def _parse_range():
+    """Validate ?start=&end= into a RangeInput, or return an error response."""
+    try:
+        query_args = {k: request.args.get(k) for k in ["start", "end"]}
+        data = RangeInput(**{k: int(v) for k, v in query_args.items() if v is not None})
+    except (ValidationError, ValueError, TypeError):
+        return None, (
+            {
+                "msg": "Missing or invalid 'start'/'end' "
+                f"(0 <= start <= end, at most {Config.RANGE_MAX_TERMS} terms)"
+            },
+            400,
+        )
+    return data, None
+
+
+def _ndjson_stream(rows):
+    """Serialize (n, result) rows as NDJSON, yielding roughly fixed-size chunks."""
+    buf = []
+    size = 0
+    for n, value in rows:
+        line = json_dumps({"n": n, "result": value}) + "\n"
+        buf.append(line)
+        size += len(line)
+        if size >= Config.STREAM_CHUNK_BYTES:
+            yield "".join(buf)
+            buf = []
+            size = 0
+    if buf:
+        yield "".join(buf)
 
-    result = fact_service(data.n)
-    return ResultOutput(result=result).model_dump(), 200
+
+@math_bp.route("/fib/range", methods=["GET"])
+@timed_jwt_required()
+def fib_range_route():
+    """
+    Stream a Range of Fibonacci Numbers
+    ---
+    summary: Streams F(start) .. F(end) as NDJSON, one {"n", "result"} object per line.
+    tags:
+      - Math
+    produces:
+      - application/x-ndjson
+    parameters:
+      - name: start
+        in: query
+        type: integer
+        required: true
+        description: First index (>= 0)
+        example: 0
+      - name: end
+        in: query
+        type: integer
+        required: true
+        description: Last index (>= start, limited by RANGE_MAX_TERMS)
+        example: 10
+    security:
+      - Bearer: []
+    responses:
+      200:
+        description: NDJSON stream
+      400:
+        description: Missing or invalid parameters
+      401:
+        description: Unauthorized
+      413:
+        description: Estimated size of the last term exceeds the configured limit
+    """
+    data, error = _parse_range()
+    if error:
+        return error
+    rows = fib_range_service(data.start, data.end)
+    return Response(
+        stream_with_context(_ndjson_stream(rows)), mimetype="application/x-ndjson"
+    )
+
+
+@math_bp.route("/factorial/range", methods=["GET"])
+@timed_jwt_required()
+def fact_range_route():
+    """
+    Stream a Range of Factorials
+    ---
+    summary: Streams start! .. end! as NDJSON, one {"n", "result"} object per line.
+    tags:
+      - Math
+    produces:
+      - application/x-ndjson
+    parameters:
+      - name: start
+        in: query
+        type: integer
+        required: true
+        description: First input (>= 0)
+        example: 0
+      - name: end
+        in: query
+        type: integer
+        required: true
+        description: Last input (>= start, limited by RANGE_MAX_TERMS)
+        example: 10
+    security:
+      - Bearer: []
+    responses:
+      200:
+        description: NDJSON stream
+      400:
+        description: Missing or invalid parameters
+      401:
+        description: Unauthorized
+      413:
+        description: Estimated size of the last term exceeds the configured limit
+    """
+    data, error = _parse_range()
+    if error:
+        return error
+    rows = fact_range_service(data.start, data.end)
+    return Response(
+        stream_with_context(_ndjson_stream(rows)), mimetype="application/x-ndjson"
+    )
+
+
+def _batch_item_args(op: str, args: dict):
+    """Validate one batch item's args; return the positional tuple for the service."""
+    if op == "pow":
+        try:
+            data = PowInput.model_validate(args)
+        except ValidationError:
+            raise ValueError("Missing or invalid 'base' or 'exp'")
+        if data.exp < 0:
+            raise ValueError("Negative 'exp' is not supported in batch requests")
+        if data.mod is not None:
+            raise ValueError("'mod' is not supported in batch requests")
+        return (data.base, data.exp)
+    try:
+        n_data = NInput.model_validate(args)
+    except ValidationError:
+        raise ValueError("Missing or invalid 'n'")
+    if n_data.mod is not None:
+        raise ValueError("'mod' is not supported in batch requests")
+    return (n_data.n,)
+
+
+@math_bp.route("/batch", methods=["POST"])
+@timed_jwt_required()
+def batch_route():
+    """
+    Batch Evaluation
+    ---
+    summary: Evaluate several math operations in one call.
+    description: >
+      Each item is validated on its own; invalid items get an error entry
+      while the rest are still evaluated. Results come back in request order.
+    tags:
+      - Math
+    consumes:
+      - application/json
+    parameters:
+      - in: body
+        name: body
+        required: true
+        schema:
+          type: object
+          properties:
+            items:
+              type: array
+              items:
+                type: object
+                properties:
+                  op:
+                    type: string
+                    enum: [pow, fib, factorial]
+                  args:
+                    type: object
+              example:
+                - {op: pow, args: {base: 2, exp: 8}}
+                - {op: fib, args: {n: 10}}
+                - {op: factorial, args: {n: 5}}
+    security:
+      - Bearer: []
+    responses:
+      200:
+        description: Per-item results or errors, in request order
+        schema:
+          type: object
+          properties:
+            results:
+              type: array
+              items:
+                type: object
+                properties:
+                  result:
+                    type: integer
+                  error:
+                    type: string
+              example:
+                - {result: 256}
+                - {result: 55}
+                - {result: 120}
+      400:
+        description: Malformed body or too many items
+      401:
+        description: Unauthorized
+    """
+    try:
+        data = BatchInput.model_validate(request.get_json(silent=True))
+    except ValidationError as e:
+        return {"msg": "Invalid input", "errors": e.errors(include_context=False)}, 400
+
+    outputs = [BatchItemOutput() for _ in data.items]
+    valid = []
+    positions = []
+    for i, item in enumerate(data.items):
+        try:
+            valid.append((item.op, _batch_item_args(item.op, item.args)))
+            positions.append(i)
+        except ValueError as e:
+            outputs[i].error = str(e)
+
+    for i, result in zip(positions, batch_service(valid) if valid else []):
+        if isinstance(result, ComputeError):
+            outputs[i].error = str(result)
+        else:
+            outputs[i].result = result
+    body = json_dumps(BatchOutput(results=outputs).model_dump(exclude_none=True))
+    return Response(body, mimetype="application/json")
+
+
+@math_bp.route("/stats", methods=["GET"])
+@timed_jwt_required()
+def stats_route():
+    """
+    Request Statistics
+    ---
+    summary: Request counts, hot inputs and result sizes from the rollup tables.
+    description: >
+      Served from hourly (STATS_BUCKET_SECONDS) rollups maintained by the log
+      writer, never from raw request_logs. The window starts at the bucket
+      containing now - hours.
+    tags:
+      - Math
+    parameters:
+      - name: hours
+        in: query
+        type: integer
+        required: false
+        default: 24
+        description: Window length in hours (up to the rollup retention)
+      - name: endpoint
+        in: query
+        type: string
+        required: false
+        enum: [pow, fib, factorial]
+        description: Restrict to one endpoint
+      - name: top
+        in: query
+        type: integer
+        required: false
+        default: 10
+        description: Number of hot inputs to return
+    security:
+      - Bearer: []
+    responses:
+      200:
+        description: Aggregated statistics
+        schema:
+          type: object
+          properties:
+            since:
+              type: string
+              format: date-time
+            bucket_seconds:
+              type: integer
+            endpoints:
+              type: array
+              items:
+                type: object
+                properties:
+                  endpoint: {type: string}
+                  count: {type: integer}
+                  total_bits: {type: integer}
+            timeline:
+              type: array
+              items:
+                type: object
+                properties:
+                  bucket: {type: string, format: date-time}
+                  count: {type: integer}
+            result_sizes:
+              type: array
+              items:
+                type: object
+                properties:
+                  endpoint: {type: string}
+                  bits_below: {type: integer}
+                  count: {type: integer}
+            hot_inputs:
+              type: array
+              items:
+                type: object
+                properties:
+                  endpoint: {type: string}
+                  input: {type: string}
+                  count: {type: integer}
+      400:
+        description: Invalid parameters
+      401:
+        description: Unauthorized
+    """
+    try:
+        data = StatsInput.model_validate(
+            {k: v for k, v in request.args.items() if k in ("hours", "endpoint", "top")}
+        )
+    except ValidationError as e:
+        return {"msg": "Invalid input", "errors": e.errors(include_context=False)}, 400
+    stats = stats_service(data.hours, data.endpoint, data.top)
+    return StatsOutput(**stats).model_dump(mode="json")
@@ -0,0 +1,241 @@
+import http.client
+import math
+import queue
+import random
+import threading
+import time
+from collections import Counter
+from typing import Callable
+from typing import Dict
+from typing import Iterable
+from typing import List
+from typing import Optional
+from typing import Tuple
+from urllib.parse import urlencode
+from urllib.parse import urlsplit
+from .config import Config
+
+# ——— Request mixes ———
+DEFAULT_MIX = Config.LOADTEST_MIX
+
+
+def _log_uniform(rng: random.Random, hi: int) -> int:
+    """Draw from [0, hi] with every order of magnitude equally likely."""
+    return int(math.exp(rng.uniform(0, math.log(hi + 1)))) - 1
+
+
+class RequestMix:
+    """
+    Weighted mix of math requests, parsed from "op:max=weight,..."
+    (op in pow, fib, factorial). Inputs are drawn log-uniformly from
+    [0, max], so small and large requests both show up; pow draws the
+    exponent that way with a base in [2, 99].
+    """
+
+    OPS = ("pow", "fib", "factorial")
+
+    def __init__(self, spec: str = DEFAULT_MIX, seed: Optional[int] = None):
+        self.entries: List[Tuple[str, int]] = []
+        weights = []
+        for part in filter(None, (p.strip() for p in spec.split(","))):
+            try:
+                target, weight = part.split("=")
+                op, hi = target.split(":")
+                entry, w = (op, int(hi)), float(weight)
+            except ValueError:
+                raise ValueError(f"Bad mix entry {part!r} (expected op:max=weight)")
+            if op not in self.OPS or entry[1] < 0 or w <= 0:
+                raise ValueError(f"Bad mix entry {part!r}")
+            self.entries.append(entry)
+            weights.append(w)
+        if not self.entries:
+            raise ValueError("Empty request mix")
+        self.weights = weights
+        self.rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def __call__(self) -> str:
+        with self._lock:
+            op, hi = self.rng.choices(self.entries, self.weights)[0]
+            value = _log_uniform(self.rng, hi)
+            base = self.rng.randint(2, 99)
+        if op == "pow":
+            return f"/api/math/pow?base={base}&exp={value}"
+        return f"/api/math/{op}?n={value}"
+
+
+def log_path(endpoint: str, input_value: str) -> Optional[str]:
+    """Rebuild the request path from a request_logs row, or None."""
+    value, _, mod = input_value.partition(" mod ")
+    try:
+        if endpoint == "pow":
+            base, exp = (int(x) for x in value.split(","))
+            params: Dict[str, int] = {"base": base, "exp": exp}
+        elif endpoint in ("fib", "factorial"):
+            params = {"n": int(value)}
+        else:
+            return None
+        if mod:
+            params["mod"] = int(mod)
+    except ValueError:
+        return None
+    return f"/api/math/{endpoint}?{urlencode(params)}"
+
+
+class ReplayMix:
+    """Replays logged (endpoint, input) pairs in proportion to their counts."""
+
+    def __init__(self, rows: Iterable[Tuple[str, str]], seed: Optional[int] = None):
+        counts = Counter(p for p in (log_path(e, i) for e, i in rows) if p)
+        if not counts:
+            raise ValueError("No replayable requests in the log")
+        self.paths = list(counts)
+        self.weights = list(counts.values())
+        self.rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def __call__(self) -> str:
+        with self._lock:
+            return self.rng.choices(self.paths, self.weights)[0]
+
+
+# ——— Statistics ———
+def percentile(sorted_values: List[float], q: float) -> float:
+    """Nearest-rank percentile of an already sorted list (0 if empty)."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(q / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def summarize(samples: List[Tuple[float, int]], seconds: float) -> dict:
+    """Latency percentiles (ms), status counts and throughput for samples."""
+    latencies = sorted(lat for lat, _ in samples)
+    statuses = Counter(status for _, status in samples)
+    errors = sum(n for status, n in statuses.items() if not 200 <= status < 400)
+    return {
+        "requests": len(samples),
+        "errors": errors,
+        "error_rate": errors / len(samples) if samples else 0.0,
+        "throughput": len(samples) / seconds if seconds > 0 else 0.0,
+        "p50_ms": percentile(latencies, 50) * 1e3,
+        "p95_ms": percentile(latencies, 95) * 1e3,
+        "p99_ms": percentile(latencies, 99) * 1e3,
+        "max_ms": (latencies[-1] if latencies else 0.0) * 1e3,
+        "statuses": {str(k): v for k, v in sorted(statuses.items())},
+    }
+
+
+# ——— Driver ———
+class LoadTest:
+    """
+    Drive ``next_path`` requests against ``base_url`` for ``duration``
+    seconds, either closed-loop (``concurrency`` workers back to back) or
+    open-loop at ``rate`` requests/s. In open-loop mode latency is taken
+    from each request's scheduled start, so queueing behind a slow server
+    is counted instead of hidden. Connection failures count as status 0.
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        next_path: Callable[[], str],
+        token: str,
+        duration: float = 30,
+        concurrency: int = 8,
+        rate: Optional[float] = None,
+        timeout: float = 30,
+        interval: float = 5,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        parts = urlsplit(base_url)
+        self.host = parts.hostname or "127.0.0.1"
+        self.port = parts.port or 80
+        self.prefix = parts.path.rstrip("/")
+        self.next_path = next_path
+        self.headers = {"Authorization": f"Bearer {token}"}
+        self.duration = duration
+        self.concurrency = concurrency
+        self.rate = rate
+        self.timeout = timeout
+        self.interval = interval
+        self.clock = clock
+        self.samples: List[Tuple[float, int]] = []  # (latency, status)
+        self._lock = threading.Lock()
+
+    def _request(self, conn: http.client.HTTPConnection, path: str) -> int:
+        try:
+            conn.request("GET", self.prefix + path, headers=self.headers)
+            response = conn.getresponse()
+            response.read()
+            return response.status
+        except (OSError, http.client.HTTPException):
+            conn.close()
+            return 0
+
+    def _record(self, start: float, status: int) -> None:
+        latency = self.clock() - start
+        with self._lock:
+            self.samples.append((latency, status))
+
+    def _closed_worker(self, deadline: float) -> None:
+        conn = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+        while self.clock() < deadline:
+            start = self.clock()
+            self._record(start, self._request(conn, self.next_path()))
+        conn.close()
+
+    def _open_worker(self, jobs: "queue.Queue[Optional[Tuple[float, str]]]") -> None:
+        conn = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+        while (job := jobs.get()) is not None:
+            scheduled, path = job
+            self._record(scheduled, self._request(conn, path))
+        conn.close()
+
+    def run(self, report: Optional[Callable[[dict], None]] = None) -> dict:
+        """Run the test; ``report`` gets a summary per ``interval``."""
+        start = self.clock()
+        deadline = start + self.duration
+        jobs: "queue.Queue[Optional[Tuple[float, str]]]" = queue.Queue()
+        if self.rate:
+            workers = [
+                threading.Thread(target=self._open_worker, args=(jobs,), daemon=True)
+                for _ in range(self.concurrency)
+            ]
+        else:
+            workers = [
+                threading.Thread(
+                    target=self._closed_worker, args=(deadline,), daemon=True
+                )
+                for _ in range(self.concurrency)
+            ]
+        for w in workers:
+            w.start()
+
+        next_report = start + self.interval
+        reported = 0
+        sent = 0
+        while (now := self.clock()) < deadline:
+            if self.rate:
+                due = int((now - start) * self.rate) + 1
+                for i in range(sent, due):
+                    jobs.put((start + i / self.rate, self.next_path()))
+                sent = due
+            if report is not None and now >= next_report:
+                with self._lock:
+                    window = self.samples[reported:]
+                    reported = len(self.samples)
+                report(
+                    {
+                        "elapsed": round(now - start, 3),
+                        **summarize(window, self.interval),
+                    }
+                )
+                next_report += self.interval
+            time.sleep(min(0.01, 1 / self.rate) if self.rate else 0.05)
+        for _ in workers:
+            jobs.put(None)
+        for w in workers:
+            w.join()
+        elapsed = self.clock() - start
+        return summarize(self.samples, elapsed)
@@ -0,0 +1,270 @@
+import decimal
+import hashlib
+import time
+from datetime import datetime
+from datetime import timedelta
+from typing import Dict
+from typing import List
+from typing import Optional
+from typing import Tuple
+from typing import cast
+from sqlalchemy import CursorResult
+from sqlalchemy import delete
+from sqlalchemy import desc
+from sqlalchemy import func
+from sqlalchemy import inspect
+from sqlalchemy import select
+from sqlalchemy import text
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from .algorithms.formatting import to_bytes
+from .config import Config
+from .database import db
+from .models import InputRollup
+from .models import RequestLog
+from .models import RequestRollup
+
+_EPOCH = datetime(1970, 1, 1)
+_next_purge = 0.0
+
+
+# ——— Helpers ———
+def fingerprint(result: int) -> Tuple[str, int]:
+    """SHA-256 of the big-endian bytes (as in format=summary) and bit length."""
+    return hashlib.sha256(to_bytes(result)).hexdigest(), abs(result).bit_length()
+
+
+def log_row(endpoint: str, input_value: str, result: int, timestamp: datetime) -> dict:
+    """
+    A request-log row ready for ``write_logs``. The result is reduced to its
+    fingerprint up front, so queued rows stay small whatever its size.
+    """
+    digest, bits = fingerprint(result)
+    return {
+        "endpoint": endpoint,
+        "input_value": input_value,
+        "result_digest": digest,
+        "result_bits": bits,
+        "timestamp": timestamp,
+    }
+
+
+def bucket_of(ts: datetime) -> datetime:
+    """Start of the STATS_BUCKET_SECONDS-wide bucket containing ts."""
+    width = Config.STATS_BUCKET_SECONDS
+    seconds = int((ts - _EPOCH).total_seconds()) // width * width
+    return _EPOCH + timedelta(seconds=seconds)
+
+
+def _upsert(table, rows: List[dict], counters: List[str]) -> None:
+    if not rows:
+        return
+    stmt = sqlite_insert(table)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[c.name for c in table.primary_key],
+        set_={c: table.c[c] + stmt.excluded[c] for c in counters},
+    )
+    db.session.execute(stmt, rows)
+
+
+# ——— Writes (background log writer thread) ———
+def write_logs(rows: List[dict]) -> None:
+    """
+    Insert ``log_row`` rows and fold them into the rollups, in one
+    transaction.
+    """
+    _store(rows)
+    db.session.commit()
+
+
+def _store(records: List[dict]) -> None:
+    """Insert fingerprinted rows and add them to the rollups (no commit)."""
+    requests: Dict[Tuple[datetime, str, int], List[int]] = {}
+    inputs: Dict[Tuple[datetime, str, str], int] = {}
+    for rec in records:
+        bucket, endpoint = bucket_of(rec["timestamp"]), rec["endpoint"]
+        bits = rec["result_bits"]
+        agg = requests.setdefault((bucket, endpoint, bits.bit_length()), [0, 0])
+        agg[0] += 1
+        agg[1] += bits
+        key = (bucket, endpoint, rec["input_value"])
+        inputs[key] = inputs.get(key, 0) + 1
+
+    db.session.execute(RequestLog.__table__.insert(), records)
+    _upsert(
+        RequestRollup.__table__,
+        [
+            {
+                "bucket": b,
+                "endpoint": e,
+                "size_class": s,
+                "count": c,
+                "total_bits": t,
+            }
+            for (b, e, s), (c, t) in requests.items()
+        ],
+        ["count", "total_bits"],
+    )
+    _upsert(
+        InputRollup.__table__,
+        [
+            {"bucket": b, "endpoint": e, "input_value": i, "count": c}
+            for (b, e, i), c in inputs.items()
+        ],
+        ["count"],
+    )
+
+
+def purge_expired(now: Optional[datetime] = None) -> Dict[str, int]:
+    """Delete raw rows and rollups older than their retention windows."""
+    now = now or datetime.utcnow()
+    log_cutoff = now - timedelta(days=Config.LOG_RETENTION_DAYS)
+    stats_cutoff = now - timedelta(days=Config.STATS_RETENTION_DAYS)
+    deletes = {
+        "request_logs": delete(RequestLog).where(RequestLog.timestamp < log_cutoff),
+        "request_rollups": delete(RequestRollup).where(
+            RequestRollup.bucket < stats_cutoff
+        ),
+        "input_rollups": delete(InputRollup).where(InputRollup.bucket < stats_cutoff),
+    }
+    deleted = {
+        # DML statements return a CursorResult, which has the row count
+        table: cast(CursorResult, db.session.execute(stmt)).rowcount
+        for table, stmt in deletes.items()
+    }
+    db.session.commit()
+    return deleted
+
+
+def purge_if_due() -> None:
+    """Run purge_expired at most every LOG_PURGE_INTERVAL seconds."""
+    global _next_purge
+    if time.monotonic() >= _next_purge:
+        _next_purge = time.monotonic() + Config.LOG_PURGE_INTERVAL
+        purge_expired()
+
+
+# ——— Reads ———
+def query_stats(since: datetime, endpoint: Optional[str], top: int) -> dict:
+    """
+    Aggregate the rollups from the bucket containing ``since`` onwards:
+    per-endpoint counts, a request timeline, result-size classes and the
+    ``top`` hottest inputs.
+    """
+    r = RequestRollup
+    r_where = [r.bucket >= bucket_of(since)]
+    if endpoint is not None:
+        r_where.append(r.endpoint == endpoint)
+    count = func.sum(r.count).label("count")
+    session = db.session
+    return {
+        "endpoints": [
+            {"endpoint": e, "count": c, "total_bits": t}
+            for e, c, t in session.execute(
+                select(r.endpoint, count, func.sum(r.total_bits))
+                .where(*r_where)
+                .group_by(r.endpoint)
+                .order_by(r.endpoint)
+            )
+        ],
+        "timeline": [
+            {"bucket": b, "count": c}
+            for b, c in session.execute(
+                select(r.bucket, count)
+                .where(*r_where)
+                .group_by(r.bucket)
+                .order_by(r.bucket)
+            )
+        ],
+        "result_sizes": [
+            {"endpoint": e, "bits_below": 1 << s, "count": c}
+            for e, s, c in session.execute(
+                select(r.endpoint, r.size_class, count)
+                .where(*r_where)
+                .group_by(r.endpoint, r.size_class)
+                .order_by(r.endpoint, r.size_class)
+            )
+        ],
+        "hot_inputs": hot_inputs(since, endpoint, top),
+    }
+
+
+def hot_inputs(since: datetime, endpoint: Optional[str], top: int) -> List[dict]:
+    """The ``top`` most requested inputs from the bucket containing ``since``."""
+    i = InputRollup
+    where = [i.bucket >= bucket_of(since)]
+    if endpoint is not None:
+        where.append(i.endpoint == endpoint)
+    count = func.sum(i.count).label("count")
+    return [
+        {"endpoint": e, "input": v, "count": c}
+        for e, v, c in db.session.execute(
+            select(i.endpoint, i.input_value, count)
+            .where(*where)
+            .group_by(i.endpoint, i.input_value)
+            .order_by(desc("count"), i.endpoint, i.input_value)
+            .limit(top)
+        )
+    ]
+
+
+# ——— Schema upgrade ———
+def _legacy_fingerprint(value: str) -> Tuple[str, int]:
+    try:
+        # int() refuses very long strings; Decimal has no such limit
+        n = int(decimal.Decimal(value)) if len(value) > 4000 else int(value)
+    except (ValueError, decimal.InvalidOperation):
+        # Not an integer (older service versions): hash the text itself
+        return hashlib.sha256(value.encode()).hexdigest(), 0
+    return fingerprint(n)
+
+
+def upgrade_schema() -> None:
+    """
+    Rebuild a request_logs table that still stores full results.
+
+    SQLite cannot drop or alter columns in place, so the old table is
+    renamed to request_logs_legacy and the current schema created; its
+    rows are then copied as fingerprints (also seeding the rollups) and
+    the old table dropped in one transaction, so an interrupted upgrade
+    resumes on the next start. Call before db.create_all(); a no-op on
+    current schemas.
+    """
+    tables = inspect(db.engine).get_table_names()
+    if "request_logs_legacy" not in tables:
+        if "request_logs" not in tables:
+            return
+        columns = {c["name"] for c in inspect(db.engine).get_columns("request_logs")}
+        if "result_digest" in columns:
+            return
+        with db.engine.begin() as conn:
+            conn.execute(text("ALTER TABLE request_logs RENAME TO request_logs_legacy"))
+    db.create_all()
+    legacy = db.session.execute(
+        text(
+            "SELECT endpoint, input_value, result, timestamp "
+            "FROM request_logs_legacy ORDER BY id"
+        )
+    ).all()
+    records = []
+    for endpoint, input_value, result, ts in legacy:
+        digest, bits = _legacy_fingerprint(str(result))
+        records.append(
+            {
+                "endpoint": endpoint,
+                "input_value": input_value,
+                "result_digest": digest,
+                "result_bits": bits,
+                # Raw SQL returns SQLite's text form; rows may predate the default
+                "timestamp": (
+                    datetime.fromisoformat(ts) if ts is not None else datetime.utcnow()
+                ),
+            }
+        )
+    try:
+        if records:
+            _store(records)
+        db.session.execute(text("DROP TABLE request_logs_legacy"))
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
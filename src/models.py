@@ -10,24 +10,59 @@ from typing import Any
 
 class RequestLog(db.Model, Model):  # type: ignore
     """
-    Model to persist all API math requests and their results.
+    Model to persist all API math requests and a fingerprint of their
+    results (SHA-256 of the big-endian bytes, as in format=summary, plus
+    the bit length) rather than the full value.
     """
 
     __tablename__ = "request_logs"
+    __table_args__ = (
+        db.Index("ix_request_logs_endpoint_timestamp", "endpoint", "timestamp"),
+        db.Index("ix_request_logs_timestamp", "timestamp"),
+    )
 
     id: Any = db.Column(db.Integer, primary_key=True)
     endpoint: Any = db.Column(db.String(50), nullable=False)
     input_value: Any = db.Column(db.String(100), nullable=False)
-    result: Any = db.Column(db.String(100), nullable=False)
+    result_digest: Any = db.Column(db.String(64), nullable=False)
+    result_bits: Any = db.Column(db.Integer, nullable=False)
     timestamp: Any = db.Column(db.DateTime, default=datetime.utcnow)
 
     def __repr__(self) -> str:
         return (
             f"<RequestLog {self.endpoint}({self.input_value}) = "
-            f"{self.result} @ {self.timestamp}>"
+            f"{self.result_digest[:12]}… ({self.result_bits} bits) @ {self.timestamp}>"
         )
 
 
+class RequestRollup(db.Model, Model):  # type: ignore
+    """
+    Request counts per time bucket, endpoint and result size class
+    (size_class k holds results of 2**(k-1) <= bits < 2**k).
+    """
+
+    __tablename__ = "request_rollups"
+
+    bucket: Any = db.Column(db.DateTime, primary_key=True)
+    endpoint: Any = db.Column(db.String(50), primary_key=True)
+    size_class: Any = db.Column(db.Integer, primary_key=True)
+    count: Any = db.Column(db.Integer, nullable=False, default=0)
+    total_bits: Any = db.Column(db.BigInteger, nullable=False, default=0)
+
+
+class InputRollup(db.Model, Model):  # type: ignore
+    """
+    Request counts per time bucket, endpoint and input (hot inputs).
+    """
+
+    __tablename__ = "input_rollups"
+
+    bucket: Any = db.Column(db.DateTime, primary_key=True)
+    endpoint: Any = db.Column(db.String(50), primary_key=True)
+    input_value: Any = db.Column(db.String(100), primary_key=True)
+    count: Any = db.Column(db.Integer, nullable=False, default=0)
+
+
 class User(db.Model, Model):  # type: ignore
     """
     User model for authentication and JWT login.
@@ -1,5 +1,14 @@
+from datetime import datetime
 from pydantic import BaseModel
 from pydantic import conint
+from pydantic import conlist
+from pydantic import model_validator
+from typing import Any
+from typing import Dict
+from typing import List
+from typing import Literal
+from typing import Optional
+from .config import Config
 
 
 class LoginInput(BaseModel):
@@ -14,11 +23,104 @@ class LoginOutput(BaseModel):
 class PowInput(BaseModel):
     base: int
     exp: int
+    mod: Optional[conint(ge=1)] = None
 
 
 class NInput(BaseModel):
     n: conint(ge=0)
+    mod: Optional[conint(ge=1)] = None
+
+
+class RangeInput(BaseModel):
+    start: conint(ge=0)
+    end: conint(ge=0)
+
+    @model_validator(mode="after")
+    def check_bounds(self):
+        if self.end < self.start:
+            raise ValueError("'end' must be >= 'start'")
+        if self.end - self.start + 1 > Config.RANGE_MAX_TERMS:
+            raise ValueError(f"At most {Config.RANGE_MAX_TERMS} terms per request")
+        return self
 
 
 class ResultOutput(BaseModel):
     result: int
+
+
+ResultFormat = Literal["dec", "hex", "base64-bytes", "summary"]
+
+
+class FormatInput(BaseModel):
+    format: ResultFormat = "dec"
+
+
+class EncodedResultOutput(BaseModel):
+    result: str
+    format: ResultFormat
+
+
+class ResultSummaryOutput(BaseModel):
+    format: Literal["summary"] = "summary"
+    sign: int
+    bit_length: int
+    digits: int
+    leading_digits: str
+    trailing_digits: str
+    sha256: str
+
+
+class BatchItemInput(BaseModel):
+    op: Literal["pow", "fib", "factorial"]
+    args: Dict[str, Any]
+
+
+class BatchInput(BaseModel):
+    items: conlist(BatchItemInput, min_length=1, max_length=Config.BATCH_MAX_ITEMS)
+
+
+class BatchItemOutput(BaseModel):
+    result: Optional[int] = None
+    error: Optional[str] = None
+
+
+class BatchOutput(BaseModel):
+    results: List[BatchItemOutput]
+
+
+class StatsInput(BaseModel):
+    hours: conint(ge=1, le=int(Config.STATS_RETENTION_DAYS * 24)) = 24
+    endpoint: Optional[Literal["pow", "fib", "factorial"]] = None
+    top: conint(ge=1, le=Config.STATS_MAX_TOP) = 10
+
+
+class EndpointStats(BaseModel):
+    endpoint: str
+    count: int
+    total_bits: int
+
+
+class TimelineBucket(BaseModel):
+    bucket: datetime
+    count: int
+
+
+class ResultSizeBucket(BaseModel):
+    endpoint: str
+    bits_below: int
+    count: int
+
+
+class HotInput(BaseModel):
+    endpoint: str
+    input: str
+    count: int
+
+
+class StatsOutput(BaseModel):
+    since: datetime
+    bucket_seconds: int = Config.STATS_BUCKET_SECONDS
+    endpoints: List[EndpointStats]
+    timeline: List[TimelineBucket]
+    result_sizes: List[ResultSizeBucket]
+    hot_inputs: List[HotInput]
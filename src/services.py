@@ -1,67 +1,497 @@
-from .utils.cache import RedisCache
+import threading
+from contextvars import ContextVar
+from datetime import datetime
+from datetime import timedelta
+from flask import current_app
+from typing import Any
+from typing import Callable
+from typing import Dict
+from typing import Iterator
+from typing import List
+from typing import Optional
+from typing import Tuple
 from typing import Union
 from .config import Config
+from .utils.checkpoints import CheckpointLadder
+from .utils.circuit_breaker import CircuitBreaker
+from .utils.cache import LRUCache
+from .utils.cache import RedisCache
+from .utils.cache import TieredCache
+from .utils.codec import IntCodec
+from .utils.codec import SizeAwareTTL
+from .utils.compute_pool import ComputeError
+from .utils.compute_pool import ComputePool
 from .utils.kafka_logger import KafkaLogger
-from .models import RequestLog
-from .database import db
+from .utils.instrument import count_lookup
+from .utils.instrument import observe_result
+from .utils.instrument import stage
+from .utils.log_writer import BatchLogWriter
+from .utils.singleflight import SingleFlight
+from .utils.tables import ResultTable
+from .utils.tables import load_table
+from .log_store import log_row
+from .log_store import purge_if_due
+from .log_store import query_stats
+from .log_store import write_logs
+from .algorithms.cost import fact_bits
+from .algorithms.cost import fact_mod_bits
+from .algorithms.cost import fib_bits
+from .algorithms.cost import fib_mod_bits
+from .algorithms.cost import pow_bits
+from .algorithms.cost import pow_mod_bits
+from .algorithms.cost import range_bits
+from .algorithms.factorial import factorial_many
+from .algorithms.fibonacci import fib_pair
+from .algorithms.fibonacci import fibonacci_many
+from .algorithms.formatting import to_hex
+from .algorithms.modular import fact_mod
+from .algorithms.modular import fib_mod
+from .algorithms.modular import pow_mod
+from .algorithms.power import power
+from .algorithms.power import power_many
 
 # ——— Initialize Redis & Kafka ———
 # cache = redis.Redis.from_url(Config.REDIS_URL)
-cache = RedisCache(Config.REDIS_URL)
-kafka = KafkaLogger(bootstrap_servers=Config.KAFKA_BOOTSTRAP)
+cache = TieredCache(
+    LRUCache(Config.L1_CACHE_MAX_BYTES, Config.L1_CACHE_MAX_ITEM_BYTES),
+    RedisCache(
+        Config.REDIS_URL,
+        socket_timeout=Config.REDIS_SOCKET_TIMEOUT,
+        connect_timeout=Config.REDIS_CONNECT_TIMEOUT,
+        max_connections=Config.REDIS_MAX_CONNECTIONS,
+        breaker=CircuitBreaker(
+            "redis",
+            failure_threshold=Config.REDIS_BREAKER_FAILURES,
+            base_backoff=Config.REDIS_BREAKER_BACKOFF,
+            max_backoff=Config.REDIS_BREAKER_MAX_BACKOFF,
+        ),
+    ),
+    codec=IntCodec(Config.CACHE_COMPRESS_THRESHOLD, Config.CACHE_COMPRESSION),
+    ttl_policy=SizeAwareTTL(
+        Config.CACHE_SMALL_VALUE_BYTES,
+        Config.CACHE_TTL_SMALL,
+        Config.CACHE_TTL_LARGE,
+        Config.CACHE_MAX_VALUE_BYTES,
+    ),
+)
+kafka = KafkaLogger(
+    bootstrap_servers=Config.KAFKA_BOOTSTRAP,
+    client_id=Config.KAFKA_CLIENT_ID,
+    linger_ms=Config.KAFKA_LINGER_MS,
+    batch_size=Config.KAFKA_BATCH_SIZE,
+    max_block_ms=Config.KAFKA_MAX_BLOCK_MS,
+    spill_size=Config.KAFKA_SPILL_SIZE,
+    retry_backoff=Config.KAFKA_RETRY_BACKOFF,
+    api_version=Config.KAFKA_API_VERSION,
+    api_version_auto_timeout_ms=Config.KAFKA_API_VERSION_TIMEOUT_MS,
+)
+# Cheap calls run inline, expensive ones in a bounded process pool
+compute_pool = ComputePool(
+    inline_max_bits=Config.COMPUTE_INLINE_MAX_BITS,
+    max_bits=Config.COMPUTE_MAX_BITS,
+    workers=Config.COMPUTE_POOL_WORKERS,
+    max_pending=Config.COMPUTE_POOL_MAX_PENDING,
+    cpu_seconds=Config.COMPUTE_CPU_SECONDS,
+    memory_bytes=Config.COMPUTE_MEMORY_BYTES,
+    timeout=Config.COMPUTE_TIMEOUT,
+)
+# Concurrent requests for the same uncached key share one computation
+singleflight = SingleFlight(
+    cache,
+    lease_ttl=Config.SINGLEFLIGHT_LEASE_TTL,
+    wait_timeout=Config.SINGLEFLIGHT_WAIT_TIMEOUT,
+    poll_interval=Config.SINGLEFLIGHT_POLL_INTERVAL,
+    lease_min_bits=Config.SINGLEFLIGHT_LEASE_MIN_BITS,
+)
+# Large fib/factorial misses resume from sparse cached checkpoints
+checkpoints = CheckpointLadder(
+    cache,
+    compute_pool,
+    step=Config.CHECKPOINT_STEP,
+    probe=Config.CHECKPOINT_PROBE,
+    max_new=Config.CHECKPOINT_MAX_NEW,
+    min_n=Config.CHECKPOINT_MIN_N,
+)
+# Small fib/factorial results come straight from the shared mmap'ed table,
+# opened (and CRC-checked) on first use rather than at import
+_UNLOADED: Any = object()
+tables: Optional[ResultTable] = _UNLOADED
+_tables_lock = threading.Lock()
+
+# Set by the ASGI app around executor calls: send(topic, message) for Kafka records
+kafka_sink: ContextVar[Optional[Callable[[str, dict], None]]] = ContextVar(
+    "kafka_sink", default=None
+)
+
+_log_writer: Optional[BatchLogWriter] = None
+_log_writer_lock = threading.Lock()
+
+
+def _get_log_writer() -> BatchLogWriter:
+    """Create the background log writer bound to the current app."""
+    global _log_writer
+    if _log_writer is None:
+        with _log_writer_lock:
+            if _log_writer is None:
+                app = current_app._get_current_object()  # type: ignore[attr-defined]
+
+                def sink(rows: List[dict]) -> None:
+                    with app.app_context():
+                        with stage("db_write"):
+                            write_logs(rows)
+                        with stage("db_purge"):
+                            purge_if_due()
+
+                _log_writer = BatchLogWriter(
+                    sink,
+                    max_queue=Config.LOG_QUEUE_SIZE,
+                    batch_size=Config.LOG_BATCH_SIZE,
+                    flush_interval=Config.LOG_FLUSH_INTERVAL,
+                    overflow=Config.LOG_OVERFLOW_POLICY,
+                    sample_rate=Config.LOG_SAMPLE_RATE,
+                )
+    return _log_writer
 
 
 # ——— Helper: log to DB + Kafka ———
-def _log_request(endpoint: str, inp: str, result: Union[int, str]):
-    # Persist to SQL
-    log = RequestLog(endpoint=endpoint, input_value=inp, result=str(result))
-    db.session.add(log)
-    db.session.commit()
-    # Stream to Kafka
-    kafka.send(
-        "request_logs", {"endpoint": endpoint, "input": inp, "result": str(result)}
-    )
+def _log_request(endpoint: str, inp: str, result: int):
+    # Persist to SQL: fingerprinted here so queued rows have a fixed, small
+    # size, then rolled up and group-committed in the background
+    _get_log_writer().submit(log_row(endpoint, inp, result, datetime.utcnow()))
+    # Stream to Kafka (or to the async producer of the ASGI app calling us).
+    # Hex is linear in the size of the result; decimal would not be.
+    with stage("kafka_send", endpoint):
+        message = {"endpoint": endpoint, "input": inp, "result_hex": to_hex(result)}
+        send = kafka_sink.get()
+        if send is not None:
+            send("request_logs", message)
+        else:
+            kafka.send("request_logs", message)
 
 
-# ——— Power function ———
-def pow_service(base: int, exp: int) -> int:
-    key = f"pow:{base}:{exp}"
+# ——— Helper: cache → single-flight → compute → cache & log ———
+def _cached_compute(
+    endpoint: str,
+    key: str,
+    log_input: str,
+    cost: int,
+    fn: Callable,
+    *args,
+    offload: bool = True,
+) -> int:
+    op = key.split(":", 1)[0]
+    # 0) Reject hopeless inputs before any work
+    compute_pool.check(cost)
     # 1) Try cache
-    # if (cached := cache.get(key)) is not None:
-    # return int(cached)
-
-    if (cached := cache.get(key)) is not None:
-        return int(cached)
-    # 2) Compute
-    result = base**exp
-    # 3) Cache & log
-    cache.set(key, result)
-    _log_request("pow", f"{base},{exp}", result)
-    return result
-
-
-# ——— Nth Fibonacci (iterative) ———
-def fib_service(n: int) -> int:
-    key = f"fib:{n}"
-    if (cached := cache.get(key)) is not None:
-        return int(cached)
-    a, b = 0, 1
-    for _ in range(n):
+    with stage("cache_get", op):
+        cached = cache.get_int(key)
+    if cached is not None:
+        count_lookup(op, "hit")
+        return observe_result(op, cached)
+    count_lookup(op, "miss")
+
+    # 2) Compute (once per key across concurrent callers), then cache & log
+    def compute() -> int:
+        # fn either runs through the pool or, with offload=False, does so itself
+        with stage("compute", op):
+            result = compute_pool.run(cost, fn, *args) if offload else fn(*args)
+        with stage("cache_set", op):
+            cache.set_int(key, result)
+        _log_request(endpoint, log_input, result)
+        return result
+
+    return observe_result(op, singleflight.do(key, cost, compute))
+
+
+# ——— Single-value requests ———
+def request_plan(
+    endpoint: str, args: Tuple[int, ...], mod: Optional[int] = None
+) -> Tuple[str, str, int]:
+    """(cache key, log input, estimated bits) of a pow / fib / factorial request."""
+    if endpoint == "pow":
+        base, exp = args
+        if mod is not None:
+            return (
+                f"powmod:{base}:{exp}:{mod}",
+                f"{base},{exp} mod {mod}",
+                pow_mod_bits(base, exp, mod),
+            )
+        return f"pow:{base}:{exp}", f"{base},{exp}", pow_bits(base, exp)
+    (n,) = args
+    if endpoint == "fib":
+        prefix, bits, mod_bits = "fib", fib_bits, fib_mod_bits
+    else:
+        prefix, bits, mod_bits = "fact", fact_bits, fact_mod_bits
+    if mod is not None:
+        return f"{prefix}mod:{n}:{mod}", f"{n} mod {mod}", mod_bits(n, mod)
+    return f"{prefix}:{n}", str(n), bits(n)
+
+
+def get_tables() -> Optional[ResultTable]:
+    """The precomputed result table, loaded on the first call (None if absent)."""
+    global tables
+    if tables is _UNLOADED:
+        with _tables_lock:
+            if tables is _UNLOADED:
+                tables = load_table(
+                    Config.TABLE_PATH,
+                    Config.TABLE_FIB_MAX,
+                    Config.TABLE_FACT_MAX,
+                    verify=Config.TABLE_VERIFY,
+                )
+    return tables
+
+
+def table_lookup(
+    op: str, args: Tuple[int, ...], mod: Optional[int] = None
+) -> Optional[int]:
+    """The precomputed fib / factorial result (reduced by ``mod``), if any."""
+    tables = get_tables()
+    if tables is None or op == "pow":
+        return None
+    value = tables.fib(args[0]) if op == "fib" else tables.factorial(args[0])
+    return value if value is None or mod is None else value % mod
+
+
+# ——— Power function ———
+def pow_service(base: int, exp: int, mod: Optional[int] = None) -> int:
+    plan = request_plan("pow", (base, exp), mod)
+    if mod is not None:
+        return _cached_compute("pow", *plan, pow_mod, base, exp, mod)
+    return _cached_compute("pow", *plan, power, base, exp)
+
+
+# ——— Nth Fibonacci (fast doubling) ———
+def fib_service(n: int, mod: Optional[int] = None) -> int:
+    if (value := table_lookup("fib", (n,), mod)) is not None:
+        count_lookup("fib", "table")
+        return observe_result("fib", value)
+    plan = request_plan("fib", (n,), mod)
+    if mod is not None:
+        return _cached_compute("fib", *plan, fib_mod, n, mod)
+    return _cached_compute("fib", *plan, checkpoints.fibonacci, n, offload=False)
+
+
+# ——— Factorial (binary splitting) ———
+def fact_service(n: int, mod: Optional[int] = None) -> int:
+    if (value := table_lookup("factorial", (n,), mod)) is not None:
+        count_lookup("fact", "table")
+        return observe_result("fact", value)
+    plan = request_plan("factorial", (n,), mod)
+    if mod is not None:
+        return _cached_compute("factorial", *plan, fact_mod, n, mod)
+    return _cached_compute("factorial", *plan, checkpoints.factorial, n, offload=False)
+
+
+# ——— Sequence ranges (streamed) ———
+def _fib_terms(start: int, end: int, a: int, b: int) -> Iterator[Tuple[int, int]]:
+    for k in range(start, end + 1):
+        yield k, a
         a, b = b, a + b
-    result = a
-    cache.set(key, result)
-    _log_request("fib", str(n), result)
-    return result
-
-
-# ——— Factorial ———
-def fact_service(n: int) -> int:
-    key = f"fact:{n}"
-    if (cached := cache.get(key)) is not None:
-        return int(cached)
-    result = 1
-    for i in range(2, n + 1):
-        result *= i
-    cache.set(key, result)
-    _log_request("factorial", str(n), result)
-    return result
+
+
+def _fact_terms(start: int, end: int, value: int) -> Iterator[Tuple[int, int]]:
+    for k in range(start, end + 1):
+        if k > start:
+            value *= k
+        yield k, value
+
+
+def fib_range_service(start: int, end: int) -> Iterator[Tuple[int, int]]:
+    """
+    Return an iterator of (k, F(k)) for start <= k <= end.
+
+    Admission (priced on every term streamed) and the starting pair are
+    handled eagerly; the returned iterator keeps only the current pair in
+    memory, each term being one addition away from the previous one.
+    """
+    compute_pool.check(range_bits(fib_bits, start, end))
+    tables = get_tables()
+    if tables is not None:
+        a, b = tables.fib(start), tables.fib(start + 1)
+        if a is not None and b is not None:
+            return _fib_terms(start, end, a, b)
+    cached = cache.get_many_int([f"fib:{start}", f"fib:{start + 1}"])
+    if len(cached) == 2:
+        a, b = cached[f"fib:{start}"], cached[f"fib:{start + 1}"]
+    else:
+        a, b = compute_pool.run(fib_bits(start), fib_pair, start)
+    return _fib_terms(start, end, a, b)
+
+
+def fact_range_service(start: int, end: int) -> Iterator[Tuple[int, int]]:
+    """
+    Return an iterator of (k, k!) for start <= k <= end, one
+    multiplication per term, admitted on the size of the whole range.
+    """
+    compute_pool.check(range_bits(fact_bits, start, end))
+    tables = get_tables()
+    value = tables.factorial(start) if tables is not None else None
+    if value is None:
+        value = cache.get_int(f"fact:{start}")
+    if value is None:
+        value = checkpoints.factorial(start)
+    return _fact_terms(start, end, value)
+
+
+# ——— Request statistics ———
+def stats_service(hours: int, endpoint: Optional[str], top: int) -> dict:
+    """Counts, hot inputs and result sizes over the last ``hours`` (rollups only)."""
+    since = datetime.utcnow() - timedelta(hours=hours)
+    return {"since": since, **query_stats(since, endpoint, top)}
+
+
+# ——— Batch evaluation ———
+BatchItem = Tuple[str, Tuple[int, ...]]
+
+
+def _batch_key(op: str, args: Tuple[int, ...]) -> str:
+    if op == "pow":
+        return f"pow:{args[0]}:{args[1]}"
+    if op == "fib":
+        return f"fib:{args[0]}"
+    return f"fact:{args[0]}"
+
+
+def _batch_cost(op: str, args: Tuple[int, ...]) -> int:
+    if op == "pow":
+        return pow_bits(args[0], args[1])
+    if op == "fib":
+        return fib_bits(args[0])
+    return fact_bits(args[0])
+
+
+def _cost_chunks(
+    op: str, group: Dict[str, Tuple[int, ...]]
+) -> Iterator[Tuple[int, Dict[str, Tuple[int, ...]]]]:
+    """
+    Split a group into (cost, items) runs of ascending inputs whose summed
+    cost stays under the pool's hard limit (each item already passed it).
+    """
+    chunk: Dict[str, Tuple[int, ...]] = {}
+    total = 0
+    for key, args in sorted(group.items(), key=lambda item: item[1]):
+        cost = _batch_cost(op, args)
+        if chunk and total + cost > compute_pool.max_bits:
+            yield total, chunk
+            chunk, total = {}, 0
+        chunk[key] = args
+        total += cost
+    if chunk:
+        yield total, chunk
+
+
+def _batch_log_input(op: str, args: Tuple[int, ...]) -> str:
+    return f"{args[0]},{args[1]}" if op == "pow" else str(args[0])
+
+
+def batch_service(items: List[BatchItem]) -> List[Union[int, ComputeError]]:
+    """
+    Evaluate several (op, args) items at once.
+
+    Table hits are answered first, the cache is checked with a single
+    MGET, duplicate items are computed once, and misses of the same
+    operation share work (running products for factorials, doubling steps
+    for Fibonacci, lower powers for pow).
+    Results are returned in request order; items that fail admission or
+    computation get the ComputeError instead of a value.
+    """
+    keys = [_batch_key(op, args) for op, args in items]
+    outcomes: Dict[str, Union[int, ComputeError]] = {}
+    for key, (op, args) in zip(keys, items):
+        try:
+            compute_pool.check(_batch_cost(op, args))
+        except ComputeError as e:
+            outcomes[key] = e
+    for key, (op, args) in zip(keys, items):
+        if key not in outcomes and (value := table_lookup(op, args)) is not None:
+            outcomes[key] = value
+    lookup = [key for key in dict.fromkeys(keys) if key not in outcomes]
+    with stage("cache_get", "batch"):
+        outcomes.update(cache.get_many_int(lookup))
+    todo = {
+        key: (op, args) for key, (op, args) in zip(keys, items) if key not in outcomes
+    }
+
+    groups: Dict[str, Tuple[Callable, Callable]] = {
+        "factorial": (factorial_many, lambda args: args[0]),
+        "fib": (fibonacci_many, lambda args: args[0]),
+        "pow": (power_many, lambda args: (args[0], args[1])),
+    }
+    computed: Dict[str, int] = {}
+    for op, (many_fn, arg_of) in groups.items():
+        group = {key: args for key, (o, args) in todo.items() if o == op}
+        if not group:
+            continue
+        for cost, chunk in _cost_chunks(op, group):
+            try:
+                with stage("compute", f"batch:{op}"):
+                    values = compute_pool.run(
+                        cost, many_fn, [arg_of(args) for args in chunk.values()]
+                    )
+            except ComputeError as e:
+                outcomes.update({key: e for key in chunk})
+                continue
+            for key, args in chunk.items():
+                computed[key] = values[arg_of(args)]
+
+    with stage("cache_set", "batch"):
+        cache.set_many_int(computed)
+    for key, value in computed.items():
+        op, args = todo[key]
+        _log_request(op, _batch_log_input(op, args), value)
+
+    outcomes.update(computed)
+    return [outcomes[key] for key in keys]
+
+
+# ——— Process lifecycle (pre-fork server) ———
+def warm_cache(items: List[BatchItem], max_bits: int) -> int:
+    """
+    Load (op, args) items into L1 ahead of traffic, without logging.
+
+    Table hits are skipped and cached values are fetched with one MGET;
+    misses small enough for an L1 entry are computed inline, cheapest
+    first, until ``max_bits`` of results have been produced. Returns how
+    many items are now in L1.
+    """
+    todo = {
+        _batch_key(op, args): (op, args)
+        for op, args in items
+        if table_lookup(op, args) is None
+    }
+    found = cache.get_many_int(list(todo))
+    # Larger results would be computed in the master only to be refused by L1
+    max_item_bits = cache.l1.max_item_bytes * 8
+    missing = sorted(
+        (
+            key
+            for key in todo
+            if key not in found and _batch_cost(*todo[key]) <= max_item_bits
+        ),
+        key=lambda key: _batch_cost(*todo[key]),
+    )
+    many_fns: Dict[str, Callable] = {
+        "factorial": factorial_many,
+        "fib": fibonacci_many,
+        "pow": power_many,
+    }
+    budget = max_bits
+    computed: Dict[str, int] = {}
+    for key in missing:
+        op, args = todo[key]
+        budget -= _batch_cost(op, args)
+        if budget < 0:
+            break
+        arg = (args[0], args[1]) if op == "pow" else args[0]
+        computed[key] = many_fns[op]([arg])[arg]
+    cache.set_many_int(computed)
+    return sum(key in cache.l1 for key in (*found, *computed))
+
+
+def shutdown(timeout: float = 5.0) -> None:
+    """Drain the request-log queue and Kafka buffers, then stop the pool."""
+    if _log_writer is not None:
+        _log_writer.close(timeout)
+    kafka.close(timeout)
+    compute_pool.shutdown()
@@ -0,0 +1,102 @@
+"""
+Process hooks for the pre-fork production server (gunicorn.conf.py).
+
+The app is built once in the master (src/wsgi.py) and warmed there, so
+the forked workers start with the result table mapped, the hottest
+results in L1 and a frozen heap they share copy-on-write. Workers are
+recycled after SERVE_MAX_REQUESTS requests (by gunicorn) or once their
+RSS passes SERVE_MAX_RSS_MB (here), and drain the request-log queue and
+Kafka buffers on their way out.
+"""
+
+import gc
+import logging
+import resource
+from datetime import datetime
+from datetime import timedelta
+from typing import List
+from typing import Optional
+from flask import Flask
+from . import services
+from .config import Config
+from .database import db
+from .log_store import hot_inputs
+
+logger = logging.getLogger(__name__)
+
+
+def rss_bytes() -> int:
+    """Resident set size of this process (0 where /proc is unavailable)."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * resource.getpagesize()
+    except (OSError, ValueError, IndexError):
+        return 0
+
+
+def parse_input(endpoint: str, input_value: str) -> Optional[services.BatchItem]:
+    """Turn a request_logs (endpoint, input) pair into a batch item, or None."""
+    if " mod " in input_value:
+        return None
+    try:
+        args = tuple(int(x) for x in input_value.split(","))
+    except ValueError:
+        return None
+    if endpoint == "pow" and len(args) == 2 and args[1] >= 0:
+        return "pow", args
+    if endpoint in ("fib", "factorial") and len(args) == 1 and args[0] >= 0:
+        return endpoint, args
+    return None
+
+
+def hot_items(hours: float, top: int) -> List[services.BatchItem]:
+    """The most requested plain (non-modular) inputs of the last ``hours``."""
+    since = datetime.utcnow() - timedelta(hours=hours)
+    items = (
+        parse_input(h["endpoint"], h["input"]) for h in hot_inputs(since, None, top)
+    )
+    return [item for item in items if item is not None]
+
+
+# ——— Master: before fork ———
+def warm(app: Flask) -> dict:
+    """
+    Map the result table, prime L1 with recently hot inputs, close
+    inherited DB connections and freeze the heap, so workers share all of
+    it instead of copying pages as the collector touches them.
+    """
+    with app.app_context():
+        items = hot_items(Config.WARM_HOURS, Config.WARM_TOP) if Config.WARM_TOP else []
+        warmed = services.warm_cache(items, Config.WARM_MAX_BITS)
+        db.engine.dispose()
+    gc.freeze()
+    summary = {
+        "table": services.get_tables() is not None,
+        "hot_inputs": len(items),
+        "warmed": warmed,
+    }
+    logger.info("Warmed app before fork: %s", summary)
+    return summary
+
+
+# ——— Worker hooks ———
+def post_request(worker, req, environ, resp) -> None:
+    """Retire the worker after this request once it exceeds SERVE_MAX_RSS_MB."""
+    limit = Config.SERVE_MAX_RSS_MB * 1024 * 1024
+    if not limit or not worker.alive:
+        return
+    rss = rss_bytes()
+    if rss > limit:
+        logger.warning(
+            "Worker %s at %d MiB RSS (limit %d MiB); recycling",
+            worker.pid,
+            rss // (1024 * 1024),
+            Config.SERVE_MAX_RSS_MB,
+        )
+        # gthread workers finish in-flight requests, then exit; the master forks anew
+        worker.alive = False
+
+
+def worker_exit(server, worker) -> None:
+    """Flush buffered request logs and Kafka messages before the worker dies."""
+    services.shutdown(Config.SERVE_DRAIN_TIMEOUT)
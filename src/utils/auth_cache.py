@@ -0,0 +1,211 @@
+"""
+Caches and throttling on the authentication path.
+
+TTLCache       bounded LRU with per-entry expiry (user records for login)
+ClaimsCache    verified JWT claims keyed by token digest, never kept past
+               the token's own ``exp``
+LoginThrottle  per-username lockout after repeated failed logins, checked
+               before the user lookup and the (deliberately slow) hash check
+"""
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Any
+from typing import Callable
+from typing import Hashable
+from typing import List
+from typing import Optional
+from typing import Tuple
+from flask_jwt_extended import JWTManager
+from .metrics import AUTH_CACHE_ENTRIES
+from .metrics import AUTH_CACHE_EVENTS
+from .metrics import LOGIN_ATTEMPTS
+
+
+class TTLCache:
+    """Thread-safe LRU of at most ``max_entries`` items, each expiring after ``ttl``."""
+
+    def __init__(
+        self,
+        name: str,
+        max_entries: int,
+        ttl: float,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.name = name
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._events = {
+            event: AUTH_CACHE_EVENTS.labels(cache=name, event=event)
+            for event in ("hit", "miss", "expired", "eviction")
+        }
+        self._size = AUTH_CACHE_ENTRIES.labels(cache=name)
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] <= self._clock():
+                del self._entries[key]
+                self._size.set(len(self._entries))
+                self._events["expired"].inc()
+                entry = None
+            if entry is None:
+                self._events["miss"].inc()
+                return None
+            self._entries.move_to_end(key)
+        self._events["hit"].inc()
+        return entry[1]
+
+    def put(
+        self, key: Hashable, value: Any, expires_at: Optional[float] = None
+    ) -> None:
+        """Store ``value`` until ``ttl`` from now, or ``expires_at`` if sooner."""
+        if self.max_entries <= 0:
+            return
+        expires = self._clock() + self.ttl
+        if expires_at is not None:
+            expires = min(expires, expires_at)
+        with self._lock:
+            self._entries[key] = (expires, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._events["eviction"].inc()
+            self._size.set(len(self._entries))
+
+    def invalidate(self, key: Hashable) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+            self._size.set(len(self._entries))
+
+
+class ClaimsCache(TTLCache):
+    """
+    Verified JWT claims by SHA-256 of the encoded token. Entries expire
+    after ``ttl`` or at the token's ``exp`` claim, whichever is first, so
+    an expired token is always re-verified (and rejected) by the library.
+    """
+
+    def __init__(
+        self,
+        max_entries: int,
+        ttl: float,
+        clock: Callable[[], float] = time.time,  # ``exp`` is wall-clock time
+    ):
+        super().__init__("jwt_claims", max_entries, ttl, clock)
+
+    @staticmethod
+    def _digest(token: str) -> bytes:
+        return hashlib.sha256(token.encode()).digest()
+
+    def get_claims(self, token: str) -> Optional[dict]:
+        claims = self.get(self._digest(token))
+        return None if claims is None else dict(claims)
+
+    def put_claims(self, token: str, claims: dict) -> None:
+        exp = claims.get("exp")
+        expires_at = float(exp) if isinstance(exp, (int, float)) else None
+        self.put(self._digest(token), dict(claims), expires_at)
+
+
+class CachingJWTManager(JWTManager):
+    """
+    JWTManager that verifies each distinct token once per cache entry.
+
+    Only signature and registered-claim checks are cached; token type,
+    freshness and blocklist checks still run on every request.
+
+    The library has no public hook around verification (``decode_token``
+    and the view decorators call ``_decode_jwt_from_config``), so this
+    overrides that method; flask-jwt-extended is pinned in requirements.txt
+    and tests/test_auth_cache.py checks the signature it relies on.
+    """
+
+    def __init__(self, app=None, claims_cache: Optional[ClaimsCache] = None, **kwargs):
+        self.claims_cache = claims_cache
+        super().__init__(app, **kwargs)
+
+    def _decode_jwt_from_config(
+        self, encoded_token: str, csrf_value=None, allow_expired: bool = False
+    ) -> dict:
+        if self.claims_cache is None or csrf_value is not None or allow_expired:
+            return super()._decode_jwt_from_config(
+                encoded_token, csrf_value, allow_expired
+            )
+        claims = self.claims_cache.get_claims(encoded_token)
+        if claims is None:
+            claims = super()._decode_jwt_from_config(encoded_token)
+            self.claims_cache.put_claims(encoded_token, claims)
+        return claims
+
+
+class LoginThrottle:
+    """
+    Per-username failed-login lockout.
+
+    ``max_failures`` failures, each within ``window`` seconds of the
+    previous one, lock the username for ``lockout`` seconds, doubling with
+    every further failure up to ``max_lockout``. A successful login clears
+    the record. At most ``max_entries`` usernames are tracked (least
+    recently failed dropped).
+    """
+
+    def __init__(
+        self,
+        max_failures: int = 5,
+        window: float = 300.0,
+        lockout: float = 30.0,
+        max_lockout: float = 300.0,
+        max_entries: int = 100_000,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.max_failures = max(1, max_failures)
+        self.window = window
+        self.lockout = lockout
+        self.max_lockout = max_lockout
+        self.max_entries = max_entries
+        self._clock = clock
+        self._lock = threading.Lock()
+        # username -> [last failure, failures, locked until]
+        self._entries: "OrderedDict[str, List[float]]" = OrderedDict()
+        self._outcomes = {
+            outcome: LOGIN_ATTEMPTS.labels(outcome=outcome)
+            for outcome in ("success", "failure", "throttled")
+        }
+
+    def retry_after(self, username: str) -> float:
+        """Seconds until ``username`` may try again (0 if allowed now)."""
+        with self._lock:
+            entry = self._entries.get(username)
+            wait = entry[2] - self._clock() if entry is not None else 0.0
+        if wait > 0:
+            self._outcomes["throttled"].inc()
+            return wait
+        return 0.0
+
+    def record_failure(self, username: str) -> None:
+        self._outcomes["failure"].inc()
+        now = self._clock()
+        with self._lock:
+            entry = self._entries.get(username)
+            if entry is None or now - entry[0] > self.window:
+                entry = self._entries[username] = [now, 0, 0.0]
+            entry[0] = now
+            entry[1] += 1
+            if entry[1] >= self.max_failures:
+                extra = min(entry[1] - self.max_failures, 30)
+                entry[2] = now + min(self.max_lockout, self.lockout * 2**extra)
+            self._entries.move_to_end(username)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def record_success(self, username: str) -> None:
+        self._outcomes["success"].inc()
+        if username in self._entries:
+            with self._lock:
+                self._entries.pop(username, None)
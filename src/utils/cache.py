@@ -1,37 +1,431 @@
 import redis
+import sys
+import threading
+from collections import OrderedDict
 from redis import Redis
 from redis.exceptions import RedisError
+from typing import Any
+from typing import Dict
+from typing import List
 from typing import Optional
+from typing import Tuple
+from typing import TYPE_CHECKING
+from typing import cast
+from .circuit_breaker import CircuitBreaker
+from .codec import IntCodec
+from .codec import SizeAwareTTL
+from .metrics import CACHE_L1_BYTES
+from .metrics import CACHE_L1_EVENTS
+
+if TYPE_CHECKING:
+    import redis.asyncio
+
+# Delete the lease only if we still own it (compare-and-delete)
+_RELEASE_LEASE_SCRIPT = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("del", KEYS[1])
+end
+return 0
+"""
 
 
 class RedisCache:
-    def __init__(self, url: str):
+    """
+    Redis-backed cache that degrades to a no-op when Redis is unavailable.
+
+    All calls share one connection pool. A circuit breaker stops each
+    request from paying connection timeouts during an outage; reconnects
+    are attempted as single probes with exponential backoff.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        socket_timeout: Optional[float] = None,
+        connect_timeout: Optional[float] = None,
+        max_connections: Optional[int] = None,
+        breaker: Optional[CircuitBreaker] = None,
+    ):
         self.url = url
+        self.socket_timeout = socket_timeout
+        self.connect_timeout = connect_timeout
+        self.max_connections = max_connections
+        self.breaker = breaker or CircuitBreaker("redis")
         self._client: Optional[Redis] = None
 
     def _ensure_client(self) -> None:
+        # Building the pool does no network I/O; connections open on demand
         if self._client is None:
-            try:
-                client = redis.Redis.from_url(self.url)
-                client.ping()
-                self._client = client
-            except RedisError:
-                self._client = None
+            pool = redis.ConnectionPool.from_url(
+                self.url,
+                socket_timeout=self.socket_timeout,
+                socket_connect_timeout=self.connect_timeout,
+                max_connections=self.max_connections,
+            )
+            self._client = redis.Redis(connection_pool=pool)
 
     def get(self, key: str) -> Optional[bytes]:
-        self._ensure_client()
-        if not self._client:
+        if not self.breaker.allow():
             return None
+        self._ensure_client()
         try:
-            return self._client.get(key)
+            value = self._client.get(key)  # type: ignore[union-attr]
         except RedisError:
+            self.breaker.record_failure()
             return None
+        self.breaker.record_success()
+        return value
 
     def set(self, key: str, value, ex: Optional[int] = None) -> None:
+        if not self.breaker.allow():
+            return
+        self._ensure_client()
+        try:
+            self._client.set(key, value, ex=ex)  # type: ignore[union-attr]
+        except RedisError:
+            self.breaker.record_failure()
+            return
+        self.breaker.record_success()
+
+    def acquire_lease(self, key: str, token: str, ttl_ms: int) -> Optional[bool]:
+        """
+        Try to take ``lease:<key>`` for ``ttl_ms`` milliseconds.
+
+        Returns True if taken, False if another holder has it, and None if
+        Redis is unavailable (callers should then proceed on their own).
+        """
+        if not self.breaker.allow():
+            return None
+        self._ensure_client()
+        try:
+            taken = self._client.set(  # type: ignore[union-attr]
+                f"lease:{key}", token, nx=True, px=ttl_ms
+            )
+        except RedisError:
+            self.breaker.record_failure()
+            return None
+        self.breaker.record_success()
+        return bool(taken)
+
+    def release_lease(self, key: str, token: str) -> None:
+        """Release ``lease:<key>`` if it is still held with ``token``."""
+        if not self.breaker.allow():
+            return
+        self._ensure_client()
+        try:
+            self._client.eval(  # type: ignore[union-attr]
+                _RELEASE_LEASE_SCRIPT, 1, f"lease:{key}", token
+            )
+        except RedisError:
+            self.breaker.record_failure()
+            return
+        self.breaker.record_success()
+
+    def get_many(self, keys: List[str]) -> List[Optional[bytes]]:
+        """Fetch several keys with a single MGET round trip."""
+        if not keys or not self.breaker.allow():
+            return [None] * len(keys)
         self._ensure_client()
-        if not self._client:
+        try:
+            values = self._client.mget(keys)  # type: ignore[union-attr]
+        except RedisError:
+            self.breaker.record_failure()
+            return [None] * len(keys)
+        self.breaker.record_success()
+        # The client does not decode responses, so every value is bytes or None
+        return cast(List[Optional[bytes]], values)
+
+    def set_many(self, items: List[Tuple[str, Any, Optional[int]]]) -> None:
+        """Store several (key, value, ex) entries in one pipelined round trip."""
+        if not items or not self.breaker.allow():
             return
+        self._ensure_client()
         try:
-            self._client.set(key, value, ex=ex)
+            pipe = self._client.pipeline(transaction=False)  # type: ignore[union-attr]
+            for key, value, ex in items:
+                pipe.set(key, value, ex=ex)
+            pipe.execute()
         except RedisError:
-            pass
+            self.breaker.record_failure()
+            return
+        self.breaker.record_success()
+
+
+def _sizeof(key: str, value: Any) -> int:
+    """Approximate payload size of a cache entry in bytes."""
+    if isinstance(value, int):
+        size = (value.bit_length() + 7) // 8
+    elif isinstance(value, (bytes, bytearray, str)):
+        size = len(value)
+    else:
+        size = sys.getsizeof(value)
+    return len(key) + size
+
+
+class LRUCache:
+    """
+    Bounded in-process cache with LRU eviction sized by bytes.
+
+    Entries larger than ``max_item_bytes`` are never admitted, so a few
+    huge results cannot push out thousands of small hot values.
+    """
+
+    def __init__(self, max_bytes: int, max_item_bytes: Optional[int] = None):
+        self.max_bytes = max_bytes
+        self.max_item_bytes = (
+            max_item_bytes if max_item_bytes is not None else max_bytes
+        )
+        self._data: "OrderedDict[str, Any]" = OrderedDict()
+        self._sizes: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                self.hits += 1
+                CACHE_L1_EVENTS.labels(event="hit").inc()
+                return self._data[key]
+            self.misses += 1
+        CACHE_L1_EVENTS.labels(event="miss").inc()
+        return None
+
+    def set(self, key: str, value: Any) -> None:
+        size = _sizeof(key, value)
+        if size > self.max_item_bytes:
+            # Too big to keep locally; drop any stale copy
+            self.delete(key)
+            return
+        evicted = 0
+        with self._lock:
+            if key in self._data:
+                self.current_bytes -= self._sizes[key]
+            self._data[key] = value
+            self._data.move_to_end(key)
+            self._sizes[key] = size
+            self.current_bytes += size
+            while self.current_bytes > self.max_bytes:
+                old_key, _ = self._data.popitem(last=False)
+                self.current_bytes -= self._sizes.pop(old_key)
+                evicted += 1
+            self.evictions += evicted
+            current = self.current_bytes
+        if evicted:
+            CACHE_L1_EVENTS.labels(event="eviction").inc(evicted)
+        CACHE_L1_BYTES.set(current)
+
+    def __contains__(self, key: str) -> bool:
+        """Membership without touching LRU order or hit/miss counts."""
+        return key in self._data
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            if key in self._data:
+                del self._data[key]
+                self.current_bytes -= self._sizes.pop(key)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self._sizes.clear()
+            self.current_bytes = 0
+        CACHE_L1_BYTES.set(0)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "entries": len(self._data),
+                "bytes": self.current_bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+
+class TieredCache:
+    """
+    In-process L1 (LRUCache) in front of a shared L2 (RedisCache).
+
+    Reads check L1 first and fall through to L2, promoting L2 hits into L1.
+    Writes go to both tiers. When Redis is down L1 keeps serving on its own.
+
+    ``get_int``/``set_int`` keep ints as ints in L1 and store them in Redis
+    through ``IntCodec``, so cache hits never go through decimal strings.
+    """
+
+    def __init__(
+        self,
+        l1: LRUCache,
+        l2: RedisCache,
+        codec: Optional[IntCodec] = None,
+        ttl_policy: Optional[SizeAwareTTL] = None,
+    ):
+        self.l1 = l1
+        self.l2 = l2
+        self.codec = codec or IntCodec()
+        self.ttl_policy = ttl_policy
+
+    def get(self, key: str) -> Optional[Any]:
+        value = self.l1.get(key)
+        if value is not None:
+            return value
+        value = self.l2.get(key)
+        if value is not None:
+            self.l1.set(key, value)
+        return value
+
+    def set(self, key: str, value, ex: Optional[int] = None) -> None:
+        self.l1.set(key, value)
+        self.l2.set(key, value, ex=ex)
+
+    def get_int(self, key: str) -> Optional[int]:
+        value = self.l1.get(key)
+        if value is not None:
+            return value
+        raw = self.l2.get(key)
+        if raw is None:
+            return None
+        try:
+            value = self.codec.decode(raw)
+        except ValueError:
+            return None
+        self.l1.set(key, value)
+        return value
+
+    def set_int(self, key: str, value: int) -> None:
+        self.l1.set(key, value)
+        entry = self._encode_for_l2(key, value)
+        if entry is not None:
+            self.l2.set(*entry)
+
+    def refresh_int(self, key: str) -> Optional[int]:
+        """Read ``key`` from L2 only (bypassing L1), promoting a hit into L1."""
+        raw = self.l2.get(key)
+        if raw is None:
+            return None
+        try:
+            value = self.codec.decode(raw)
+        except ValueError:
+            return None
+        self.l1.set(key, value)
+        return value
+
+    def get_many_int(self, keys: List[str]) -> Dict[str, int]:
+        """Return the cached ints among ``keys``, using one MGET for L1 misses."""
+        found: Dict[str, int] = {}
+        missing: List[str] = []
+        for key in keys:
+            value = self.l1.get(key)
+            if value is not None:
+                found[key] = value
+            else:
+                missing.append(key)
+        for key, raw in zip(missing, self.l2.get_many(missing)):
+            if raw is None:
+                continue
+            try:
+                value = self.codec.decode(raw)
+            except ValueError:
+                continue
+            self.l1.set(key, value)
+            found[key] = value
+        return found
+
+    def set_many_int(self, values: Dict[str, int]) -> None:
+        entries = []
+        for key, value in values.items():
+            self.l1.set(key, value)
+            entry = self._encode_for_l2(key, value)
+            if entry is not None:
+                entries.append(entry)
+        self.l2.set_many(entries)
+
+    def _encode_for_l2(self, key: str, value: int):
+        data = self.codec.encode(value)
+        ex = None
+        if self.ttl_policy is not None:
+            if not self.ttl_policy.allows(len(data)):
+                return None
+            ex = self.ttl_policy(len(data))
+        return key, data, ex
+
+
+class AsyncRedisCache:
+    """
+    redis.asyncio reads for the ASGI app. Shares a CircuitBreaker with the
+    synchronous RedisCache so both request paths see the same outage.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        socket_timeout: Optional[float] = None,
+        connect_timeout: Optional[float] = None,
+        max_connections: Optional[int] = None,
+        breaker: Optional[CircuitBreaker] = None,
+    ):
+        self.url = url
+        self.socket_timeout = socket_timeout
+        self.connect_timeout = connect_timeout
+        self.max_connections = max_connections
+        self.breaker = breaker or CircuitBreaker("redis")
+        self._client: Optional["redis.asyncio.Redis"] = None
+
+    def _ensure_client(self) -> None:
+        # The pool binds to the running event loop on first use; redis.asyncio
+        # is imported here so the WSGI app and the CLI never pay for it
+        if self._client is None:
+            import redis.asyncio
+
+            self._client = redis.asyncio.Redis.from_url(
+                self.url,
+                socket_timeout=self.socket_timeout,
+                socket_connect_timeout=self.connect_timeout,
+                max_connections=self.max_connections,
+            )
+
+    async def get(self, key: str) -> Optional[bytes]:
+        if not self.breaker.allow():
+            return None
+        self._ensure_client()
+        try:
+            value = await self._client.get(key)  # type: ignore[union-attr]
+        except RedisError:
+            self.breaker.record_failure()
+            return None
+        self.breaker.record_success()
+        # The client does not decode responses, so the value is bytes or None
+        return cast(Optional[bytes], value)
+
+    async def close(self) -> None:
+        if self._client is not None:
+            client, self._client = self._client, None
+            await client.aclose()
+
+
+class AsyncTieredCache:
+    """Read-only async view of a TieredCache: its L1, then an async L2."""
+
+    def __init__(self, tiered: TieredCache, l2: AsyncRedisCache):
+        self.l1 = tiered.l1
+        self.codec = tiered.codec
+        self.l2 = l2
+
+    async def get_int(self, key: str) -> Optional[int]:
+        value = self.l1.get(key)
+        if value is not None:
+            return value
+        raw = await self.l2.get(key)
+        if raw is None:
+            return None
+        try:
+            value = self.codec.decode(raw)
+        except ValueError:
+            return None
+        self.l1.set(key, value)
+        return value
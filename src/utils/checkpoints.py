@@ -0,0 +1,100 @@
+from typing import Dict
+from typing import List
+from typing import Optional
+from typing import Tuple
+from .cache import TieredCache
+from .compute_pool import ComputePool
+from .metrics import CHECKPOINT_EVENTS
+from ..algorithms.cost import fact_bits
+from ..algorithms.cost import fib_bits
+from ..algorithms.factorial import factorial
+from ..algorithms.factorial import factorial_from
+from ..algorithms.fibonacci import FibPair
+from ..algorithms.fibonacci import fib_from
+from ..algorithms.fibonacci import fibonacci
+
+
+class CheckpointLadder:
+    """
+    Sparse checkpoints of (F(k), F(k+1)) and k! at multiples of ``step``.
+
+    Checkpoints are ordinary ``fib:{k}`` / ``fact:{k}`` cache entries, so
+    they are shared with the plain endpoints and across instances. A miss
+    for n probes the ``probe`` multiples of ``step`` at or below n with one
+    MGET, resumes from the highest one found and records up to ``max_new``
+    new checkpoints on the way. Inputs below ``min_n`` are computed
+    directly.
+    """
+
+    def __init__(
+        self,
+        cache: TieredCache,
+        pool: ComputePool,
+        step: int = 1000,
+        probe: int = 4,
+        max_new: int = 4,
+        min_n: int = 5000,
+    ):
+        if step < 1:
+            raise ValueError("step must be >= 1")
+        self.cache = cache
+        self.pool = pool
+        self.step = step
+        self.probe = max(1, probe)
+        self.max_new = max(1, max_new)
+        self.min_n = max(min_n, step)
+
+    def _candidates(self, n: int) -> List[int]:
+        base = n // self.step * self.step
+        return [k for k in range(base, 0, -self.step)][: self.probe]
+
+    # ——— Fibonacci ———
+    def _find_fib(self, n: int) -> Optional[Tuple[int, FibPair]]:
+        ks = self._candidates(n)
+        keys = [f"fib:{j}" for k in ks for j in (k, k + 1)]
+        found = self.cache.get_many_int(keys)
+        for k in ks:
+            a, b = found.get(f"fib:{k}"), found.get(f"fib:{k + 1}")
+            if a is not None and b is not None:
+                return k, (a, b)
+        return None
+
+    def fibonacci(self, n: int) -> int:
+        """Return F(n), resuming from the nearest cached checkpoint."""
+        if n < self.min_n:
+            return self.pool.run(fib_bits(n), fibonacci, n)
+        hit = self._find_fib(n)
+        CHECKPOINT_EVENTS.labels(kind="fib", event="hit" if hit else "miss").inc()
+        start, pair = hit or (0, (0, 1))
+        result, new = self.pool.run(
+            fib_bits(n), fib_from, n, start, pair, self.step, self.max_new
+        )
+        values: Dict[str, int] = {}
+        for k, (a, b) in new.items():
+            values[f"fib:{k}"], values[f"fib:{k + 1}"] = a, b
+        self.cache.set_many_int(values)
+        CHECKPOINT_EVENTS.labels(kind="fib", event="stored").inc(len(new))
+        return result
+
+    # ——— Factorial ———
+    def _find_fact(self, n: int) -> Optional[Tuple[int, int]]:
+        ks = self._candidates(n)
+        found = self.cache.get_many_int([f"fact:{k}" for k in ks])
+        for k in ks:
+            if (value := found.get(f"fact:{k}")) is not None:
+                return k, value
+        return None
+
+    def factorial(self, n: int) -> int:
+        """Return n!, resuming from the nearest cached checkpoint."""
+        if n < self.min_n:
+            return self.pool.run(fact_bits(n), factorial, n)
+        hit = self._find_fact(n)
+        CHECKPOINT_EVENTS.labels(kind="fact", event="hit" if hit else "miss").inc()
+        start, value = hit or (0, 1)
+        result, new = self.pool.run(
+            fact_bits(n), factorial_from, n, start, value, self.step, self.max_new
+        )
+        self.cache.set_many_int({f"fact:{k}": v for k, v in new.items()})
+        CHECKPOINT_EVENTS.labels(kind="fact", event="stored").inc(len(new))
+        return result
@@ -0,0 +1,77 @@
+import threading
+import time
+from typing import Callable
+from .metrics import CIRCUIT_BREAKER_STATE
+
+
+class CircuitBreaker:
+    """
+    Minimal circuit breaker with exponential-backoff reconnect probes.
+
+    closed    -> calls go through; ``failure_threshold`` consecutive
+                 failures open the circuit.
+    open      -> calls are rejected immediately until the backoff expires.
+    half_open -> exactly one probe call is let through. Success closes the
+                 circuit, failure re-opens it with a doubled backoff.
+    """
+
+    CLOSED = "closed"
+    HALF_OPEN = "half_open"
+    OPEN = "open"
+    _STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = 1,
+        base_backoff: float = 0.5,
+        max_backoff: float = 30.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.name = name
+        self.failure_threshold = max(1, failure_threshold)
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._backoff = base_backoff
+        self._retry_at = 0.0
+        self.state = self.CLOSED
+        self._publish()
+
+    def _publish(self) -> None:
+        CIRCUIT_BREAKER_STATE.labels(name=self.name).set(self._STATE_VALUES[self.state])
+
+    def allow(self) -> bool:
+        """Return True if a call may be attempted right now."""
+        if self.state == self.CLOSED:
+            return True
+        with self._lock:
+            if self.state == self.OPEN and self._clock() >= self._retry_at:
+                # Let a single probe through
+                self.state = self.HALF_OPEN
+                self._publish()
+                return True
+            return self.state == self.CLOSED
+
+    def record_success(self) -> None:
+        if self.state == self.CLOSED and not self._failures:
+            return
+        with self._lock:
+            self._failures = 0
+            self._backoff = self.base_backoff
+            self.state = self.CLOSED
+            self._publish()
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if self.state == self.HALF_OPEN or (
+                self._failures >= self.failure_threshold
+            ):
+                if self.state == self.HALF_OPEN:
+                    self._backoff = min(self._backoff * 2, self.max_backoff)
+                self.state = self.OPEN
+                self._retry_at = self._clock() + self._backoff
+                self._publish()
@@ -0,0 +1,185 @@
+import math
+import multiprocessing
+import signal
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeout
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any
+from typing import Callable
+from typing import Optional
+from .metrics import COMPUTE_ADMISSIONS
+from .profiling import current_profile
+from .profiling import run_profiled
+
+try:  # POSIX only; limits are skipped elsewhere
+    import resource
+except ImportError:  # pragma: no cover - depends on the platform
+    resource = None  # type: ignore[assignment]
+
+
+class ComputeError(Exception):
+    """Base class for admission / offload failures."""
+
+
+class ComputationTooExpensive(ComputeError):
+    def __init__(self, estimated_bits: int, limit_bits: int):
+        super().__init__(
+            f"Estimated result size {estimated_bits} bits exceeds "
+            f"the limit of {limit_bits} bits"
+        )
+        self.estimated_bits = estimated_bits
+        self.limit_bits = limit_bits
+
+
+class ComputeBusy(ComputeError):
+    def __init__(self):
+        super().__init__("Too many expensive computations in progress, retry later")
+
+
+class ComputeLimitExceeded(ComputeError):
+    def __init__(self, reason: str):
+        super().__init__(f"Computation aborted: {reason}")
+        self.reason = reason
+
+
+class _CPUTimeExceeded(Exception):
+    """Raised inside a pool worker when its per-task CPU budget runs out."""
+
+
+# ——— Worker side ———
+def _on_sigxcpu(signum, frame):
+    raise _CPUTimeExceeded()
+
+
+def _init_worker(memory_bytes: Optional[int]) -> None:
+    if resource is None:
+        return
+    signal.signal(signal.SIGXCPU, _on_sigxcpu)
+    if memory_bytes:
+        _, hard = resource.getrlimit(resource.RLIMIT_AS)
+        resource.setrlimit(resource.RLIMIT_AS, (memory_bytes, hard))
+
+
+def _run_limited(cpu_seconds: Optional[float], fn: Callable, args: tuple) -> Any:
+    """Run fn(*args) with a CPU-time budget on top of what the worker used so far."""
+    if resource is None or not cpu_seconds:
+        return fn(*args)
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    soft, hard = resource.getrlimit(resource.RLIMIT_CPU)
+    limit = math.ceil(usage.ru_utime + usage.ru_stime + cpu_seconds)
+    if hard != resource.RLIM_INFINITY:
+        limit = min(limit, hard)
+    resource.setrlimit(resource.RLIMIT_CPU, (limit, hard))
+    try:
+        return fn(*args)
+    finally:
+        resource.setrlimit(resource.RLIMIT_CPU, (soft, hard))
+
+
+# ——— Parent side ———
+class ComputePool:
+    """
+    Cost-based admission control for CPU-heavy calls.
+
+    ``run(cost_bits, fn, *args)`` runs cheap calls inline, ships expensive
+    ones to a bounded process pool with per-task CPU-time and memory
+    limits, and rejects anything above ``max_bits`` before doing any work.
+    ``fn`` must be a module-level function so it can be pickled.
+    """
+
+    def __init__(
+        self,
+        inline_max_bits: int,
+        max_bits: int,
+        workers: int = 2,
+        max_pending: int = 4,
+        cpu_seconds: Optional[float] = 30.0,
+        memory_bytes: Optional[int] = None,
+        timeout: Optional[float] = 60.0,
+        start_method: str = "spawn",
+    ):
+        self.inline_max_bits = inline_max_bits
+        self.max_bits = max_bits
+        self.workers = workers
+        self.cpu_seconds = cpu_seconds
+        self.memory_bytes = memory_bytes
+        self.timeout = timeout
+        self.start_method = start_method
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    def check(self, cost_bits: int) -> None:
+        """Raise ComputationTooExpensive if cost_bits is over the hard ceiling."""
+        if cost_bits > self.max_bits:
+            COMPUTE_ADMISSIONS.labels(decision="rejected").inc()
+            raise ComputationTooExpensive(cost_bits, self.max_bits)
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context(self.start_method),
+                    initializer=_init_worker,
+                    initargs=(self.memory_bytes,),
+                )
+            return self._executor
+
+    def _reset_executor(self, broken: ProcessPoolExecutor) -> None:
+        with self._lock:
+            if self._executor is broken:
+                self._executor = None
+        broken.shutdown(wait=False, cancel_futures=True)
+
+    def run(self, cost_bits: int, fn: Callable, *args) -> Any:
+        self.check(cost_bits)
+        if cost_bits <= self.inline_max_bits:
+            COMPUTE_ADMISSIONS.labels(decision="inline").inc()
+            return fn(*args)
+        if not self._slots.acquire(blocking=False):
+            COMPUTE_ADMISSIONS.labels(decision="busy").inc()
+            raise ComputeBusy()
+        COMPUTE_ADMISSIONS.labels(decision="offloaded").inc()
+        # A profiled request also profiles its work inside the worker
+        profile = current_profile()
+        if profile is not None and not profile.wants_worker_stats:
+            profile = None
+        try:
+            executor = self._get_executor()
+            if profile is not None:
+                future = executor.submit(
+                    _run_limited, self.cpu_seconds, run_profiled, (fn, args)
+                )
+            else:
+                future = executor.submit(_run_limited, self.cpu_seconds, fn, args)
+        except BaseException:
+            self._slots.release()
+            raise
+        # Hold the slot until the task really ends: a timed-out task cannot be
+        # cancelled once running, and keeps its worker busy until it finishes
+        future.add_done_callback(lambda _: self._slots.release())
+        try:
+            result = future.result(timeout=self.timeout)
+            if profile is not None:
+                result, stats = result
+                profile.add_worker_stats(stats)
+            return result
+        except FutureTimeout:
+            future.cancel()
+            raise ComputeLimitExceeded("wall-clock timeout")
+        except _CPUTimeExceeded:
+            raise ComputeLimitExceeded("CPU time limit")
+        except MemoryError:
+            raise ComputeLimitExceeded("memory limit")
+        except BrokenProcessPool:
+            # A worker was killed (e.g. hard CPU/memory limit); start fresh
+            self._reset_executor(executor)
+            raise ComputeLimitExceeded("worker process died")
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
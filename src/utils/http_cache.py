@@ -0,0 +1,59 @@
+"""
+HTTP caching for pure results: ETags, conditional GET and compression.
+
+A pow / fib / factorial response is a pure function of the operation, its
+inputs, ``mod`` and ``format``, so its ETag is derived from those alone and
+``If-None-Match`` can be answered with 304 before any table, cache or
+compute work. Tags are weak (``W/"..."``) so the same tag validates the
+identity, gzip and deflate encodings of a body.
+"""
+
+import hashlib
+import zlib
+from typing import Iterable
+from typing import Iterator
+from typing import Optional
+from typing import Tuple
+from werkzeug.http import parse_accept_header
+from werkzeug.http import parse_etags
+
+# Bump when the serialized form of any result changes
+ETAG_VERSION = 1
+
+ENCODINGS = ("gzip", "deflate")
+_WBITS = {"gzip": 31, "deflate": 15}  # gzip wrapper / zlib wrapper (HTTP "deflate")
+
+
+def result_etag(op: str, args: Tuple[int, ...], mod: Optional[int], fmt: str) -> str:
+    """Opaque tag (unquoted) identifying one result representation."""
+    key = f"{ETAG_VERSION}|{op}|{','.join(map(str, args))}|{mod}|{fmt}"
+    return hashlib.sha256(key.encode()).hexdigest()[:32]
+
+
+def quote_etag(etag: str) -> str:
+    return f'W/"{etag}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """True if an If-None-Match header value matches ``etag`` (weak comparison)."""
+    if not if_none_match:
+        return False
+    return parse_etags(if_none_match).contains_weak(etag)
+
+
+def choose_encoding(accept_encoding: Optional[str]) -> Optional[str]:
+    """gzip or deflate, whichever the client prefers, or None for identity."""
+    if not accept_encoding:
+        return None
+    return parse_accept_header(accept_encoding).best_match(ENCODINGS)
+
+
+def compress_chunks(
+    chunks: Iterable[bytes], encoding: str, level: int = 1
+) -> Iterator[bytes]:
+    """Compress a body chunk by chunk, so streamed responses stay streamed."""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, _WBITS[encoding])
+    for chunk in chunks:
+        if out := compressor.compress(chunk):
+            yield out
+    yield compressor.flush()
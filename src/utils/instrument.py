@@ -0,0 +1,124 @@
+import time
+from functools import wraps
+from typing import Any
+from typing import Dict
+from typing import Tuple
+from flask import Flask
+from flask import current_app
+from flask import g
+from flask import request
+from flask_jwt_extended import verify_jwt_in_request
+from .metrics import CACHE_LOOKUPS
+from .metrics import HTTP_REQUEST_DURATION
+from .metrics import HTTP_REQUEST_EXCEPTIONS
+from .metrics import HTTP_REQUESTS
+from .metrics import RESULT_BITS
+from .metrics import STAGE_ERRORS
+from .metrics import STAGE_LATENCY
+
+# Labelled children are resolved once; .labels() takes a lock on every call
+_latency: Dict[Tuple[str, str], Any] = {}
+_lookups: Dict[Tuple[str, str], Any] = {}
+_bits: Dict[str, Any] = {}
+
+
+class stage:
+    """
+    Time a block (``with stage("compute", "fib"):``) or a function
+    (``@stage("db_write")``) into math_stage_seconds; exceptions are
+    counted in math_stage_errors_total and re-raised.
+    """
+
+    __slots__ = ("name", "op", "_start")
+
+    def __init__(self, name: str, op: str = ""):
+        self.name = name
+        self.op = op
+
+    def __enter__(self) -> "stage":
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        elapsed = time.perf_counter() - self._start
+        key = (self.name, self.op)
+        if (child := _latency.get(key)) is None:
+            child = _latency[key] = STAGE_LATENCY.labels(stage=self.name, op=self.op)
+        child.observe(elapsed)
+        if exc_type is not None:
+            STAGE_ERRORS.labels(
+                stage=self.name, op=self.op, error=exc_type.__name__
+            ).inc()
+
+    def __call__(self, fn):
+        name, op = self.name, self.op
+
+        @wraps(fn)
+        def wrapped(*args, **kwargs):
+            with stage(name, op):
+                return fn(*args, **kwargs)
+
+        return wrapped
+
+
+def count_lookup(op: str, result: str) -> None:
+    """Count a result lookup (table, hit or miss) for ``op``."""
+    key = (op, result)
+    if (child := _lookups.get(key)) is None:
+        child = _lookups[key] = CACHE_LOOKUPS.labels(op=op, result=result)
+    child.inc()
+
+
+def observe_result(op: str, value: int) -> int:
+    """Record the bit length of a served result; returns ``value``."""
+    if (child := _bits.get(op)) is None:
+        child = _bits[op] = RESULT_BITS.labels(op=op)
+    child.observe(value.bit_length())
+    return value
+
+
+def observe_http(method: str, path: str, status: int, seconds: float) -> None:
+    """Record one HTTP request, from the Flask hooks or the ASGI fast path."""
+    HTTP_REQUEST_DURATION.labels(method=method, path=path, status=status).observe(
+        seconds
+    )
+    HTTP_REQUESTS.labels(method=method, status=status).inc()
+
+
+def init_http_metrics(app: Flask) -> None:
+    """
+    Time every request of ``app`` into the flask_http_request_* metrics.
+    Register before other hooks, so this sees the final response.
+    """
+
+    @app.before_request
+    def start_http_timer():
+        g.http_start = time.perf_counter()
+
+    @app.after_request
+    def record_http(response):
+        start = g.pop("http_start", None)
+        if start is not None:
+            elapsed = time.perf_counter() - start
+            observe_http(request.method, request.path, response.status_code, elapsed)
+        return response
+
+    @app.teardown_request
+    def record_http_exception(exc):
+        if exc is not None:
+            HTTP_REQUEST_EXCEPTIONS.labels(method=request.method, status=500).inc()
+
+
+def timed_jwt_required(**jwt_kwargs):
+    """``jwt_required()`` with token verification timed as the "jwt" stage."""
+
+    def wrapper(fn):
+        @wraps(fn)
+        def decorator(*args, **kwargs):
+            with stage("jwt"):
+                verify_jwt_in_request(**jwt_kwargs)
+            return current_app.ensure_sync(fn)(*args, **kwargs)
+
+        return decorator
+
+    return wrapper
@@ -1,33 +1,317 @@
+import asyncio
+import atexit
 import json
+import logging
+import threading
+import time
+from collections import deque
+from typing import Any
+from typing import Callable
+from typing import Deque
+from typing import Optional
+from typing import Tuple
 from kafka import errors
 from kafka import KafkaProducer
+from .metrics import KAFKA_MESSAGES
+
+try:  # optional asyncio producer for the ASGI app
+    from aiokafka import AIOKafkaProducer  # type: ignore
+    from aiokafka.errors import KafkaError as AIOKafkaError  # type: ignore
+except ImportError:  # pragma: no cover - depends on the environment
+    AIOKafkaProducer = None
+    AIOKafkaError = errors.KafkaError
+
+logger = logging.getLogger(__name__)
+
+
+def _start_daemon(fn: Callable[[], None]) -> None:
+    threading.Thread(target=fn, name="kafka-connect", daemon=True).start()
 
 
 class KafkaLogger:
-    def __init__(self, bootstrap_servers, client_id=None):
+    """
+    Fire-and-forget Kafka logger.
+
+    ``send`` hands messages to the producer's own buffer (batched by
+    ``linger_ms``/``batch_size``) and returns immediately; delivery results
+    arrive through callbacks. While no broker is reachable, messages go to
+    a bounded local spill buffer and producer construction is retried with
+    exponential backoff instead of on every call. Construction (which may
+    wait on the broker) runs through ``spawn``, a background thread by
+    default, so ``send`` never blocks on it.
+    """
+
+    def __init__(
+        self,
+        bootstrap_servers,
+        client_id=None,
+        linger_ms: int = 20,
+        batch_size: int = 64 * 1024,
+        max_block_ms: int = 100,
+        spill_size: int = 10000,
+        retry_backoff: float = 5.0,
+        max_retry_backoff: float = 300.0,
+        api_version: Optional[Tuple[int, ...]] = None,
+        api_version_auto_timeout_ms: int = 2000,
+        producer_factory: Callable = KafkaProducer,
+        clock: Callable[[], float] = time.monotonic,
+        spawn: Callable[[Callable[[], None]], Any] = _start_daemon,
+    ):
         # Don’t create producer here—just remember the settings
         self.bootstrap_servers = bootstrap_servers
         self.client_id = client_id
-        self._producer = None
+        self.linger_ms = linger_ms
+        self.batch_size = batch_size
+        self.max_block_ms = max_block_ms
+        self.retry_backoff = retry_backoff
+        self.max_retry_backoff = max_retry_backoff
+        self.api_version = api_version
+        self.api_version_auto_timeout_ms = api_version_auto_timeout_ms
+        self._producer_factory = producer_factory
+        self._clock = clock
+        self._spawn = spawn
+        self._producer: Optional[KafkaProducer] = None
+        self._connecting = False
+        self._lock = threading.Lock()
+        self._next_attempt = 0.0
+        self._backoff = retry_backoff
+        self._spill: Deque[Tuple[str, dict]] = deque(maxlen=spill_size)
+        self.sent = 0
+        self.failed = 0
+        self.dropped = 0
+        self._close_registered = False
+
+    def _ensure_producer(self) -> None:
+        # Start creating the producer on first use, backing off after failures
+        if self._producer is not None or self._clock() < self._next_attempt:
+            return
+        with self._lock:
+            if (
+                self._connecting
+                or self._producer is not None
+                or self._clock() < self._next_attempt
+            ):
+                return
+            self._connecting = True
+        self._spawn(self._connect)
 
-    def _ensure_producer(self):
-        # Create the producer on first use
-        if self._producer is None:
+    def _connect(self) -> None:
+        try:
+            producer = self._producer_factory(
+                bootstrap_servers=self.bootstrap_servers,
+                client_id=self.client_id,
+                value_serializer=lambda v: json.dumps(v).encode("utf-8"),
+                linger_ms=self.linger_ms,
+                batch_size=self.batch_size,
+                max_block_ms=self.max_block_ms,
+                api_version=self.api_version,
+                api_version_auto_timeout_ms=self.api_version_auto_timeout_ms,
+            )
+        except errors.KafkaError:
+            # No Kafka broker reachable—try again after the backoff
+            with self._lock:
+                self._next_attempt = self._clock() + self._backoff
+                self._backoff = min(self._backoff * 2, self.max_retry_backoff)
+                self._connecting = False
+            return
+        with self._lock:
+            self._producer = producer
+            self._backoff = self.retry_backoff
+            self._connecting = False
+            if not self._close_registered:
+                # Once, and after the producer's own hook so ours runs first
+                atexit.register(self.close)
+                self._close_registered = True
+        # Deliver what was spilled while connecting
+        self._replay_spill()
+
+    def _spill_message(self, topic: str, message: dict) -> None:
+        if len(self._spill) == self._spill.maxlen:
+            self.dropped += 1
+            KAFKA_MESSAGES.labels(status="dropped").inc()
+        self._spill.append((topic, message))
+        KAFKA_MESSAGES.labels(status="spilled").inc()
+
+    def _on_success(self, _metadata) -> None:
+        self.sent += 1
+        KAFKA_MESSAGES.labels(status="sent").inc()
+
+    def _on_error(self, exc) -> None:
+        self.failed += 1
+        KAFKA_MESSAGES.labels(status="failed").inc()
+        logger.warning("Kafka delivery failed: %s", exc)
+
+    def _produce(self, topic: str, message: dict) -> bool:
+        producer = self._producer
+        if producer is None:
+            return False
+        try:
+            future = producer.send(topic, value=message)
+        except errors.KafkaError:
+            # Producer buffer full or metadata unavailable
+            return False
+        future.add_callback(self._on_success)
+        future.add_errback(self._on_error)
+        return True
+
+    def _replay_spill(self) -> None:
+        while self._spill:
             try:
-                self._producer = KafkaProducer(
-                    bootstrap_servers=self.bootstrap_servers,
-                    client_id=self.client_id,
-                    value_serializer=lambda v: json.dumps(v).encode("utf-8"),
-                )
-            except errors.NoBrokersAvailable:
-                # No Kafka broker reachable—disable Kafka for this run
-                self._producer = None
+                topic, message = self._spill.popleft()
+            except IndexError:
+                break
+            if not self._produce(topic, message):
+                self._spill.appendleft((topic, message))
+                break
 
     def send(self, topic: str, message: dict):
         # Lazily initialize the producer
         self._ensure_producer()
         if not self._producer:
-            return  # no-op if we failed to connect
-        # Otherwise send normally
-        self._producer.send(topic, value=message)
-        self._producer.flush()
+            self._spill_message(topic, message)
+            return
+        if self._spill:
+            self._replay_spill()
+        if not self._produce(topic, message):
+            self._spill_message(topic, message)
+
+    def close(self, timeout: float = 5.0) -> None:
+        """Flush buffered messages, giving up after ``timeout`` seconds."""
+        producer = self._producer
+        if producer is None:
+            return
+        deadline = self._clock() + timeout
+        self._replay_spill()
+        try:
+            producer.flush(timeout=max(0.0, deadline - self._clock()))
+        except errors.KafkaError:
+            logger.warning("Kafka flush did not finish before shutdown")
+        try:
+            producer.close(timeout=max(0.0, deadline - self._clock()))
+        except errors.KafkaError:
+            pass
+        self._producer = None
+
+
+class AsyncKafkaLogger:
+    """
+    asyncio counterpart of KafkaLogger for the ASGI app (needs aiokafka).
+
+    ``send`` appends to the producer's batch and returns without waiting
+    for delivery. Spill buffer, reconnect backoff and metrics behave as in
+    KafkaLogger; call ``close`` on the event loop at shutdown.
+    """
+
+    def __init__(
+        self,
+        bootstrap_servers,
+        client_id=None,
+        linger_ms: int = 20,
+        batch_size: int = 64 * 1024,
+        spill_size: int = 10000,
+        retry_backoff: float = 5.0,
+        max_retry_backoff: float = 300.0,
+        producer_factory: Optional[Callable] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.bootstrap_servers = bootstrap_servers
+        self.client_id = client_id
+        self.linger_ms = linger_ms
+        self.batch_size = batch_size
+        self.retry_backoff = retry_backoff
+        self.max_retry_backoff = max_retry_backoff
+        self._producer_factory = producer_factory or AIOKafkaProducer
+        self._clock = clock
+        self._producer: Optional[Any] = None  # AIOKafkaProducer (untyped)
+        self._lock = asyncio.Lock()
+        self._next_attempt = 0.0
+        self._backoff = retry_backoff
+        self._spill: Deque[Tuple[str, dict]] = deque(maxlen=spill_size)
+        self.sent = 0
+        self.failed = 0
+        self.dropped = 0
+
+    async def _ensure_producer(self) -> None:
+        if self._producer is not None or self._clock() < self._next_attempt:
+            return
+        async with self._lock:
+            if self._producer is not None or self._clock() < self._next_attempt:
+                return
+            producer = self._producer_factory(
+                bootstrap_servers=self.bootstrap_servers,
+                client_id=self.client_id,
+                value_serializer=lambda v: json.dumps(v).encode("utf-8"),
+                linger_ms=self.linger_ms,
+                max_batch_size=self.batch_size,
+            )
+            try:
+                await producer.start()
+            except (AIOKafkaError, OSError):
+                # No Kafka broker reachable—try again after the backoff
+                self._next_attempt = self._clock() + self._backoff
+                self._backoff = min(self._backoff * 2, self.max_retry_backoff)
+                return
+            self._producer = producer
+            self._backoff = self.retry_backoff
+
+    def _spill_message(self, topic: str, message: dict) -> None:
+        if len(self._spill) == self._spill.maxlen:
+            self.dropped += 1
+            KAFKA_MESSAGES.labels(status="dropped").inc()
+        self._spill.append((topic, message))
+        KAFKA_MESSAGES.labels(status="spilled").inc()
+
+    def _on_delivery(self, future: "asyncio.Future") -> None:
+        if not future.cancelled() and future.exception() is None:
+            self.sent += 1
+            KAFKA_MESSAGES.labels(status="sent").inc()
+            return
+        self.failed += 1
+        KAFKA_MESSAGES.labels(status="failed").inc()
+        logger.warning("Kafka delivery failed: %s", future)
+
+    async def _produce(self, topic: str, message: dict) -> bool:
+        producer = self._producer
+        if producer is None:
+            return False
+        try:
+            future = await producer.send(topic, value=message)
+        except AIOKafkaError:
+            # Producer buffer full or metadata unavailable
+            return False
+        future.add_done_callback(self._on_delivery)
+        return True
+
+    async def _replay_spill(self) -> None:
+        while self._spill:
+            topic, message = self._spill.popleft()
+            if not await self._produce(topic, message):
+                self._spill.appendleft((topic, message))
+                break
+
+    async def send(self, topic: str, message: dict) -> None:
+        await self._ensure_producer()
+        if not self._producer:
+            self._spill_message(topic, message)
+            return
+        if self._spill:
+            await self._replay_spill()
+        if not await self._produce(topic, message):
+            self._spill_message(topic, message)
+
+    async def close(self, timeout: float = 5.0) -> None:
+        """Flush buffered messages, giving up after ``timeout`` seconds."""
+        producer = self._producer
+        if producer is None:
+            return
+        deadline = self._clock() + timeout
+        await self._replay_spill()
+        try:
+            await asyncio.wait_for(producer.flush(), max(0.0, deadline - self._clock()))
+        except (AIOKafkaError, asyncio.TimeoutError):
+            logger.warning("Kafka flush did not finish before shutdown")
+        try:
+            await asyncio.wait_for(producer.stop(), max(0.0, deadline - self._clock()))
+        except (AIOKafkaError, asyncio.TimeoutError):
+            pass
+        self._producer = None
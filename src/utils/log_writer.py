@@ -0,0 +1,164 @@
+import atexit
+import logging
+import queue
+import random
+import threading
+import time
+from typing import Callable
+from typing import List
+from typing import Optional
+from .metrics import LOG_QUEUE_DEPTH
+from .metrics import LOG_ROWS_DROPPED
+from .metrics import LOG_ROWS_WRITTEN
+
+logger = logging.getLogger(__name__)
+
+OVERFLOW_POLICIES = ("block", "drop_oldest", "sample")
+
+
+class BatchLogWriter:
+    """
+    Background writer that group-commits log rows.
+
+    ``submit`` only enqueues; a daemon thread hands rows to ``sink`` in
+    batches of up to ``batch_size``, or whatever has arrived after
+    ``flush_interval`` seconds. When the bounded queue is full the
+    overflow policy decides what happens:
+
+    block       -> wait up to ``block_timeout`` for room, then drop the row
+    drop_oldest -> discard the oldest queued row to make room
+    sample      -> once the queue is half full, keep ``sample_rate`` of rows
+    """
+
+    def __init__(
+        self,
+        sink: Callable[[List[dict]], None],
+        max_queue: int = 10000,
+        batch_size: int = 200,
+        flush_interval: float = 0.5,
+        overflow: str = "block",
+        sample_rate: float = 0.1,
+        block_timeout: float = 1.0,
+    ):
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError(f"overflow must be one of {OVERFLOW_POLICIES}")
+        self.sink = sink
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.overflow = overflow
+        self.sample_rate = sample_rate
+        self.block_timeout = block_timeout
+        self._queue: "queue.Queue[dict]" = queue.Queue(maxsize=max_queue)
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+        self.dropped = 0
+        self.written = 0
+
+    # ——— Producer side ———
+    def submit(self, row: dict) -> bool:
+        """Queue a row for writing; return False if it was dropped."""
+        self._ensure_started()
+        q = self._queue
+        try:
+            if self.overflow == "block":
+                q.put(row, timeout=self.block_timeout)
+            elif self.overflow == "drop_oldest":
+                while True:
+                    try:
+                        q.put_nowait(row)
+                        break
+                    except queue.Full:
+                        try:
+                            q.get_nowait()
+                            q.task_done()
+                            self._drop()
+                        except queue.Empty:
+                            pass
+            else:
+                if q.qsize() * 2 >= q.maxsize and random.random() >= self.sample_rate:
+                    self._drop()
+                    return False
+                q.put_nowait(row)
+        except queue.Full:
+            self._drop()
+            return False
+        LOG_QUEUE_DEPTH.set(q.qsize())
+        return True
+
+    def _drop(self) -> None:
+        self.dropped += 1
+        LOG_ROWS_DROPPED.inc()
+
+    # ——— Consumer side ———
+    def _ensure_started(self) -> None:
+        if self._thread is not None:
+            return
+        with self._start_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="request-log-writer", daemon=True
+                )
+                self._thread.start()
+                atexit.register(self.close)
+
+    def _collect(self) -> List[dict]:
+        """Block for the first row, then gather a batch until full or due."""
+        try:
+            batch = [self._queue.get(timeout=self.flush_interval)]
+        except queue.Empty:
+            return []
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _drain_nowait(self) -> List[dict]:
+        batch: List[dict] = []
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _write(self, batch: List[dict]) -> None:
+        try:
+            self.sink(batch)
+            self.written += len(batch)
+            LOG_ROWS_WRITTEN.inc(len(batch))
+        except Exception:
+            logger.exception("Failed to write %d request log rows", len(batch))
+            self.dropped += len(batch)
+            LOG_ROWS_DROPPED.inc(len(batch))
+        for _ in batch:
+            self._queue.task_done()
+        LOG_QUEUE_DEPTH.set(self._queue.qsize())
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            batch = self._collect()
+            if batch:
+                self._write(batch)
+        # Drain whatever is left on shutdown
+        while batch := self._drain_nowait():
+            self._write(batch)
+
+    def flush(self, timeout: float = 5.0) -> bool:
+        """Wait until every queued row has been handed to the sink."""
+        deadline = time.monotonic() + timeout
+        while self._queue.unfinished_tasks and time.monotonic() < deadline:
+            time.sleep(0.01)
+        return not self._queue.unfinished_tasks
+
+    def close(self, timeout: float = 5.0) -> None:
+        """Stop the writer thread after draining queued rows."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
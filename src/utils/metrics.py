@@ -0,0 +1,133 @@
+from prometheus_client import Counter
+from prometheus_client import Gauge
+from prometheus_client import Histogram
+
+# ——— Cache ———
+CACHE_L1_EVENTS = Counter(
+    "math_cache_l1_events_total",
+    "In-process L1 cache events (hit, miss, eviction)",
+    ["event"],
+)
+CACHE_L1_BYTES = Gauge(
+    "math_cache_l1_bytes",
+    "Bytes currently held by the in-process L1 cache",
+)
+
+# ——— Circuit breakers ———
+CIRCUIT_BREAKER_STATE = Gauge(
+    "math_circuit_breaker_state",
+    "Circuit breaker state (0 = closed, 1 = half-open, 2 = open)",
+    ["name"],
+)
+
+# ——— Request log pipeline ———
+LOG_QUEUE_DEPTH = Gauge(
+    "math_log_queue_depth",
+    "Request log rows waiting to be written",
+)
+LOG_ROWS_WRITTEN = Counter(
+    "math_log_rows_written_total",
+    "Request log rows committed to the database",
+)
+LOG_ROWS_DROPPED = Counter(
+    "math_log_rows_dropped_total",
+    "Request log rows dropped by the overflow policy or a failed write",
+)
+
+# ——— Kafka ———
+KAFKA_MESSAGES = Counter(
+    "math_kafka_messages_total",
+    "Kafka log messages by outcome (sent, failed, spilled, dropped)",
+    ["status"],
+)
+
+# ——— Admission control ———
+COMPUTE_ADMISSIONS = Counter(
+    "math_compute_admissions_total",
+    "Admission decisions for computations (inline, offloaded, busy, rejected)",
+    ["decision"],
+)
+
+# ——— Request coalescing ———
+SINGLEFLIGHT_EVENTS = Counter(
+    "math_singleflight_events_total",
+    "Single-flight events (coalesced_local, coalesced_remote, wait_fallback)",
+    ["event"],
+)
+
+# ——— Checkpoint ladder ———
+CHECKPOINT_EVENTS = Counter(
+    "math_checkpoint_events_total",
+    "Checkpoint ladder lookups (hit, miss) and checkpoints stored",
+    ["kind", "event"],
+)
+
+# ——— Authentication ———
+AUTH_CACHE_EVENTS = Counter(
+    "math_auth_cache_events_total",
+    "Auth cache events (hit, miss, expired, eviction) by cache (jwt_claims, user)",
+    ["cache", "event"],
+)
+AUTH_CACHE_ENTRIES = Gauge(
+    "math_auth_cache_entries",
+    "Entries currently held by each auth cache",
+    ["cache"],
+)
+LOGIN_ATTEMPTS = Counter(
+    "math_login_attempts_total",
+    "Login attempts by outcome (success, failure, throttled)",
+    ["outcome"],
+)
+
+# ——— HTTP requests (names and labels of prometheus_flask_exporter's defaults) ———
+HTTP_REQUEST_DURATION = Histogram(
+    "flask_http_request_duration_seconds",
+    "Flask HTTP request duration in seconds",
+    ["method", "path", "status"],
+)
+HTTP_REQUESTS = Counter(
+    "flask_http_request_total",
+    "Total number of HTTP requests",
+    ["method", "status"],
+)
+HTTP_REQUEST_EXCEPTIONS = Counter(
+    "flask_http_request_exceptions_total",
+    "Total number of HTTP requests which resulted in an exception",
+    ["method", "status"],
+)
+
+# ——— Request stages ———
+STAGE_LATENCY = Histogram(
+    "math_stage_seconds",
+    "Time spent per request stage (jwt, cache_get, compute, db_write, ...)",
+    ["stage", "op"],
+    buckets=(
+        0.0001,
+        0.0005,
+        0.001,
+        0.005,
+        0.01,
+        0.05,
+        0.1,
+        0.5,
+        1.0,
+        5.0,
+        30.0,
+    ),
+)
+STAGE_ERRORS = Counter(
+    "math_stage_errors_total",
+    "Exceptions raised inside a request stage, by exception type",
+    ["stage", "op", "error"],
+)
+CACHE_LOOKUPS = Counter(
+    "math_cache_lookups_total",
+    "Result lookups by operation and outcome (table, hit, miss)",
+    ["op", "result"],
+)
+RESULT_BITS = Histogram(
+    "math_result_bits",
+    "Bit length of results served, by operation",
+    ["op"],
+    buckets=tuple(float(4**k) for k in range(1, 15)),
+)
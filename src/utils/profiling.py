@@ -0,0 +1,164 @@
+import cProfile
+import io
+import os
+import pstats
+import sys
+import threading
+import time
+from collections import Counter
+from contextvars import ContextVar
+from contextvars import Token
+from typing import Any
+from typing import Callable
+from typing import Dict
+from typing import Iterable
+from typing import List
+from typing import Optional
+from typing import Tuple
+from typing import cast
+
+PROFILE_FORMATS = ("pstats", "collapsed")
+
+_current: ContextVar[Optional["RequestProfile"]] = ContextVar(
+    "request_profile", default=None
+)
+
+
+def current_profile() -> Optional["RequestProfile"]:
+    """The profile of the request being handled, if it asked for one."""
+    return _current.get()
+
+
+def _collapse(frame, thread_name: str) -> str:
+    stack = []
+    while frame is not None:
+        code = frame.f_code
+        stack.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+        frame = frame.f_back
+    stack.append(thread_name)
+    return ";".join(reversed(stack))
+
+
+class SamplingProfiler:
+    """
+    Statistical profiler: a daemon thread snapshots the stacks of other
+    threads (all, or only ``thread_ids``) every ``interval`` seconds and
+    counts them in collapsed-stack form ("thread;file:func;... count"),
+    ready for flamegraph.pl / speedscope.
+    """
+
+    def __init__(self, interval: float = 0.005, thread_ids: Iterable[int] = ()):
+        self.interval = interval
+        self.thread_ids = set(thread_ids)
+        self.samples: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _sample(self, exclude: int) -> None:
+        names = {t.ident: t.name for t in threading.enumerate()}
+        for tid, frame in sys._current_frames().items():
+            if tid == exclude or (self.thread_ids and tid not in self.thread_ids):
+                continue
+            self.samples[_collapse(frame, names.get(tid, str(tid)))] += 1
+
+    def _loop(self) -> None:
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            self._sample(own)
+
+    def start(self) -> None:
+        self._thread = threading.Thread(
+            target=self._loop, name="sampling-profiler", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> str:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        return self.collapsed()
+
+    def run(self, seconds: float) -> str:
+        """Sample every other thread from the calling one for ``seconds``."""
+        own = threading.get_ident()
+        deadline = time.monotonic() + seconds
+        while time.monotonic() < deadline:
+            self._sample(own)
+            time.sleep(self.interval)
+        return self.collapsed()
+
+    def collapsed(self) -> str:
+        return "".join(
+            f"{stack} {count}\n" for stack, count in sorted(self.samples.items())
+        )
+
+
+class _LoadedStats:
+    """
+    Adapter so pstats can add stats dicts shipped back from workers: like
+    a finished cProfile.Profile, it has ``create_stats`` and ``stats``.
+    """
+
+    def __init__(self, stats: Dict):
+        self.stats = stats
+
+    def create_stats(self) -> None:
+        pass
+
+
+class RequestProfile:
+    """
+    Profile of one request: deterministic (cProfile, "pstats") or sampled
+    on the request's thread ("collapsed"). Work offloaded to the compute
+    pool is profiled in the worker and merged in (pstats only).
+    """
+
+    def __init__(self, fmt: str, interval: float = 0.001, top: int = 50):
+        if fmt not in PROFILE_FORMATS:
+            raise ValueError(f"Unknown profile format {fmt!r}")
+        self.fmt = fmt
+        self.top = top
+        self._worker_stats: List[Dict] = []
+        self._profiler: Any = (
+            cProfile.Profile()
+            if fmt == "pstats"
+            else SamplingProfiler(interval, thread_ids=[threading.get_ident()])
+        )
+        self._token: Optional[Token[Optional[RequestProfile]]] = None
+
+    @property
+    def wants_worker_stats(self) -> bool:
+        return self.fmt == "pstats"
+
+    def add_worker_stats(self, stats: Dict) -> None:
+        self._worker_stats.append(stats)
+
+    def start(self) -> None:
+        self._token = _current.set(self)
+        if self.fmt == "pstats":
+            self._profiler.enable()
+        else:
+            self._profiler.start()
+
+    def stop(self) -> str:
+        """Stop profiling and return the dump as text."""
+        if self._token is not None:
+            _current.reset(self._token)
+            self._token = None
+        if self.fmt == "collapsed":
+            return self._profiler.stop()
+        self._profiler.disable()
+        out = io.StringIO()
+        stats = pstats.Stats(self._profiler, stream=out)
+        for worker in self._worker_stats:
+            stats.add(cast(cProfile.Profile, _LoadedStats(worker)))
+        stats.sort_stats("cumulative").print_stats(self.top)
+        return out.getvalue()
+
+
+def run_profiled(fn: Callable, args: Tuple) -> Tuple[Any, Dict]:
+    """Run fn(*args) under cProfile (in a pool worker); return (result, stats)."""
+    profiler = cProfile.Profile()
+    result = profiler.runcall(fn, *args)
+    profiler.create_stats()
+    return result, profiler.stats
@@ -0,0 +1,103 @@
+import threading
+import time
+import uuid
+from concurrent.futures import Future
+from typing import Callable
+from typing import Dict
+from typing import Optional
+from typing import Tuple
+from .cache import TieredCache
+from .metrics import SINGLEFLIGHT_EVENTS
+
+
+class SingleFlight:
+    """
+    Coalesce concurrent calls for the same key.
+
+    Within a process, callers arriving while a computation for ``key`` is
+    in flight wait on the leader's future instead of computing again.
+    For values worth at least ``lease_min_bits``, the leader also takes a
+    Redis lease so that other workers wait for the value to appear in the
+    shared cache; they fall back to computing it themselves if the lease
+    expires or ``wait_timeout`` passes.
+
+    ``compute`` is expected to store its result in the cache.
+    """
+
+    def __init__(
+        self,
+        cache: TieredCache,
+        lease_ttl: float = 60.0,
+        wait_timeout: float = 30.0,
+        poll_interval: float = 0.05,
+        lease_min_bits: int = 100_000,
+    ):
+        self.cache = cache
+        self.lease_ttl = lease_ttl
+        self.wait_timeout = wait_timeout
+        self.poll_interval = poll_interval
+        self.lease_min_bits = lease_min_bits
+        self._calls: Dict[str, "Future[int]"] = {}
+        self._lock = threading.Lock()
+
+    def do(self, key: str, cost_bits: int, compute: Callable[[], int]) -> int:
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = self._calls[key] = Future()
+        if not leader:
+            SINGLEFLIGHT_EVENTS.labels(event="coalesced_local").inc()
+            return future.result()  # type: ignore[union-attr]
+        try:
+            if cost_bits >= self.lease_min_bits:
+                result = self._with_lease(key, compute)
+            else:
+                result = compute()
+            future.set_result(result)  # type: ignore[union-attr]
+            return result
+        except BaseException as e:
+            future.set_exception(e)  # type: ignore[union-attr]
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+
+    def _with_lease(self, key: str, compute: Callable[[], int]) -> int:
+        token = uuid.uuid4().hex
+        ttl_ms = int(self.lease_ttl * 1000)
+        held = self.cache.l2.acquire_lease(key, token, ttl_ms)
+        if held is False:
+            value, held = self._wait_for_value(key, token, ttl_ms)
+            if value is not None:
+                SINGLEFLIGHT_EVENTS.labels(event="coalesced_remote").inc()
+                return value
+        try:
+            return compute()
+        finally:
+            if held:
+                self.cache.l2.release_lease(key, token)
+
+    def _wait_for_value(
+        self, key: str, token: str, ttl_ms: int
+    ) -> Tuple[Optional[int], Optional[bool]]:
+        """
+        Poll the shared cache while another worker holds the lease.
+
+        Returns (value, None) once the value shows up, or (None, held) when
+        we should compute ourselves: the lease was freed without a value
+        (we now hold it), Redis went away, or ``wait_timeout`` passed.
+        """
+        deadline = time.monotonic() + self.wait_timeout
+        delay = self.poll_interval
+        while time.monotonic() < deadline:
+            time.sleep(delay)
+            value = self.cache.refresh_int(key)
+            if value is not None:
+                return value, None
+            held = self.cache.l2.acquire_lease(key, token, ttl_ms)
+            if held is not False:
+                return None, held
+            delay = min(delay * 2, 1.0)
+        SINGLEFLIGHT_EVENTS.labels(event="wait_fallback").inc()
+        return None, False
@@ -0,0 +1,155 @@
+import logging
+import mmap
+import os
+import struct
+import zlib
+from itertools import chain
+from typing import Iterator
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+# Header: magic, format version, reserved, fib count, fact count, CRC32 of body
+MAGIC = b"MTBL"
+VERSION = 1
+_HEADER = struct.Struct("<4sHHIII")
+_OFFSET = struct.Struct("<Q")
+
+
+class TableError(Exception):
+    """The table file is missing, stale or corrupt."""
+
+
+def _fib_values(count: int) -> Iterator[int]:
+    a, b = 0, 1
+    for _ in range(count):
+        yield a
+        a, b = b, a + b
+
+
+def _fact_values(count: int) -> Iterator[int]:
+    value = 1
+    for k in range(count):
+        if k > 1:
+            value *= k
+        yield value
+
+
+def build_table(path: str, fib_max: int, fact_max: int) -> int:
+    """
+    Write F(0..fib_max) and 0!..fact_max! to ``path``; return its size.
+
+    Layout: header, then one little-endian uint64 offset per entry plus a
+    final end offset, then the values as unsigned little-endian bytes.
+    The file is written next to ``path`` and renamed into place, so
+    workers that still map the old table keep a consistent view.
+    """
+    fib_count, fact_count = fib_max + 1, fact_max + 1
+    entries = fib_count + fact_count
+    data_start = _HEADER.size + _OFFSET.size * (entries + 1)
+    tmp = f"{path}.tmp"
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(tmp, "w+b") as f:
+        f.seek(data_start)
+        offsets = [data_start]
+        for value in chain(_fib_values(fib_count), _fact_values(fact_count)):
+            f.write(value.to_bytes((value.bit_length() + 7) // 8, "little"))
+            offsets.append(f.tell())
+        f.seek(_HEADER.size)
+        f.write(b"".join(_OFFSET.pack(o) for o in offsets))
+        f.seek(_HEADER.size)
+        crc = 0
+        while chunk := f.read(1 << 20):
+            crc = zlib.crc32(chunk, crc)
+        f.seek(0)
+        f.write(_HEADER.pack(MAGIC, VERSION, 0, fib_count, fact_count, crc))
+        size = offsets[-1]
+    os.replace(tmp, path)
+    return size
+
+
+class ResultTable:
+    """
+    Read-only, memory-mapped view of a table written by ``build_table``.
+
+    The mapping is shared, so forked workers use the same physical pages.
+    ``fib`` / ``factorial`` return None outside the table's range.
+    """
+
+    def __init__(self, path: str, verify: bool = True):
+        with open(path, "rb") as f:
+            try:
+                self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError as e:  # empty file
+                raise TableError(f"{path}: {e}") from e
+        try:
+            self._check(path, verify)
+        except TableError:
+            self._mm.close()
+            raise
+
+    def _check(self, path: str, verify: bool) -> None:
+        if len(self._mm) < _HEADER.size:
+            raise TableError(f"{path}: truncated header")
+        magic, version, _, fib_count, fact_count, crc = _HEADER.unpack_from(self._mm)
+        if magic != MAGIC:
+            raise TableError(f"{path}: not a result table")
+        if version != VERSION:
+            raise TableError(f"{path}: format version {version}, expected {VERSION}")
+        self.fib_count, self.fact_count = fib_count, fact_count
+        entries = fib_count + fact_count
+        if len(self._mm) < _HEADER.size + _OFFSET.size * (entries + 1):
+            raise TableError(f"{path}: truncated index")
+        if self._offset(entries) != len(self._mm):
+            raise TableError(f"{path}: size does not match index")
+        if verify:
+            with memoryview(self._mm) as view:
+                if zlib.crc32(view[_HEADER.size :]) != crc:
+                    raise TableError(f"{path}: checksum mismatch")
+
+    def _offset(self, i: int) -> int:
+        return _OFFSET.unpack_from(self._mm, _HEADER.size + _OFFSET.size * i)[0]
+
+    def _value(self, i: int) -> int:
+        with memoryview(self._mm) as view:
+            return int.from_bytes(view[self._offset(i) : self._offset(i + 1)], "little")
+
+    def fib(self, n: int) -> Optional[int]:
+        if 0 <= n < self.fib_count:
+            return self._value(n)
+        return None
+
+    def factorial(self, n: int) -> Optional[int]:
+        if 0 <= n < self.fact_count:
+            return self._value(self.fib_count + n)
+        return None
+
+    def close(self) -> None:
+        self._mm.close()
+
+
+def load_table(
+    path: str, fib_max: int, fact_max: int, verify: bool = True
+) -> Optional[ResultTable]:
+    """
+    Open the table at ``path``, or return None (with a warning) if it is
+    missing, corrupt, or does not cover the configured ranges.
+    """
+    if not os.path.exists(path):
+        return None
+    try:
+        table = ResultTable(path, verify=verify)
+    except (OSError, TableError) as e:
+        logger.warning("Ignoring result table: %s", e)
+        return None
+    if table.fib_count <= fib_max or table.fact_count <= fact_max:
+        logger.warning(
+            "Ignoring stale result table %s (covers fib<%d, fact<%d); "
+            "rebuild it with `python -m src.cli build-tables`",
+            path,
+            table.fib_count,
+            table.fact_count,
+        )
+        table.close()
+        return None
+    return table
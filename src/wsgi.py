@@ -0,0 +1,7 @@
+"""WSGI entry point for the pre-fork server: the app is built and warmed once."""
+
+from .app import create_app
+from .serving import warm
+
+app = create_app()
+warm(app)
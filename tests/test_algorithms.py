@@ -0,0 +1,89 @@
+import math
+import pytest
+from src.algorithms.factorial import factorial
+from src.algorithms.factorial import factorial_from
+from src.algorithms.factorial import factorial_many
+from src.algorithms.factorial import range_product
+from src.algorithms.fibonacci import fib_advance
+from src.algorithms.fibonacci import fib_from
+from src.algorithms.fibonacci import fib_pair
+from src.algorithms.fibonacci import fib_pair_matrix
+from src.algorithms.fibonacci import fibonacci
+from src.algorithms.fibonacci import fibonacci_many
+
+
+def _fib_loop(n):
+    # Reference implementation: the original O(n) loop from fib_service
+    a, b = 0, 1
+    for _ in range(n):
+        a, b = b, a + b
+    return a, b
+
+
+@pytest.mark.parametrize("n", list(range(200)) + [1023, 1024, 4097, 20000])
+def test_fib_pair_matches_loop(n):
+    expected = _fib_loop(n)
+    assert fib_pair(n) == expected
+    assert fib_pair_matrix(n) == expected
+
+
+@pytest.mark.parametrize("m,d", [(0, 0), (0, 5), (10, 1), (100, 37), (1000, 4096)])
+def test_fib_advance(m, d):
+    assert fib_advance(fib_pair(m), d) == fib_pair(m + d)
+
+
+def test_fibonacci_known_values():
+    assert fibonacci(0) == 0
+    assert fibonacci(7) == 13
+    assert fibonacci(100) == 354224848179261915075
+
+
+def test_fib_pair_rejects_negative():
+    with pytest.raises(ValueError):
+        fib_pair(-1)
+    with pytest.raises(ValueError):
+        fib_pair_matrix(-1)
+
+
+@pytest.mark.parametrize("n", list(range(300)) + [1000, 4097, 50000])
+def test_factorial_matches_math(n):
+    assert factorial(n) == math.factorial(n)
+
+
+def test_range_product():
+    assert range_product(5, 4) == 1
+    assert range_product(3, 3) == 3
+    assert range_product(11, 200) == math.factorial(200) // math.factorial(10)
+
+
+def test_factorial_rejects_negative():
+    with pytest.raises(ValueError):
+        factorial(-1)
+
+
+def test_many_helpers_match_single_calls():
+    ns = [50, 3, 0, 1000, 3, 777]
+    assert fibonacci_many(ns) == {n: fibonacci(n) for n in ns}
+    assert factorial_many(ns) == {n: math.factorial(n) for n in ns}
+
+
+@pytest.mark.parametrize(
+    "n,start", [(0, 0), (999, 0), (1000, 0), (3500, 1000), (12345, 0)]
+)
+def test_resume_from_checkpoint(n, start):
+    result, new = factorial_from(n, start, math.factorial(start), 1000, 3)
+    assert result == math.factorial(n)
+    assert all(v == math.factorial(k) for k, v in new.items())
+    result, new = fib_from(n, start, fib_pair(start), 1000, 3)
+    assert result == fib_pair(n)[0]
+    assert all(v == fib_pair(k) for k, v in new.items())
+
+
+def test_resume_walks_or_jumps():
+    # Close checkpoint: every boundary on the way is recorded
+    assert sorted(factorial_from(3500, 1000, math.factorial(1000), 1000, 3)[1]) == [
+        2000,
+        3000,
+    ]
+    # Far checkpoint: only the last boundary below n is computed
+    assert sorted(fib_from(12345, 0, (0, 1), 1000, 3)[1]) == [12000]
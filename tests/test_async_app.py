@@ -0,0 +1,304 @@
+import asyncio
+import gzip
+import pytest
+from flask_jwt_extended import create_access_token
+from prometheus_client import REGISTRY
+from src import services
+from src.app import create_app
+from src.async_app import create_asgi_app
+from src.config import Config
+from src.database import db
+from src.models import User
+from src.utils.cache import LRUCache
+from src.utils.cache import TieredCache
+from src.utils.log_writer import BatchLogWriter
+
+
+class _DictRedis:
+    """Sync RedisCache stand-in."""
+
+    def __init__(self, data):
+        self.data = data
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def set(self, key, value, ex=None):
+        self.data[key] = value
+
+    def get_many(self, keys):
+        return [self.data.get(k) for k in keys]
+
+    def set_many(self, items):
+        for key, value, _ in items:
+            self.data[key] = value
+
+    def acquire_lease(self, key, token, ttl_ms):
+        return True
+
+    def release_lease(self, key, token):
+        pass
+
+
+class _AsyncDictRedis:
+    """AsyncRedisCache stand-in over the same data."""
+
+    def __init__(self, data):
+        self.data = data
+        self.closed = False
+
+    async def get(self, key):
+        return self.data.get(key)
+
+    async def close(self):
+        self.closed = True
+
+
+class _Kafka:
+    def __init__(self):
+        self.messages = []
+        self.closed = False
+
+    def send(self, topic, message):
+        self.messages.append((topic, message))
+
+    def close(self, timeout=None):
+        self.closed = True
+
+
+class _AsyncKafka(_Kafka):
+    async def send(self, topic, message):  # type: ignore[override]
+        self.messages.append((topic, message))
+
+    async def close(self, timeout=None):  # type: ignore[override]
+        self.closed = True
+
+
+@pytest.fixture
+def setup(tmp_path, monkeypatch):
+    monkeypatch.setattr(
+        Config, "SQLALCHEMY_DATABASE_URI", f"sqlite:///{tmp_path / 'requests.db'}"
+    )
+    data = {}
+    sync_kafka, async_kafka = _Kafka(), _AsyncKafka()
+    monkeypatch.setattr(
+        services, "cache", TieredCache(LRUCache(max_bytes=10**7), _DictRedis(data))
+    )
+    monkeypatch.setattr(services, "kafka", sync_kafka)
+    monkeypatch.setattr(services, "tables", None)
+    monkeypatch.setattr(
+        services, "_log_writer", BatchLogWriter(lambda rows: None, max_queue=1000)
+    )
+    flask_app = create_app()
+    with flask_app.app_context():
+        user = User(username="alice")
+        user.set_password("s3cret")
+        db.session.add(user)
+        db.session.commit()
+        token = create_access_token(identity="alice")
+    app = create_asgi_app(flask_app, l2=_AsyncDictRedis(data), kafka=async_kafka)
+    yield app, flask_app.test_client(), token, data, sync_kafka, async_kafka
+    app.executor.shutdown()
+
+
+def _request(app, method, path, headers=(), body=b""):
+    """Drive one HTTP request through the ASGI app; return (status, headers, body)."""
+    path, _, query = path.partition("?")
+    sent = []
+
+    async def receive():
+        return {"type": "http.request", "body": body, "more_body": False}
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {
+        "type": "http",
+        "method": method,
+        "path": path,
+        "query_string": query.encode(),
+        "headers": [(k.lower().encode(), v.encode()) for k, v in headers],
+        "http_version": "1.1",
+        "scheme": "http",
+        "server": ("testserver", 80),
+        "client": ("127.0.0.1", 1234),
+        "root_path": "",
+    }
+    asyncio.run(app(scope, receive, send))
+    start = sent[0]
+    content = b"".join(m.get("body", b"") for m in sent[1:])
+    return start["status"], dict(start["headers"]), content
+
+
+def test_responses_match_flask(setup):
+    app, client, token, *_ = setup
+    auth = {"Authorization": f"Bearer {token}"}
+    paths = [
+        "/api/math/pow?base=2&exp=100",
+        "/api/math/pow?base=3&exp=-1&mod=7",
+        "/api/math/pow?base=2&exp=-1&mod=4",
+        "/api/math/pow?base=2&exp=-1",
+        "/api/math/pow?base=x&exp=1",
+        "/api/math/fib?n=90",
+        "/api/math/fib?n=90&mod=1000",
+        "/api/math/fib?n=90&format=hex",
+        "/api/math/fib?n=90&format=base64-bytes",
+        "/api/math/fib?n=90&format=summary",
+        "/api/math/fib?n=90&format=octal",
+        "/api/math/fib?n=-1",
+        "/api/math/factorial?n=25",
+        "/api/math/factorial?n=1000000000",
+        "/api/math/fib/range?start=0&end=10",
+        "/api/math/nope",
+    ]
+    for path in paths:
+        status, headers, body = _request(app, "GET", path, auth.items())
+        expected = client.get(path, headers=auth)
+        assert (status, body) == (expected.status_code, expected.data), path
+        assert headers[b"content-type"].decode() == expected.content_type, path
+
+    for headers in ({}, {"Authorization": "Bearer not-a-token"}):
+        status, _, body = _request(app, "GET", "/api/math/fib?n=5", headers.items())
+        expected = client.get("/api/math/fib?n=5", headers=headers)
+        assert (status, body) == (expected.status_code, expected.data)
+
+    batch = b'{"items": [{"op": "fib", "args": {"n": 7}}]}'
+    headers = {**auth, "Content-Type": "application/json"}
+    status, _, body = _request(app, "POST", "/api/math/batch", headers.items(), batch)
+    expected = client.post("/api/math/batch", data=batch, headers=headers)
+    assert (status, body) == (200, expected.data)
+
+
+def test_cache_hits_are_served_on_the_loop(setup, monkeypatch):
+    app, _, token, data, *_ = setup
+    data["fib:77"] = services.cache.codec.encode(12345)
+
+    def no_executor(*args):
+        raise AssertionError("cache hit went to the executor")
+
+    monkeypatch.setattr(app, "_offload", no_executor)
+    auth = {"Authorization": f"Bearer {token}"}
+    status, _, body = _request(app, "GET", "/api/math/fib?n=77", auth.items())
+    assert (status, body) == (200, b'{"result": 12345}')
+    # Promoted into L1
+    assert services.cache.l1.get("fib:77") == 12345
+
+
+def test_misses_log_through_the_async_producer(setup):
+    app, _, token, data, sync_kafka, async_kafka = setup
+    auth = {"Authorization": f"Bearer {token}"}
+    status, _, body = _request(app, "GET", "/api/math/pow?base=7&exp=3", auth.items())
+    assert (status, body) == (200, b'{"result": 343}')
+    assert "pow:7:3" in data
+    assert async_kafka.messages == [
+        ("request_logs", {"endpoint": "pow", "input": "7,3", "result_hex": "0x157"})
+    ]
+    assert sync_kafka.messages == []
+
+
+def test_login(setup):
+    app, client, *_ = setup
+    headers = {"Content-Type": "application/json"}
+    good = b'{"username": "alice", "password": "s3cret"}'
+    status, _, body = _request(app, "POST", "/auth/login", headers.items(), good)
+    assert status == 200 and b"access_token" in body
+
+    for payload in (b'{"username": "alice", "password": "nope"}', b'{"username": 1}'):
+        status, _, body = _request(app, "POST", "/auth/login", headers.items(), payload)
+        expected = client.post("/auth/login", data=payload, headers=headers)
+        assert (status, body) == (expected.status_code, expected.data)
+
+
+def test_lifespan_shutdown_drains(setup, monkeypatch):
+    app, _, _, _, _, async_kafka = setup
+    drained = []
+    monkeypatch.setattr(services, "shutdown", lambda timeout: drained.append(timeout))
+    messages = iter([{"type": "lifespan.startup"}, {"type": "lifespan.shutdown"}])
+    sent = []
+
+    async def receive():
+        return next(messages)
+
+    async def send(message):
+        sent.append(message["type"])
+
+    asyncio.run(app({"type": "lifespan"}, receive, send))
+    assert sent == ["lifespan.startup.complete", "lifespan.shutdown.complete"]
+    assert async_kafka.closed and app.cache.l2.closed and drained == [5.0]
+
+
+def test_caching_headers_and_compression_match_flask(setup, monkeypatch):
+    app, client, token, *_ = setup
+    monkeypatch.setattr(Config, "STREAM_RESULT_MIN_BITS", 1000)
+    names = ("etag", "cache-control", "vary", "content-encoding")
+    auth = {"Authorization": f"Bearer {token}"}
+    for path in (
+        "/api/math/fib?n=90",
+        "/api/math/factorial?n=1000",
+        "/api/math/factorial?n=1000&format=hex",
+    ):
+        headers = {**auth, "Accept-Encoding": "gzip"}
+        status, got, body = _request(app, "GET", path, headers.items())
+        expected = client.get(path, headers=headers)
+        assert status == expected.status_code == 200
+        assert {n: got.get(n.encode(), b"").decode() for n in names} == {
+            n: expected.headers.get(n, "") for n in names
+        }, path
+        if expected.headers.get("Content-Encoding"):
+            body, expected_body = gzip.decompress(body), gzip.decompress(expected.data)
+        else:
+            expected_body = expected.data
+        assert body == expected_body, path
+
+        headers = {**auth, "If-None-Match": expected.headers["ETag"]}
+        status, got, body = _request(app, "GET", path, headers.items())
+        assert (status, body) == (304, b"")
+        assert got[b"etag"].decode() == expected.headers["ETag"]
+        assert b"content-type" not in got
+
+
+def test_profiled_requests_are_bridged_to_flask(setup, monkeypatch):
+    *_, token, data, _, _ = setup
+    monkeypatch.setattr(Config, "PROFILING_ENABLED", True)
+    monkeypatch.setattr(Config, "ADMIN_USERS", ["root"])
+    flask_app = create_app()
+    with flask_app.app_context():
+        root = f"Bearer {create_access_token(identity='root')}"
+    app = create_asgi_app(flask_app, l2=_AsyncDictRedis(data), kafka=_AsyncKafka())
+    try:
+        headers = {"Authorization": root, "X-Profile": "pstats"}
+        status, resp_headers, body = _request(
+            app, "GET", "/api/math/fib?n=1000&mod=97", headers.items()
+        )
+        assert status == 200
+        assert resp_headers[b"x-profiled-status"] == b"200"
+        assert b"function calls" in body
+        # Only admins may profile, on either path
+        headers["Authorization"] = f"Bearer {token}"
+        status, *_ = _request(app, "GET", "/api/math/fib?n=10", headers.items())
+        assert status == 403
+    finally:
+        app.executor.shutdown()
+
+
+def test_fast_path_records_request_metrics(setup):
+    app, _, token, *_ = setup
+    labels = {"method": "GET", "status": "200"}
+
+    def count():
+        return REGISTRY.get_sample_value("flask_http_request_total", labels) or 0
+
+    def observed():
+        return (
+            REGISTRY.get_sample_value(
+                "flask_http_request_duration_seconds_count",
+                {**labels, "path": "/api/math/fib"},
+            )
+            or 0
+        )
+
+    before = count(), observed()
+    auth = {"Authorization": f"Bearer {token}"}
+    status, *_ = _request(app, "GET", "/api/math/fib?n=20", auth.items())
+    assert status == 200
+    assert (count(), observed()) == (before[0] + 1, before[1] + 1)
@@ -0,0 +1,137 @@
+import inspect
+import pytest
+from flask_jwt_extended import JWTManager
+from flask_jwt_extended import create_access_token
+from flask_jwt_extended import decode_token
+from src.app import create_app
+from src.config import Config
+from src.database import db
+from src.models import User
+from src.utils.auth_cache import ClaimsCache
+from src.utils.auth_cache import LoginThrottle
+from src.utils.auth_cache import TTLCache
+
+
+class _Clock:
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def app(tmp_path, monkeypatch):
+    monkeypatch.setattr(
+        Config, "SQLALCHEMY_DATABASE_URI", f"sqlite:///{tmp_path / 'requests.db'}"
+    )
+    monkeypatch.setattr(Config, "LOGIN_MAX_FAILURES", 3)
+    app = create_app()
+    with app.app_context():
+        user = User(username="alice")
+        user.set_password("s3cret")
+        db.session.add(user)
+        db.session.commit()
+    return app
+
+
+def _login(client, password, username="alice"):
+    return client.post("/auth/login", json={"username": username, "password": password})
+
+
+def test_ttl_cache_expires_and_evicts_lru():
+    clock = _Clock()
+    cache = TTLCache("test", max_entries=2, ttl=10, clock=clock)
+    cache.put("a", 1)
+    cache.put("b", 2, expires_at=clock.now + 5)
+    assert cache.get("a") == 1  # "b" is now least recently used
+    cache.put("c", 3)
+    assert cache.get("b") is None and cache.get("c") == 3
+    clock.now += 10
+    assert cache.get("a") is None and cache.get("c") is None
+    # A size of 0 disables the cache
+    off = TTLCache("test", max_entries=0, ttl=10)
+    off.put("a", 1)
+    assert off.get("a") is None
+
+
+def test_claims_never_outlive_the_token():
+    clock = _Clock()
+    cache = ClaimsCache(max_entries=10, ttl=300, clock=clock)
+    cache.put_claims("t1", {"sub": "alice", "exp": clock.now + 60})
+    cache.put_claims("t2", {"sub": "bob"})  # no exp: the TTL applies
+    claims = cache.get_claims("t1")
+    claims["sub"] = "mallory"  # callers get a copy
+    assert cache.get_claims("t1") == {"sub": "alice", "exp": clock.now + 60}
+    clock.now += 61
+    assert cache.get_claims("t1") is None and cache.get_claims("t2") is not None
+    clock.now += 240
+    assert cache.get_claims("t2") is None
+
+
+def test_throttle_locks_out_with_backoff_and_resets():
+    clock = _Clock()
+    throttle = LoginThrottle(
+        max_failures=2, window=60, lockout=10, max_lockout=15, clock=clock
+    )
+    throttle.record_failure("alice")
+    assert throttle.retry_after("alice") == 0
+    throttle.record_failure("alice")
+    assert throttle.retry_after("alice") == 10
+    clock.now += 10
+    throttle.record_failure("alice")
+    assert throttle.retry_after("alice") == 15  # doubled, capped
+    throttle.record_success("alice")
+    assert throttle.retry_after("alice") == 0
+    # Failures further apart than the window start over
+    throttle.record_failure("bob")
+    clock.now += 61
+    throttle.record_failure("bob")
+    assert throttle.retry_after("bob") == 0
+
+
+def test_jwt_library_still_decodes_through_the_overridden_method():
+    # CachingJWTManager overrides a private method; fail loudly if it drifts
+    params = inspect.signature(JWTManager._decode_jwt_from_config).parameters
+    assert list(params) == ["self", "encoded_token", "csrf_value", "allow_expired"]
+    assert params["csrf_value"].default is None
+    assert params["allow_expired"].default is False
+    assert "_decode_jwt_from_config" in inspect.getsource(decode_token)
+
+
+def test_tokens_are_verified_once(app, monkeypatch):
+    calls = []
+    decode = JWTManager._decode_jwt_from_config
+
+    def counting(self, *args, **kwargs):
+        calls.append(args[0])
+        return decode(self, *args, **kwargs)
+
+    monkeypatch.setattr(JWTManager, "_decode_jwt_from_config", counting)
+    with app.app_context():
+        token = create_access_token(identity="alice")
+    client = app.test_client()
+    headers = {"Authorization": f"Bearer {token}"}
+    for _ in range(3):
+        assert client.get("/api/math/fib?n=10", headers=headers).status_code == 200
+    assert calls == [token]
+    # A tampered token is not served from the cache
+    bad = {"Authorization": f"Bearer {token[:-2]}xx"}
+    assert client.get("/api/math/fib?n=10", headers=bad).status_code == 422
+
+
+def test_login_caches_users_and_throttles_failures(app):
+    client = app.test_client()
+    assert _login(client, "s3cret").status_code == 200
+    # Served from the user cache once the row is gone
+    with app.app_context():
+        db.session.delete(User.query.filter_by(username="alice").one())
+        db.session.commit()
+    assert _login(client, "s3cret").status_code == 200
+
+    for _ in range(3):
+        assert _login(client, "wrong").status_code == 401
+    rv = _login(client, "s3cret")
+    assert rv.status_code == 429 and int(rv.headers["Retry-After"]) > 0
+    # Other usernames are unaffected
+    assert _login(client, "x", username="bob").status_code == 401
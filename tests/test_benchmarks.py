@@ -0,0 +1,59 @@
+import json
+from benchmarks.startup import StartupCase
+from benchmarks.startup import evaluate
+from benchmarks.startup import time_command
+from benchmarks.suite import compare
+from benchmarks.suite import main
+from benchmarks.suite import run
+
+
+def _results(**medians):
+    return {"benchmarks": {k: {"median": v} for k, v in medians.items()}}
+
+
+def test_compare_flags_regressions_past_threshold():
+    rows = compare(
+        _results(a=1.0, b=1.0, c=1.0, gone=1.0),
+        _results(a=1.2, b=1.3, c=0.5, new=1.0),
+        threshold=0.25,
+    )
+    assert {row["name"]: row["status"] for row in rows} == {
+        "a": "ok",
+        "b": "regressed",
+        "c": "improved",
+        "gone": "missing",
+        "new": "new",
+    }
+
+
+def test_run_writes_json_and_compare_gates(tmp_path, capsys):
+    results = run(
+        quick=True, groups=["codec"], rounds=2, min_time=0.001, echo=lambda _: None
+    )
+    assert "codec.encode[1000b]" in results["benchmarks"]
+    entry = results["benchmarks"]["codec.decode[1000b]"]
+    assert entry["rounds"] == 2 and entry["min"] <= entry["median"] <= entry["max"]
+
+    base, cur = tmp_path / "base.json", tmp_path / "cur.json"
+    base.write_text(json.dumps(_results(x=1.0)))
+    cur.write_text(json.dumps(_results(x=1.1)))
+    assert main(["compare", str(base), str(cur), "--threshold", "0.2"]) == 0
+    cur.write_text(json.dumps(_results(x=2.0)))
+    assert main(["compare", str(base), str(cur), "--threshold", "0.2"]) == 1
+    assert "regressed" in capsys.readouterr().out
+
+
+def test_startup_targets_are_overhead_over_bare_python():
+    cases = [
+        StartupCase("python", ["-c", "pass"], None),
+        StartupCase("fast", [], 0.1),
+        StartupCase("slow", [], 0.1),
+    ]
+    rows = evaluate({"python": 0.05, "fast": 0.12, "slow": 0.2}, cases)
+    assert [row["status"] for row in rows] == ["-", "ok", "missed"]
+    assert abs(rows[2]["overhead"] - 0.15) < 1e-9
+
+
+def test_startup_times_fresh_interpreters():
+    times = time_command(["-c", "pass"], rounds=2)
+    assert len(times) == 2 and all(t > 0 for t in times)
@@ -0,0 +1,170 @@
+import asyncio
+from redis.exceptions import ConnectionError as RedisConnectionError
+from src.utils.cache import AsyncRedisCache
+from src.utils.cache import AsyncTieredCache
+from src.utils.cache import LRUCache
+from src.utils.cache import RedisCache
+from src.utils.cache import TieredCache
+from src.utils.circuit_breaker import CircuitBreaker
+
+
+class _DictRedis:
+    """In-process stand-in for RedisCache."""
+
+    def __init__(self, up=True):
+        self.up = up
+        self.data = {}
+
+    def get(self, key):
+        if not self.up:
+            return None
+        return self.data.get(key)
+
+    def set(self, key, value, ex=None):
+        if self.up:
+            self.data[key] = str(value).encode()
+
+
+def test_lru_evicts_least_recently_used_by_bytes():
+    lru = LRUCache(max_bytes=30)
+    lru.set("a", b"x" * 9)  # 10 bytes with key
+    lru.set("b", b"x" * 9)
+    lru.set("c", b"x" * 9)
+    assert lru.get("a") is not None  # "a" is now most recent
+    lru.set("d", b"x" * 9)
+    assert lru.get("b") is None
+    assert lru.get("a") is not None
+    assert lru.stats()["evictions"] == 1
+    assert lru.current_bytes <= 30
+
+
+def test_lru_rejects_oversized_items():
+    lru = LRUCache(max_bytes=1000, max_item_bytes=10)
+    lru.set("small", 1)
+    lru.set("big", 1 << 1000)
+    assert lru.get("small") == 1
+    assert lru.get("big") is None
+    assert lru.stats()["evictions"] == 0
+
+
+def test_lru_counts_hits_and_misses():
+    lru = LRUCache(max_bytes=1000)
+    lru.set("k", 42)
+    lru.get("k")
+    lru.get("missing")
+    stats = lru.stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+
+
+def test_tiered_cache_promotes_l2_hits():
+    l2 = _DictRedis()
+    l2.data["fib:10"] = b"55"
+    cache = TieredCache(LRUCache(max_bytes=1000), l2)
+    assert int(cache.get("fib:10")) == 55
+    l2.data.clear()
+    assert int(cache.get("fib:10")) == 55
+
+
+def test_tiered_cache_works_when_redis_is_down():
+    cache = TieredCache(LRUCache(max_bytes=1000), _DictRedis(up=False))
+    assert cache.get("pow:2:8") is None
+    cache.set("pow:2:8", 256)
+    assert cache.get("pow:2:8") == 256
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_circuit_breaker_opens_and_probes_with_backoff():
+    clock = _Clock()
+    breaker = CircuitBreaker("test", failure_threshold=2, base_backoff=1.0, clock=clock)
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.CLOSED
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    assert not breaker.allow()
+
+    # After the backoff a single probe is allowed; failing it doubles the wait
+    clock.now = 1.0
+    assert breaker.allow()
+    assert not breaker.allow()
+    breaker.record_failure()
+    clock.now = 2.5
+    assert not breaker.allow()
+    clock.now = 3.0
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert breaker.allow()
+
+
+class _FailingClient:
+    def __init__(self):
+        self.calls = 0
+
+    def get(self, key):
+        self.calls += 1
+        raise RedisConnectionError("down")
+
+    def set(self, key, value, ex=None):
+        self.calls += 1
+        raise RedisConnectionError("down")
+
+
+def test_redis_cache_skips_calls_while_breaker_is_open():
+    breaker = CircuitBreaker("redis-test", failure_threshold=1, base_backoff=60)
+    rc = RedisCache("redis://localhost:1/0", breaker=breaker)
+    client = _FailingClient()
+    rc._client = client  # type: ignore[assignment]
+    assert rc.get("k") is None
+    rc.set("k", 1)
+    assert rc.get("k") is None
+    assert client.calls == 1
+
+
+def test_tiered_cache_int_values_roundtrip_through_codec():
+    l2 = _DictRedis()
+    l2.set = lambda key, value, ex=None: l2.data.__setitem__(key, value)
+    cache = TieredCache(LRUCache(max_bytes=10), l2)
+    value = 10**5000  # past CPython's default int/str digit limit
+    cache.set_int("pow:10:5000", value)
+    assert isinstance(l2.data["pow:10:5000"], bytes)
+    assert cache.get_int("pow:10:5000") == value
+    # A corrupt payload reads as a miss rather than an error
+    l2.data["fib:7"] = b"\x00I\x01\x02garbage"
+    assert cache.get_int("fib:7") is None
+
+
+class _AsyncFailingClient:
+    def __init__(self):
+        self.calls = 0
+
+    async def get(self, key):
+        self.calls += 1
+        raise RedisConnectionError("down")
+
+
+def test_async_tiered_cache_reads_l1_then_shared_breaker_l2():
+    breaker = CircuitBreaker("redis-test", failure_threshold=1, base_backoff=60)
+    tiered = TieredCache(LRUCache(max_bytes=10_000), _DictRedis())
+    l2 = AsyncRedisCache("redis://localhost:1/0", breaker=breaker)
+    cache = AsyncTieredCache(tiered, l2)
+    tiered.l1.set("fib:10", 55)
+    client = _AsyncFailingClient()
+    l2._client = client  # type: ignore[assignment]
+
+    async def scenario():
+        assert await cache.get_int("fib:10") == 55  # L1, no Redis call
+        assert await cache.get_int("fib:11") is None
+        assert await cache.get_int("fib:12") is None  # breaker now open
+
+    asyncio.run(scenario())
+    assert client.calls == 1
+    # A RedisCache given the same breaker skips Redis too
+    assert not breaker.allow()
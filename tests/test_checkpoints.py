@@ -0,0 +1,63 @@
+import math
+from src.algorithms.fibonacci import fib_pair
+from src.utils.cache import LRUCache
+from src.utils.cache import TieredCache
+from src.utils.checkpoints import CheckpointLadder
+from src.utils.compute_pool import ComputePool
+
+
+class _DictRedis:
+    """In-process stand-in for RedisCache with batch operations."""
+
+    def __init__(self):
+        self.data = {}
+        self.gets = []
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def set(self, key, value, ex=None):
+        self.data[key] = value
+
+    def get_many(self, keys):
+        self.gets.append(list(keys))
+        return [self.data.get(k) for k in keys]
+
+    def set_many(self, items):
+        for key, value, _ in items:
+            self.data[key] = value
+
+
+def _make(**kwargs):
+    l2 = _DictRedis()
+    cache = TieredCache(LRUCache(max_bytes=0), l2)
+    pool = ComputePool(inline_max_bits=10**9, max_bits=10**10)
+    return l2, cache, CheckpointLadder(cache, pool, **kwargs)
+
+
+def test_factorial_stores_and_reuses_checkpoints():
+    l2, cache, ladder = _make(step=100, probe=3, max_new=2, min_n=200)
+    assert ladder.factorial(1050) == math.factorial(1050)
+    assert cache.get_int("fact:1000") == math.factorial(1000)
+    # Next miss resumes from fact:1000 and records the boundaries it passes
+    assert ladder.factorial(1234) == math.factorial(1234)
+    assert cache.get_int("fact:1100") == math.factorial(1100)
+    assert cache.get_int("fact:1200") == math.factorial(1200)
+    # One MGET per lookup over the probed multiples of step
+    assert l2.gets[-1] == ["fact:1200", "fact:1100", "fact:1000"]
+
+
+def test_fibonacci_checkpoints_are_plain_pairs():
+    _, cache, ladder = _make(step=100, probe=2, max_new=1, min_n=200)
+    assert ladder.fibonacci(555) == fib_pair(555)[0]
+    a, b = cache.get_int("fib:500"), cache.get_int("fib:501")
+    assert (a, b) == fib_pair(500)
+    assert ladder.fibonacci(650) == fib_pair(650)[0]
+    assert cache.get_int("fib:600") == fib_pair(600)[0]
+
+
+def test_small_inputs_skip_the_ladder():
+    l2, _, ladder = _make(step=100, min_n=1000)
+    assert ladder.factorial(500) == math.factorial(500)
+    assert ladder.fibonacci(500) == fib_pair(500)[0]
+    assert l2.gets == [] and l2.data == {}
@@ -0,0 +1,45 @@
+import os
+import subprocess
+import sys
+from click.testing import CliRunner
+from flask import Flask
+from src import cli
+from src import services
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+WEB_STACK = ("flask", "flasgger", "sqlalchemy", "flask_jwt_extended", "redis", "kafka")
+
+
+def test_math_commands_skip_the_web_stack():
+    code = (
+        "import sys\n"
+        "from src.cli import cli\n"
+        "try:\n"
+        "    cli(['fib', '10'])\n"
+        "except SystemExit:\n"
+        "    pass\n"
+        f"print(sorted(m for m in {WEB_STACK!r} if m in sys.modules))\n"
+    )
+    out = subprocess.run(
+        [sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True
+    ).stdout
+    assert out.splitlines() == ["55", "[]"]
+
+
+def test_math_commands_compute_directly():
+    runner = CliRunner()
+    assert runner.invoke(cli.cli, ["power", "2", "100"]).output == f"{2**100}\n"
+    assert runner.invoke(cli.cli, ["fact", "20"]).output == "2432902008176640000\n"
+    # Past the int -> str digit limit
+    result = runner.invoke(cli.cli, ["fib", "30000"])
+    assert result.exit_code == 0 and len(result.output.strip()) == 6270
+    assert runner.invoke(cli.cli, ["power", "5", "-2"]).exit_code == 2
+    assert runner.invoke(cli.cli, ["fib", "-1"]).exit_code == 2
+
+
+def test_service_flag_goes_through_the_service_layer(monkeypatch):
+    calls = []
+    monkeypatch.setattr(cli, "_app", Flask(__name__))
+    monkeypatch.setattr(services, "fib_service", lambda n: calls.append(n) or 55)
+    result = CliRunner().invoke(cli.cli, ["fib", "10", "--service"])
+    assert (result.output, calls) == ("55\n", [10])
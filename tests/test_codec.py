@@ -0,0 +1,50 @@
+import math
+import pytest
+from src.utils.codec import CodecError
+from src.utils.codec import IntCodec
+from src.utils.codec import SizeAwareTTL
+
+
+@pytest.mark.parametrize(
+    "value",
+    [0, 1, -1, 255, 256, -(2**64), 2**100, math.factorial(3000), 10**20000],
+    ids=lambda v: f"bits{v.bit_length()}",
+)
+def test_codec_roundtrip(value):
+    for compression in ("zlib", "lz4", "none"):
+        codec = IntCodec(compress_threshold=16, compression=compression)
+        assert codec.decode(codec.encode(value)) == value
+
+
+def test_codec_is_smaller_than_decimal():
+    value = math.factorial(20000)
+    data = IntCodec().encode(value)
+    # Raw bits are ~log2(10) times denser than digits, minus stripped zeros
+    assert len(data) < value.bit_length() // 8
+
+
+def test_codec_reads_legacy_decimal_values():
+    assert IntCodec().decode(b"720") == 720
+
+
+def test_codec_rejects_unknown_versions():
+    with pytest.raises(CodecError):
+        IntCodec().decode(b"\x00I\x09\x00")
+
+
+@pytest.mark.parametrize(
+    "data",
+    [b"\x00I\x01\x02not zlib", b"\x00I\x01\x04not lz4", b"\x00I\x01\x08\x00", b"\x00I"],
+    ids=["zlib", "lz4", "shift", "header"],
+)
+def test_codec_rejects_corrupt_values(data):
+    with pytest.raises(CodecError):
+        IntCodec().decode(data)
+
+
+def test_size_aware_ttl():
+    policy = SizeAwareTTL(small_bytes=100, small_ttl=3600, large_ttl=60, max_bytes=1000)
+    assert policy(10) == 3600
+    assert policy(500) == 60
+    assert policy.allows(1000)
+    assert not policy.allows(1001)
@@ -0,0 +1,99 @@
+import math
+import time
+import pytest
+from src.algorithms.cost import fact_bits
+from src.algorithms.cost import fib_bits
+from src.algorithms.cost import pow_bits
+from src.algorithms.cost import range_bits
+from src.algorithms.factorial import factorial
+from src.algorithms.fibonacci import fibonacci
+from src.utils.compute_pool import ComputationTooExpensive
+from src.utils.compute_pool import ComputeBusy
+from src.utils.compute_pool import ComputeLimitExceeded
+from src.utils.compute_pool import ComputePool
+from src.utils.compute_pool import resource
+
+
+def _spin(seconds):
+    # Module-level so a spawned worker can import it
+    total = 0
+    while True:
+        total += 1
+
+
+@pytest.mark.parametrize("base,exp", [(2, 1000), (10, 5000), (-3, 777), (7, 1)])
+def test_pow_bits_estimate(base, exp):
+    assert abs(pow_bits(base, exp) - (base**exp).bit_length()) <= 1
+
+
+@pytest.mark.parametrize("n", [1, 2, 10, 1000, 25000])
+def test_fib_and_fact_bits_estimates(n):
+    assert abs(fib_bits(n) - fibonacci(n).bit_length()) <= 1
+    assert abs(fact_bits(n) - math.factorial(n).bit_length()) <= 1
+
+
+def test_range_bits_bounds_the_streamed_terms():
+    fib_total = sum(fibonacci(k).bit_length() for k in range(100, 2001))
+    fact_total = sum(math.factorial(k).bit_length() for k in range(100, 2001))
+    assert abs(range_bits(fib_bits, 100, 2000) - fib_total) <= 1901
+    assert fact_total <= range_bits(fact_bits, 100, 2000) <= fact_total * 1.1
+
+
+def test_trivial_pow_is_cheap():
+    assert pow_bits(1, 10**12) == 1
+    assert pow_bits(5, 0) == 1
+
+
+def test_rejects_above_ceiling_without_running():
+    pool = ComputePool(inline_max_bits=10, max_bits=100)
+    with pytest.raises(ComputationTooExpensive) as info:
+        pool.run(101, pytest.fail, "should not run")
+    assert info.value.estimated_bits == 101
+
+
+def test_cheap_calls_run_inline():
+    pool = ComputePool(inline_max_bits=10_000, max_bits=10**9)
+    assert pool.run(fact_bits(20), factorial, 20) == math.factorial(20)
+    assert pool._executor is None
+
+
+def test_expensive_calls_are_offloaded():
+    pool = ComputePool(inline_max_bits=0, max_bits=10**9, workers=1)
+    try:
+        assert pool.run(fact_bits(3000), factorial, 3000) == math.factorial(3000)
+        assert pool._executor is not None
+    finally:
+        pool.shutdown()
+
+
+def test_busy_pool_fails_fast():
+    pool = ComputePool(inline_max_bits=0, max_bits=10**9, max_pending=1)
+    assert pool._slots.acquire(blocking=False)
+    with pytest.raises(ComputeBusy):
+        pool.run(10, factorial, 5)
+
+
+def test_timed_out_task_keeps_its_slot_until_it_ends():
+    pool = ComputePool(inline_max_bits=0, max_bits=10**9, workers=1, max_pending=1)
+    try:
+        assert pool.run(10, factorial, 5) == 120  # worker is up
+        pool.timeout = 0.2
+        with pytest.raises(ComputeLimitExceeded):
+            pool.run(10, time.sleep, 1.0)
+        # The worker is still sleeping, so there is no capacity yet
+        with pytest.raises(ComputeBusy):
+            pool.run(10, factorial, 5)
+        time.sleep(1.5)
+        assert pool.run(10, factorial, 5) == 120
+    finally:
+        pool.shutdown()
+
+
+@pytest.mark.skipif(resource is None, reason="needs POSIX resource limits")
+def test_cpu_limit_aborts_runaway_task():
+    pool = ComputePool(inline_max_bits=0, max_bits=10**9, workers=1, cpu_seconds=1)
+    try:
+        with pytest.raises(ComputeLimitExceeded):
+            pool.run(10, _spin, 0)
+    finally:
+        pool.shutdown()
@@ -0,0 +1,66 @@
+import base64
+import hashlib
+import math
+import sys
+import pytest
+from src.algorithms.formatting import json_dumps
+from src.algorithms.formatting import summarize
+from src.algorithms.formatting import to_base64
+from src.algorithms.formatting import to_bytes
+from src.algorithms.formatting import to_decimal
+
+CASES = [
+    0,
+    7,
+    -123,
+    10**5000,
+    10**5000 - 1,
+    -(7**20000),
+    math.factorial(6000),
+    2**100000,
+    10**30000 + 1,
+    12345678901234567890 * 10**9000 - 1,
+]
+
+
+@pytest.fixture
+def no_digit_limit():
+    # Lets the tests build reference strings with str()
+    old = sys.get_int_max_str_digits()
+    sys.set_int_max_str_digits(0)
+    yield
+    sys.set_int_max_str_digits(old)
+
+
+@pytest.mark.parametrize("n", CASES, ids=lambda n: f"bits{n.bit_length()}")
+def test_to_decimal_matches_str(no_digit_limit, n):
+    assert to_decimal(n) == str(n)
+
+
+@pytest.mark.parametrize("n", CASES, ids=lambda n: f"bits{n.bit_length()}")
+def test_summary_matches_full_conversion(no_digit_limit, n):
+    text = str(abs(n))
+    summary = summarize(n)
+    assert summary["sign"] == (-1 if n < 0 else 1)
+    assert summary["digits"] == len(text)
+    assert summary["leading_digits"] == text[:20]
+    assert summary["trailing_digits"] == text[-20:]
+    assert summary["sha256"] == hashlib.sha256(to_bytes(n)).hexdigest()
+
+
+def test_to_decimal_works_past_the_digit_limit():
+    n = 10**10000
+    assert sys.get_int_max_str_digits() and n.bit_length() > 30000
+    assert to_decimal(n) == "1" + "0" * 10000
+
+
+def test_base64_bytes_roundtrip():
+    for n in (0, 1, -1, 255, -256, 2**1000 + 1):
+        raw = base64.b64decode(to_base64(n))
+        assert int.from_bytes(raw, "big", signed=True) == n
+
+
+def test_json_dumps_handles_big_ints():
+    assert json_dumps({"a": [1, None, True, "x"], "b": 10**5000}) == (
+        '{"a": [1, null, true, "x"], "b": 1' + "0" * 5000 + "}"
+    )
@@ -0,0 +1,99 @@
+import gzip
+import json
+import zlib
+import pytest
+from flask_jwt_extended import create_access_token
+from src.app import create_app
+from src.config import Config
+from src.controllers import math_controller
+from src.utils.http_cache import choose_encoding
+from src.utils.http_cache import compress_chunks
+from src.utils.http_cache import etag_matches
+from src.utils.http_cache import result_etag
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    monkeypatch.setattr(
+        Config, "SQLALCHEMY_DATABASE_URI", f"sqlite:///{tmp_path / 'requests.db'}"
+    )
+    app = create_app()
+    with app.app_context():
+        token = create_access_token(identity="testuser")
+    client = app.test_client()
+    client.environ_base["HTTP_AUTHORIZATION"] = f"Bearer {token}"
+    return client
+
+
+def test_etags_identify_the_representation():
+    tag = result_etag("fib", (10,), None, "dec")
+    assert tag == result_etag("fib", (10,), None, "dec")
+    others = [
+        result_etag("fib", (11,), None, "dec"),
+        result_etag("fib", (10,), 7, "dec"),
+        result_etag("fib", (10,), None, "hex"),
+        result_etag("factorial", (10,), None, "dec"),
+        result_etag("pow", (1, 0), None, "dec"),
+        result_etag("pow", (10,), None, "dec"),
+    ]
+    assert tag not in others and len(set(others)) == len(others)
+    assert etag_matches(f'"x", W/"{tag}"', tag) and etag_matches("*", tag)
+    assert not etag_matches('"x"', tag) and not etag_matches(None, tag)
+
+
+def test_encoding_negotiation_and_streamed_compression():
+    assert choose_encoding("deflate, gzip;q=0.5") == "deflate"
+    assert choose_encoding("gzip;q=0, br") is None
+    assert choose_encoding(None) is None
+    chunks = [b"123" * 1000, b"456" * 1000]
+    body = b"".join(chunks)
+    assert gzip.decompress(b"".join(compress_chunks(chunks, "gzip"))) == body
+    assert zlib.decompress(b"".join(compress_chunks(chunks, "deflate"))) == body
+
+
+def test_results_carry_caching_headers(client):
+    rv = client.get("/api/math/fib?n=10")
+    assert rv.status_code == 200 and rv.get_json() == {"result": 55}
+    assert rv.headers["ETag"] == f'W/"{result_etag("fib", (10,), None, "dec")}"'
+    assert rv.headers["Cache-Control"] == Config.RESULT_CACHE_CONTROL
+    assert rv.headers["Vary"] == "Accept-Encoding"
+    assert "Content-Encoding" not in rv.headers  # below HTTP_COMPRESS_MIN_BYTES
+    # Errors are not cacheable
+    assert "ETag" not in client.get("/api/math/fib?n=-1").headers
+    assert "ETag" not in client.get("/api/math/pow?base=2&exp=-1&mod=4").headers
+
+
+def test_if_none_match_skips_all_work(client, monkeypatch):
+    etag = client.get("/api/math/pow?base=3&exp=5&mod=7").headers["ETag"]
+    calls = []
+    monkeypatch.setattr(
+        math_controller, "pow_service", lambda *args: calls.append(args) or 5
+    )
+    rv = client.get("/api/math/pow?base=3&exp=5&mod=7", headers={"If-None-Match": etag})
+    assert rv.status_code == 304 and rv.data == b"" and calls == []
+    assert rv.headers["ETag"] == etag
+    assert rv.headers["Cache-Control"] == Config.RESULT_CACHE_CONTROL
+    # A different representation does not match
+    rv = client.get(
+        "/api/math/pow?base=3&exp=5&mod=7&format=hex",
+        headers={"If-None-Match": etag},
+    )
+    assert rv.status_code == 200 and calls == [(3, 5, 7)]
+
+
+def test_large_bodies_are_compressed(client, monkeypatch):
+    monkeypatch.setattr(Config, "STREAM_RESULT_MIN_BITS", 1000)
+    for path, encoding, decompress in [
+        ("/api/math/factorial?n=1000", "gzip", gzip.decompress),  # streamed
+        ("/api/math/factorial?n=1000&format=hex", "deflate", zlib.decompress),
+    ]:
+        plain = client.get(path)
+        rv = client.get(path, headers={"Accept-Encoding": encoding})
+        assert rv.headers["Content-Encoding"] == encoding
+        assert rv.headers["ETag"] == plain.headers["ETag"]
+        assert decompress(rv.data) == plain.data
+        json.loads(plain.data)
+    # Disabled with HTTP_COMPRESS_MIN_BYTES=0
+    monkeypatch.setattr(Config, "HTTP_COMPRESS_MIN_BYTES", 0)
+    rv = client.get("/api/math/factorial?n=1000", headers={"Accept-Encoding": "gzip"})
+    assert "Content-Encoding" not in rv.headers and "Vary" not in rv.headers
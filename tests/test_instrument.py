@@ -0,0 +1,41 @@
+import pytest
+from prometheus_client import REGISTRY
+from src.utils.instrument import count_lookup
+from src.utils.instrument import observe_result
+from src.utils.instrument import stage
+
+
+def _sample(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+def test_context_manager_records_latency_and_errors():
+    labels = {"stage": "unit", "op": "ctx"}
+    before = _sample("math_stage_seconds_count", **labels)
+    with stage("unit", "ctx"):
+        pass
+    with pytest.raises(KeyError):
+        with stage("unit", "ctx"):
+            raise KeyError("x")
+    assert _sample("math_stage_seconds_count", **labels) == before + 2
+    assert _sample("math_stage_errors_total", error="KeyError", **labels) == 1
+
+
+def test_decorator_times_each_call():
+    @stage("unit", "deco")
+    def double(x):
+        return 2 * x
+
+    assert double.__name__ == "double"
+    before = _sample("math_stage_seconds_count", stage="unit", op="deco")
+    assert [double(i) for i in range(3)] == [0, 2, 4]
+    assert _sample("math_stage_seconds_count", stage="unit", op="deco") == before + 3
+
+
+def test_lookup_and_result_size_metrics():
+    before = _sample("math_cache_lookups_total", op="unit", result="hit")
+    count_lookup("unit", "hit")
+    assert _sample("math_cache_lookups_total", op="unit", result="hit") == before + 1
+    assert observe_result("unit", 2**20) == 2**20
+    assert _sample("math_result_bits_bucket", op="unit", le="16.0") == 0
+    assert _sample("math_result_bits_bucket", op="unit", le="64.0") == 1
@@ -0,0 +1,217 @@
+import asyncio
+import threading
+import time
+from kafka import errors
+from src.utils.kafka_logger import AIOKafkaError
+from src.utils.kafka_logger import AsyncKafkaLogger
+from src.utils.kafka_logger import KafkaLogger
+
+
+class _Future:
+    def __init__(self, error=None):
+        self.error = error
+
+    def add_callback(self, fn):
+        if self.error is None:
+            fn("metadata")
+        return self
+
+    def add_errback(self, fn):
+        if self.error is not None:
+            fn(self.error)
+        return self
+
+
+class _FakeProducer:
+    """In-process stand-in for KafkaProducer."""
+
+    def __init__(self, fail_delivery=False, **config):
+        self.config = config
+        self.fail_delivery = fail_delivery
+        self.messages = []
+        self.flushes = []
+        self.closed = False
+
+    def send(self, topic, value=None):
+        self.messages.append((topic, value))
+        return _Future(errors.KafkaTimeoutError() if self.fail_delivery else None)
+
+    def flush(self, timeout=None):
+        self.flushes.append(timeout)
+
+    def close(self, timeout=None):
+        self.closed = True
+
+
+class _Factory:
+    def __init__(self, down_calls=0, **producer_kwargs):
+        self.down_calls = down_calls
+        self.calls = 0
+        self.producer_kwargs = producer_kwargs
+        self.producer = None
+
+    def __call__(self, **config):
+        self.calls += 1
+        if self.calls <= self.down_calls:
+            raise errors.NoBrokersAvailable()
+        self.producer = _FakeProducer(**self.producer_kwargs, **config)
+        return self.producer
+
+
+def _inline(fn):
+    fn()
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_send_does_not_flush_per_message():
+    factory = _Factory()
+    kl = KafkaLogger(
+        "broker:9092", producer_factory=factory, linger_ms=50, spawn=_inline
+    )
+    for i in range(3):
+        kl.send("request_logs", {"i": i})
+    assert len(factory.producer.messages) == 3
+    assert factory.producer.flushes == []
+    assert factory.producer.config["linger_ms"] == 50
+    assert kl.sent == 3
+
+
+def test_delivery_failures_are_counted():
+    factory = _Factory(fail_delivery=True)
+    kl = KafkaLogger("broker:9092", producer_factory=factory, spawn=_inline)
+    kl.send("request_logs", {"i": 1})
+    assert kl.failed == 1
+
+
+def test_broker_down_spills_and_backs_off():
+    clock = _Clock()
+    factory = _Factory(down_calls=1)
+    kl = KafkaLogger(
+        "broker:9092",
+        producer_factory=factory,
+        retry_backoff=10,
+        spill_size=2,
+        clock=clock,
+        spawn=_inline,
+    )
+    for i in range(3):
+        kl.send("request_logs", {"i": i})
+    # One construction attempt, not one per call
+    assert factory.calls == 1
+    assert kl.dropped == 1
+
+    clock.now = 10
+    kl.send("request_logs", {"i": 3})
+    assert factory.calls == 2
+    # Spilled messages are replayed in order before the new one
+    assert [m["i"] for _, m in factory.producer.messages] == [1, 2, 3]
+
+
+def test_slow_producer_creation_never_blocks_send():
+    release = threading.Event()
+    factory = _Factory()
+
+    def slow_factory(**config):
+        release.wait(5)
+        return factory(**config)
+
+    kl = KafkaLogger("broker:9092", producer_factory=slow_factory, api_version=(2, 0))
+    start = time.perf_counter()
+    threads = [
+        threading.Thread(target=kl.send, args=("request_logs", {"i": i}))
+        for i in range(5)
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert time.perf_counter() - start < 1.0
+    assert factory.calls == 0 and len(kl._spill) == 5  # spilled meanwhile
+    release.set()
+    deadline = time.monotonic() + 5
+    while kl.sent < 5 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    # Created once, then the spill is delivered without another send
+    assert factory.calls == 1
+    assert sorted(m["i"] for _, m in factory.producer.messages) == [0, 1, 2, 3, 4]
+    assert factory.producer.config["api_version"] == (2, 0)
+
+
+def test_close_flushes_with_deadline():
+    factory = _Factory()
+    kl = KafkaLogger("broker:9092", producer_factory=factory, spawn=_inline)
+    kl.send("request_logs", {"i": 1})
+    producer = factory.producer
+    kl.close(timeout=2.0)
+    assert len(producer.flushes) == 1 and producer.flushes[0] <= 2.0
+    assert producer.closed
+
+
+class _AsyncFakeProducer:
+    """In-process stand-in for AIOKafkaProducer."""
+
+    def __init__(self, factory, **config):
+        self.factory = factory
+        self.config = config
+        self.messages = []
+        self.flushed = False
+        self.stopped = False
+
+    async def start(self):
+        self.factory.calls += 1
+        if self.factory.calls <= self.factory.down_calls:
+            raise AIOKafkaError()
+
+    async def send(self, topic, value=None):
+        self.messages.append((topic, value))
+        future = asyncio.get_running_loop().create_future()
+        future.set_result("metadata")
+        return future
+
+    async def flush(self):
+        self.flushed = True
+
+    async def stop(self):
+        self.stopped = True
+
+
+class _AsyncFactory:
+    def __init__(self, down_calls=0):
+        self.down_calls = down_calls
+        self.calls = 0
+        self.producer = None
+
+    def __call__(self, **config):
+        self.producer = _AsyncFakeProducer(self, **config)
+        return self.producer
+
+
+def test_async_logger_spills_backs_off_and_drains():
+    clock = _Clock()
+    factory = _AsyncFactory(down_calls=1)
+    kl = AsyncKafkaLogger(
+        "broker:9092", producer_factory=factory, retry_backoff=10, clock=clock
+    )
+
+    async def scenario():
+        await kl.send("request_logs", {"i": 0})
+        await kl.send("request_logs", {"i": 1})
+        assert factory.calls == 1  # backing off, not retrying per call
+        clock.now = 10
+        await kl.send("request_logs", {"i": 2})
+        await asyncio.sleep(0)  # delivery callbacks
+        producer = factory.producer
+        assert [m["i"] for _, m in producer.messages] == [0, 1, 2]
+        assert producer.config["max_batch_size"] == 64 * 1024
+        await kl.close(timeout=1.0)
+        assert producer.flushed and producer.stopped
+
+    asyncio.run(scenario())
+    assert kl.sent == 3 and kl.dropped == 0
@@ -0,0 +1,99 @@
+import threading
+from http.server import BaseHTTPRequestHandler
+from http.server import ThreadingHTTPServer
+import pytest
+from src.loadtest import LoadTest
+from src.loadtest import ReplayMix
+from src.loadtest import RequestMix
+from src.loadtest import log_path
+from src.loadtest import percentile
+from src.loadtest import summarize
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    seen = []
+
+    def do_GET(self):
+        self.seen.append((self.path, self.headers.get("Authorization")))
+        status = 500 if "n=13" in self.path else 200
+        self.send_response(status)
+        self.send_header("Content-Length", "2")
+        self.end_headers()
+        self.wfile.write(b"{}")
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    _Handler.seen = []
+    yield f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.shutdown()
+
+
+def test_request_mix_respects_ops_and_bounds():
+    mix = RequestMix("fib:100=3,pow:10=1", seed=1)
+    paths = [mix() for _ in range(500)]
+    assert {p.split("?")[0] for p in paths} == {"/api/math/fib", "/api/math/pow"}
+    ns = [int(p.split("n=")[1]) for p in paths if "fib" in p]
+    assert min(ns) >= 0 and max(ns) <= 100
+    for bad in ["", "sqrt:10=1", "fib=1", "fib:10=0"]:
+        with pytest.raises(ValueError):
+            RequestMix(bad)
+
+
+def test_replay_rebuilds_logged_requests():
+    assert log_path("pow", "2,8") == "/api/math/pow?base=2&exp=8"
+    assert log_path("fib", "10 mod 7") == "/api/math/fib?n=10&mod=7"
+    assert log_path("pow", "0.5,2") is None
+    mix = ReplayMix([("fib", "10"), ("fib", "10"), ("factorial", "5"), ("x", "1")])
+    assert dict(zip(mix.paths, mix.weights)) == {
+        "/api/math/fib?n=10": 2,
+        "/api/math/factorial?n=5": 1,
+    }
+    with pytest.raises(ValueError):
+        ReplayMix([("pow", "bad")])
+
+
+def test_summary_percentiles():
+    assert percentile([1, 2, 3, 4], 50) == 2
+    assert percentile([1, 2, 3, 4], 99) == 4
+    stats = summarize([(0.001, 200), (0.002, 200), (0.010, 500), (0.003, 0)], 2.0)
+    assert stats["requests"] == 4 and stats["errors"] == 2
+    assert stats["throughput"] == 2.0
+    assert stats["max_ms"] == pytest.approx(10.0)
+    assert stats["statuses"] == {"0": 1, "200": 2, "500": 1}
+
+
+def test_closed_loop_run(server):
+    paths = iter(["/api/math/fib?n=13"] + ["/api/math/fib?n=1"] * 10_000)
+    windows = []
+    test = LoadTest(
+        server, lambda: next(paths), "tok", duration=0.3, concurrency=2, interval=0.1
+    )
+    summary = test.run(report=windows.append)
+    assert summary["requests"] > 10
+    assert summary["errors"] == 1 and summary["statuses"]["500"] == 1
+    assert windows and all("p99_ms" in w for w in windows)
+    assert _Handler.seen[0][1] == "Bearer tok"
+
+
+def test_open_loop_run_hits_target_rate(server):
+    test = LoadTest(
+        server, lambda: "/api/math/fib?n=1", "tok", duration=0.5, concurrency=2, rate=40
+    )
+    summary = test.run()
+    assert 15 <= summary["requests"] <= 25
+
+
+def test_connection_errors_count_as_status_zero():
+    test = LoadTest(
+        "http://127.0.0.1:9", lambda: "/", "tok", duration=0.1, concurrency=1
+    )
+    summary = test.run()
+    assert summary["requests"] > 0 and summary["statuses"].keys() == {"0"}
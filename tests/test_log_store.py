@@ -0,0 +1,110 @@
+import math
+import pytest
+from datetime import datetime
+from datetime import timedelta
+from flask import Flask
+from sqlalchemy import inspect
+from sqlalchemy import text
+from src.algorithms.formatting import summarize
+from src.database import db
+from src.log_store import purge_expired
+from src.log_store import query_stats
+from src.log_store import upgrade_schema
+from src.log_store import log_row
+from src.log_store import write_logs
+from src.models import RequestLog
+from src.models import RequestRollup
+
+NOW = datetime(2024, 5, 1, 12, 30)
+
+
+@pytest.fixture
+def app(tmp_path):
+    app = Flask(__name__)
+    app.config["SQLALCHEMY_DATABASE_URI"] = f"sqlite:///{tmp_path / 'logs.db'}"
+    db.init_app(app)
+    with app.app_context():
+        yield app
+
+
+def _row(endpoint, inp, result, ts=NOW):
+    return log_row(endpoint, inp, result, ts)
+
+
+def test_rows_hold_a_fixed_size_fingerprint():
+    row = _row("factorial", "5000", math.factorial(5000))
+    assert "result" not in row
+    assert len(row["result_digest"]) == 64
+    assert row["result_bits"] == math.factorial(5000).bit_length()
+
+
+def test_rows_are_fingerprinted_and_rolled_up(app):
+    db.create_all()
+    write_logs([_row("fib", "10", 55), _row("fib", "10", 55)])
+    write_logs([_row("factorial", "20", 2432902008176640000), _row("fib", "90", 2**62)])
+
+    log = db.session.execute(db.select(RequestLog)).scalars().first()
+    assert log.result_digest == summarize(55)["sha256"]
+    assert log.result_bits == 6
+
+    stats = query_stats(NOW - timedelta(hours=1), None, 10)
+    assert stats["endpoints"] == [
+        {"endpoint": "factorial", "count": 1, "total_bits": 62},
+        {"endpoint": "fib", "count": 3, "total_bits": 6 + 6 + 63},
+    ]
+    assert stats["timeline"] == [{"bucket": datetime(2024, 5, 1, 12), "count": 4}]
+    assert {"endpoint": "fib", "bits_below": 8, "count": 2} in stats["result_sizes"]
+    assert stats["hot_inputs"][0] == {"endpoint": "fib", "input": "10", "count": 2}
+
+    only_fact = query_stats(NOW - timedelta(hours=1), "factorial", 1)
+    assert [h["input"] for h in only_fact["hot_inputs"]] == ["20"]
+    # Buckets before the window are excluded
+    assert query_stats(NOW + timedelta(hours=2), None, 10)["endpoints"] == []
+
+
+def test_purge_respects_retention(app):
+    db.create_all()
+    write_logs([_row("fib", "1", 1, NOW - timedelta(days=30)), _row("fib", "2", 1)])
+    deleted = purge_expired(NOW)
+    assert deleted["request_logs"] == 1
+    assert deleted["request_rollups"] == 0  # still within STATS_RETENTION_DAYS
+    assert db.session.query(RequestLog).count() == 1
+    assert purge_expired(NOW + timedelta(days=365))["request_rollups"] == 2
+
+
+def test_legacy_table_is_upgraded(app):
+    with db.engine.begin() as conn:
+        conn.execute(
+            text(
+                "CREATE TABLE request_logs (id INTEGER PRIMARY KEY, "
+                "endpoint VARCHAR(50) NOT NULL, input_value VARCHAR(100) NOT NULL, "
+                "result VARCHAR(100) NOT NULL, timestamp DATETIME)"
+            )
+        )
+        conn.execute(
+            text(
+                "INSERT INTO request_logs (endpoint, input_value, result, timestamp) "
+                "VALUES ('fib', '10', '55', '2024-05-01 12:00:00.000000'), "
+                "('pow', '5,-2', '0.04', NULL)"
+            )
+        )
+    upgrade_schema()
+    upgrade_schema()  # idempotent
+    db.create_all()
+
+    inspector = inspect(db.engine)
+    assert "request_logs_legacy" not in inspector.get_table_names()
+    assert "result" not in {c["name"] for c in inspector.get_columns("request_logs")}
+    assert {i["name"] for i in inspector.get_indexes("request_logs")} >= {
+        "ix_request_logs_endpoint_timestamp"
+    }
+    logs = db.session.execute(db.select(RequestLog).order_by(RequestLog.id)).scalars()
+    assert [(log.result_bits, log.result_digest[:8]) for log in logs] == [
+        (6, summarize(55)["sha256"][:8]),
+        (0, "a888fe9e"),
+    ]
+    assert db.session.query(RequestRollup).count() == 2
+
+
+def test_sqlite_runs_in_wal_mode(app):
+    assert db.session.execute(text("PRAGMA journal_mode")).scalar() == "wal"
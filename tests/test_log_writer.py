@@ -0,0 +1,75 @@
+import threading
+import pytest
+from src.utils.log_writer import BatchLogWriter
+
+
+class _ListSink:
+    def __init__(self, gate=None):
+        self.batches = []
+        self.gate = gate
+
+    def __call__(self, rows):
+        if self.gate is not None:
+            self.gate.wait()
+        self.batches.append(list(rows))
+
+
+def test_rows_are_group_committed_by_count():
+    sink = _ListSink()
+    writer = BatchLogWriter(sink, batch_size=5, flush_interval=0.5)
+    for i in range(10):
+        writer.submit({"i": i})
+    assert writer.flush(timeout=5)
+    writer.close()
+    assert [row["i"] for batch in sink.batches for row in batch] == list(range(10))
+    assert len(sink.batches) <= 4
+    assert writer.written == 10
+
+
+def test_partial_batch_flushes_after_interval():
+    sink = _ListSink()
+    writer = BatchLogWriter(sink, batch_size=100, flush_interval=0.05)
+    writer.submit({"i": 1})
+    assert writer.flush(timeout=5)
+    assert sink.batches == [[{"i": 1}]]
+    writer.close()
+
+
+def test_close_drains_queue():
+    gate = threading.Event()
+    sink = _ListSink(gate)
+    writer = BatchLogWriter(sink, batch_size=2, flush_interval=0.01)
+    for i in range(6):
+        writer.submit({"i": i})
+    gate.set()
+    writer.close()
+    assert sum(len(b) for b in sink.batches) == 6
+
+
+@pytest.mark.parametrize("policy", ["block", "drop_oldest", "sample"])
+def test_overflow_policies_drop_instead_of_growing(policy):
+    gate = threading.Event()
+    sink = _ListSink(gate)
+    writer = BatchLogWriter(
+        sink,
+        max_queue=4,
+        batch_size=1,
+        flush_interval=0.01,
+        overflow=policy,
+        sample_rate=0.0,
+        block_timeout=0.01,
+    )
+    for i in range(20):
+        writer.submit({"i": i})
+    assert writer.dropped > 0
+    gate.set()
+    writer.close()
+    written = [row["i"] for batch in sink.batches for row in batch]
+    assert len(written) + writer.dropped == 20
+    if policy == "drop_oldest":
+        assert written[-1] == 19
+
+
+def test_invalid_overflow_policy():
+    with pytest.raises(ValueError):
+        BatchLogWriter(lambda rows: None, overflow="explode")
@@ -1,3 +1,4 @@
+import json
 import pytest
 import logging
 from src.app import create_app
@@ -54,3 +55,223 @@ def test_fact_success(client):
     ), f"Expected 200, got {rv.status_code} (body: {rv.data})"
     assert rv.get_json() == {"result": 720}
     test_logger.info("✅ Factorial endpoint returned correct result (6! = 720)")
+
+
+def test_batch_success(client):
+    test_logger.info("Testing endpoint: POST /api/math/batch")
+    rv = client.post(
+        "/api/math/batch",
+        json={
+            "items": [
+                {"op": "factorial", "args": {"n": 6}},
+                {"op": "fib", "args": {"n": 7}},
+                {"op": "pow", "args": {"base": 2, "exp": 8}},
+                {"op": "factorial", "args": {"n": 3}},
+                {"op": "fib", "args": {"n": "x"}},
+                {"op": "fib", "args": {"n": 7}},
+            ]
+        },
+    )
+    assert (
+        rv.status_code == 200
+    ), f"Expected 200, got {rv.status_code} (body: {rv.data})"
+    assert rv.get_json() == {
+        "results": [
+            {"result": 720},
+            {"result": 13},
+            {"result": 256},
+            {"result": 6},
+            {"error": "Missing or invalid 'n'"},
+            {"result": 13},
+        ]
+    }
+    test_logger.info("✅ Batch endpoint returned results in request order")
+
+
+def test_batch_rejects_unknown_op(client):
+    rv = client.post("/api/math/batch", json={"items": [{"op": "sqrt", "args": {}}]})
+    assert rv.status_code == 400
+
+
+def test_batch_limit_applies_per_item(client, monkeypatch):
+    from src import services
+
+    monkeypatch.setattr(services.compute_pool, "max_bits", 1000)
+    items = [{"op": "fib", "args": {"n": n}} for n in (1200, 1300, 1500)]
+    rv = client.post("/api/math/batch", json={"items": items})
+    assert rv.status_code == 200
+    results = rv.get_json()["results"]
+    assert [r["result"] for r in results[:2]] == [
+        services.fibonacci_many([1200])[1200],
+        services.fibonacci_many([1300])[1300],
+    ]
+    assert "error" in results[2]  # over the limit on its own
+
+
+def test_fib_range_streams_ndjson(client):
+    rv = client.get("/api/math/fib/range?start=5&end=10")
+    assert rv.status_code == 200
+    assert rv.mimetype == "application/x-ndjson"
+    lines = [json.loads(line) for line in rv.data.decode().splitlines()]
+    assert lines == [
+        {"n": 5, "result": 5},
+        {"n": 6, "result": 8},
+        {"n": 7, "result": 13},
+        {"n": 8, "result": 21},
+        {"n": 9, "result": 34},
+        {"n": 10, "result": 55},
+    ]
+
+
+def test_factorial_range_streams_ndjson(client):
+    rv = client.get("/api/math/factorial/range?start=0&end=5")
+    assert rv.status_code == 200
+    lines = [json.loads(line) for line in rv.data.decode().splitlines()]
+    assert [line["result"] for line in lines] == [1, 1, 2, 6, 24, 120]
+
+
+@pytest.mark.parametrize("query", ["start=5&end=4", "start=0&end=100000", "end=3"])
+def test_range_rejects_invalid_bounds(client, query):
+    rv = client.get(f"/api/math/fib/range?{query}")
+    assert rv.status_code == 400
+
+
+def test_range_is_priced_on_every_term(client, monkeypatch):
+    from src import services
+
+    # F(1000) alone is ~694 bits; the 1001 terms up to it are ~347k
+    monkeypatch.setattr(services.compute_pool, "max_bits", 10_000)
+    rv = client.get("/api/math/fib/range?start=0&end=1000")
+    assert rv.status_code == 413
+    assert client.get("/api/math/fib/range?start=990&end=1000").status_code == 200
+
+
+def test_pow_too_expensive_is_rejected(client):
+    rv = client.get("/api/math/pow?base=10&exp=100000000")
+    assert rv.status_code == 413
+    body = rv.get_json()
+    assert body["estimated_bits"] > body["limit_bits"]
+
+
+@pytest.mark.parametrize(
+    "url,expected",
+    [
+        ("/api/math/pow?base=2&exp=10&mod=1000", 24),
+        ("/api/math/pow?base=3&exp=-1&mod=7", 5),
+        ("/api/math/fib?n=100&mod=1000000007", 354224848179261915075 % 1000000007),
+        ("/api/math/factorial?n=20&mod=1000", 0),
+        ("/api/math/factorial?n=10&mod=1000003", 3628800 % 1000003),
+    ],
+)
+def test_mod_parameter(client, url, expected):
+    rv = client.get(url)
+    assert rv.status_code == 200, rv.data
+    assert rv.get_json() == {"result": expected}
+
+
+def test_factorial_mod_never_trusts_a_pseudoprime(client):
+    m = 3317044064679887385961981  # composite, passes the Miller-Rabin bases
+    assert client.get(f"/api/math/factorial?n={m - 2}&mod={m}").status_code == 413
+
+
+@pytest.mark.parametrize(
+    "url",
+    [
+        "/api/math/pow?base=2&exp=-1",
+        "/api/math/pow?base=2&exp=-1&mod=4",
+        "/api/math/fib?n=5&mod=0",
+    ],
+)
+def test_invalid_mod_requests(client, url):
+    assert client.get(url).status_code == 400
+
+
+def test_factorial_past_digit_limit_is_streamed(client):
+    # 3000! has 9131 digits, well past CPython's default int/str limit
+    rv = client.get("/api/math/factorial?n=3000")
+    assert rv.status_code == 200
+    body = rv.data.decode()
+    assert body.startswith('{"result": 41493596034378540855568670930866')
+    assert body.endswith("0}")
+    assert len(body) == len('{"result": }') + 9131
+
+
+@pytest.mark.parametrize(
+    "fmt,expected",
+    [
+        ("hex", {"result": "0x100", "format": "hex"}),
+        ("base64-bytes", {"result": "AQA=", "format": "base64-bytes"}),
+    ],
+)
+def test_alternative_formats(client, fmt, expected):
+    rv = client.get(f"/api/math/pow?base=2&exp=8&format={fmt}")
+    assert rv.status_code == 200
+    assert rv.get_json() == expected
+
+
+def test_summary_format(client):
+    rv = client.get("/api/math/fib?n=100000&format=summary")
+    assert rv.status_code == 200
+    body = rv.get_json()
+    assert body["format"] == "summary"
+    assert body["digits"] == 20899
+    assert body["bit_length"] == 69424
+    assert body["leading_digits"] == "25974069347221724166"
+
+
+def test_invalid_format(client):
+    assert client.get("/api/math/fib?n=10&format=roman").status_code == 400
+
+
+def test_huge_decimal_result_is_chunked(client):
+    # 20000! is ~260k bits, above STREAM_RESULT_MIN_BITS
+    rv = client.get("/api/math/factorial?n=20000")
+    assert rv.status_code == 200
+    assert rv.is_streamed
+    body = rv.data.decode()
+    assert body.startswith('{"result": 18192063202303451348')
+    assert len(body) == len('{"result": }') + 77338
+
+
+def test_results_served_from_table(client, tmp_path, monkeypatch):
+    from src import services
+    from src.utils.tables import build_table
+    from src.utils.tables import load_table
+
+    build_table(str(tmp_path / "t.bin"), 50, 50)
+    table = load_table(str(tmp_path / "t.bin"), 50, 50)
+    monkeypatch.setattr(services, "tables", table)
+    # The table answers before cache or compute are consulted
+    monkeypatch.setattr(services, "_cached_compute", None)
+    assert client.get("/api/math/fib?n=50").get_json() == {"result": 12586269025}
+    assert client.get("/api/math/factorial?n=20&mod=1000").get_json() == {"result": 0}
+    table.close()
+
+
+def test_stats_endpoint(client):
+    rv = client.get("/api/math/stats?hours=48&top=5")
+    assert rv.status_code == 200
+    body = rv.get_json()
+    assert set(body) == {
+        "since",
+        "bucket_seconds",
+        "endpoints",
+        "timeline",
+        "result_sizes",
+        "hot_inputs",
+    }
+    assert len(body["hot_inputs"]) <= 5
+
+
+@pytest.mark.parametrize("query", ["endpoint=sqrt", "hours=0", "top=1000"])
+def test_stats_invalid_params(client, query):
+    assert client.get(f"/api/math/stats?{query}").status_code == 400
+
+
+def test_stage_metrics_exposed(client):
+    client.get("/api/math/fib?n=12")
+    client.get("/api/math/fib?n=12")
+    body = client.get("/metrics").data.decode()
+    assert 'math_stage_seconds_count{op="",stage="jwt"}' in body
+    assert 'math_cache_lookups_total{op="fib",result="hit"}' in body
+    assert 'math_result_bits_bucket{le="16.0",op="fib"}' in body
@@ -0,0 +1,52 @@
+import math
+import pytest
+from src.algorithms.fibonacci import fibonacci
+from src.algorithms.modular import fact_mod
+from src.algorithms.modular import fact_mod_steps
+from src.algorithms.modular import fib_mod
+from src.algorithms.modular import is_probable_prime
+from src.algorithms.modular import pisano_period
+from src.algorithms.modular import pow_mod
+
+MODULI = [1, 2, 10, 97, 1000, 10007, 10**9 + 7, 2**61 - 1, 10**12]
+
+
+@pytest.mark.parametrize("mod", MODULI)
+def test_fib_mod_matches_full_value(mod):
+    for n in list(range(50)) + [999, 2500]:
+        assert fib_mod(n, mod) == fibonacci(n) % mod
+
+
+@pytest.mark.parametrize("mod", MODULI)
+def test_fact_mod_matches_full_value(mod):
+    for n in list(range(30)) + [500, 1500]:
+        assert fact_mod(n, mod) == math.factorial(n) % mod
+
+
+@pytest.mark.parametrize("p", [101, 997, 10007])
+def test_fact_mod_near_prime_uses_wilson(p):
+    for n in range(p - 6, p + 2):
+        assert fact_mod(n, p) == math.factorial(n) % p
+
+
+def test_wilson_is_skipped_where_primality_is_not_certain():
+    # Composite, but a strong pseudoprime to every Miller-Rabin base used
+    m = 3317044064679887385961981
+    assert is_probable_prime(m)
+    assert fact_mod_steps(m - 2, m) == m - 2  # not the 1-step Wilson path
+    assert fact_mod_steps(10**9 + 5, 10**9 + 7) == 1
+
+
+def test_pow_mod_with_negative_exponent():
+    assert pow_mod(3, -1, 7) == 5
+    with pytest.raises(ValueError):
+        pow_mod(2, -1, 4)
+
+
+def test_pisano_period_and_primality():
+    assert pisano_period(2) == 3
+    assert pisano_period(10) == 60
+    assert is_probable_prime(2**61 - 1)
+    assert not is_probable_prime(561)  # Carmichael number
+    # Huge indices reduce through the period
+    assert fib_mod(10**18 + 60, 10) == fib_mod(10**18, 10)
@@ -0,0 +1,121 @@
+import threading
+import time
+import pytest
+from flask_jwt_extended import create_access_token
+from src.algorithms.factorial import factorial
+from src.app import create_app
+from src.config import Config
+from src.utils.compute_pool import ComputePool
+from src.utils.profiling import RequestProfile
+from src.utils.profiling import SamplingProfiler
+from src.utils.profiling import current_profile
+
+
+def _busy(stop):
+    while not stop.is_set():
+        sum(range(1000))
+
+
+def test_sampling_profiler_collapses_other_threads():
+    stop = threading.Event()
+    worker = threading.Thread(target=_busy, args=(stop,), name="busy-worker")
+    worker.start()
+    try:
+        dump = SamplingProfiler(interval=0.001).run(0.05)
+    finally:
+        stop.set()
+        worker.join()
+    lines = [line for line in dump.splitlines() if line.startswith("busy-worker;")]
+    assert lines and all(int(line.rsplit(" ", 1)[1]) > 0 for line in lines)
+    assert any("test_profiling.py:_busy" in line for line in lines)
+    assert "test_sampling_profiler_collapses_other_threads" not in dump
+
+
+def test_request_profile_merges_worker_stats():
+    pool = ComputePool(inline_max_bits=0, max_bits=10**9, workers=1)
+    profile = RequestProfile("pstats")
+    profile.start()
+    assert current_profile() is profile
+    try:
+        assert pool.run(100, factorial, 3000) == factorial(3000)
+    finally:
+        dump = profile.stop()
+        pool.shutdown()
+    assert current_profile() is None
+    # _odd_product only ever runs inside the worker process
+    assert "_odd_product" in dump
+
+
+def test_request_profile_rejects_unknown_format():
+    with pytest.raises(ValueError):
+        RequestProfile("flame")
+
+
+@pytest.fixture
+def profiling_app(monkeypatch):
+    monkeypatch.setattr(Config, "PROFILING_ENABLED", True)
+    monkeypatch.setattr(Config, "ADMIN_USERS", ["root"])
+    app = create_app()
+    app.config["TESTING"] = True
+    with app.app_context():
+        tokens = {
+            name: f"Bearer {create_access_token(identity=name)}"
+            for name in ("root", "alice")
+        }
+    return app.test_client(), tokens
+
+
+def test_header_returns_profile_for_admins(profiling_app):
+    client, tokens = profiling_app
+    headers = {"Authorization": tokens["root"], "X-Profile": "pstats"}
+    rv = client.get("/api/math/fib?n=1000&mod=97", headers=headers)
+    assert rv.status_code == 200
+    assert rv.mimetype == "text/plain"
+    assert rv.headers["X-Profiled-Status"] == "200"
+    assert "function calls" in rv.data.decode()
+    assert "fib_service" in rv.data.decode()
+
+    headers["X-Profile"] = "collapsed"
+    rv = client.get("/api/math/factorial?n=30000&format=summary", headers=headers)
+    assert rv.headers["X-Profile-Format"] == "collapsed"
+
+    headers["X-Profile"] = "flame"
+    assert client.get("/api/math/fib?n=10", headers=headers).status_code == 400
+
+
+def test_profiling_requires_admin(profiling_app):
+    client, tokens = profiling_app
+    headers = {"Authorization": tokens["alice"], "X-Profile": "pstats"}
+    assert client.get("/api/math/fib?n=10", headers=headers).status_code == 403
+    rv = client.post("/api/admin/profile/sample?seconds=0.01", headers=headers)
+    assert rv.status_code == 403
+    # Without the header, normal users are unaffected
+    rv = client.get("/api/math/fib?n=10", headers={"Authorization": tokens["alice"]})
+    assert rv.get_json() == {"result": 55}
+
+
+def test_sample_endpoint(profiling_app):
+    client, tokens = profiling_app
+    headers = {"Authorization": tokens["root"]}
+    start = time.monotonic()
+    rv = client.post("/api/admin/profile/sample?seconds=0.05", headers=headers)
+    assert rv.status_code == 200 and time.monotonic() - start >= 0.05
+    assert rv.mimetype == "text/plain"
+    assert (
+        client.post(
+            "/api/admin/profile/sample?seconds=1000", headers=headers
+        ).status_code
+        == 400
+    )
+
+
+def test_disabled_by_default():
+    app = create_app()
+    with app.app_context():
+        token = create_access_token(identity="root")
+    client = app.test_client()
+    headers = {"Authorization": f"Bearer {token}", "X-Profile": "pstats"}
+    assert client.get("/api/math/fib?n=10", headers=headers).get_json() == {
+        "result": 55
+    }
+    assert client.post("/api/admin/profile/sample", headers=headers).status_code == 404
@@ -0,0 +1,156 @@
+import gc
+import math
+import pytest
+from datetime import datetime
+from flask import Flask
+from src import serving
+from src import services
+from src.config import Config
+from src.database import db
+from src.algorithms.fibonacci import fibonacci_many
+from src.log_store import log_row
+from src.log_store import write_logs
+from src.utils.cache import LRUCache
+from src.utils.cache import TieredCache
+
+
+class _DictRedis:
+    """In-process stand-in for RedisCache with batch operations."""
+
+    def __init__(self):
+        self.data = {}
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def set(self, key, value, ex=None):
+        self.data[key] = value
+
+    def get_many(self, keys):
+        return [self.data.get(k) for k in keys]
+
+    def set_many(self, items):
+        for key, value, _ in items:
+            self.data[key] = value
+
+
+@pytest.fixture
+def cache(monkeypatch):
+    cache = TieredCache(LRUCache(max_bytes=10**8), _DictRedis())
+    monkeypatch.setattr(services, "cache", cache)
+    monkeypatch.setattr(services, "tables", None)
+    return cache
+
+
+@pytest.fixture
+def app(tmp_path):
+    app = Flask(__name__)
+    app.config["SQLALCHEMY_DATABASE_URI"] = f"sqlite:///{tmp_path / 'logs.db'}"
+    db.init_app(app)
+    with app.app_context():
+        db.create_all()
+    return app
+
+
+class _Worker:
+    pid = 1234
+    alive = True
+
+
+def test_parse_input_accepts_plain_requests_only():
+    assert serving.parse_input("fib", "10") == ("fib", (10,))
+    assert serving.parse_input("factorial", "5") == ("factorial", (5,))
+    assert serving.parse_input("pow", "2,10") == ("pow", (2, 10))
+    assert serving.parse_input("pow", "5,-2") is None
+    assert serving.parse_input("fib", "10 mod 7") is None
+    assert serving.parse_input("fib", "0.04") is None
+    assert serving.parse_input("stats", "1") is None
+
+
+def test_warm_cache_fills_l1_within_budget(cache):
+    cache.l2.set("fib:50", cache.codec.encode(1))
+    items = [("fib", (50,)), ("factorial", (20,)), ("pow", (3, 5)), ("fib", (10**6,))]
+    # Budget covers the small misses but not F(10^6) (~694k bits)
+    assert services.warm_cache(items, max_bits=10_000) == 3
+    assert cache.l1.get("fib:50") == 1  # cached value, not recomputed
+    assert cache.l1.get("fact:20") == math.factorial(20)
+    assert cache.l1.get("pow:3:5") == 243
+    assert cache.l1.get("fib:1000000") is None
+
+
+def test_warm_cache_skips_results_too_big_for_l1(cache, monkeypatch):
+    cache.l1.max_item_bytes = 1024
+    calls = []
+    monkeypatch.setattr(
+        services, "fibonacci_many", lambda ns: calls.extend(ns) or fibonacci_many(ns)
+    )
+    items = [("fib", (100,)), ("fib", (20_000,))]  # F(20000) is ~13.9k bits
+    assert services.warm_cache(items, max_bits=10**9) == 1
+    assert calls == [100]
+    assert cache.l1.get("fib:100") is not None
+
+
+def test_warm_primes_hot_inputs_and_freezes_heap(app, cache, monkeypatch):
+    with app.app_context():
+        now = datetime.utcnow()
+        write_logs(
+            [
+                log_row(e, i, 1, now)
+                for e, i in [
+                    ("fib", "30"),
+                    ("fib", "30"),
+                    ("pow", "2,9"),
+                    ("fib", "4 mod 3"),
+                ]
+            ]
+        )
+    monkeypatch.setattr(Config, "WARM_TOP", 10)
+    try:
+        summary = serving.warm(app)
+        assert gc.get_freeze_count() > 0
+    finally:
+        gc.unfreeze()
+    assert summary == {"table": False, "hot_inputs": 2, "warmed": 2}
+    assert cache.l1.get("fib:30") == 832040
+    assert cache.l1.get("pow:2:9") == 512
+
+
+def test_post_request_recycles_large_workers(monkeypatch):
+    worker = _Worker()
+    monkeypatch.setattr(Config, "SERVE_MAX_RSS_MB", 100)
+    monkeypatch.setattr(serving, "rss_bytes", lambda: 50 * 1024 * 1024)
+    serving.post_request(worker, None, {}, None)
+    assert worker.alive
+    monkeypatch.setattr(serving, "rss_bytes", lambda: 150 * 1024 * 1024)
+    serving.post_request(worker, None, {}, None)
+    assert not worker.alive
+    # A limit of 0 disables the check
+    worker.alive = True
+    monkeypatch.setattr(Config, "SERVE_MAX_RSS_MB", 0)
+    serving.post_request(worker, None, {}, None)
+    assert worker.alive
+
+
+def test_rss_is_measured():
+    assert serving.rss_bytes() > 0
+
+
+def test_worker_exit_drains_buffers(monkeypatch):
+    calls = []
+
+    class _Closer:
+        def __init__(self, name):
+            self.name = name
+
+        def close(self, timeout=None):
+            calls.append((self.name, timeout))
+
+        def shutdown(self):
+            calls.append((self.name, None))
+
+    monkeypatch.setattr(services, "_log_writer", _Closer("log_writer"))
+    monkeypatch.setattr(services, "kafka", _Closer("kafka"))
+    monkeypatch.setattr(services, "compute_pool", _Closer("compute_pool"))
+    monkeypatch.setattr(Config, "SERVE_DRAIN_TIMEOUT", 3.0)
+    serving.worker_exit(None, _Worker())
+    assert calls == [("log_writer", 3.0), ("kafka", 3.0), ("compute_pool", None)]
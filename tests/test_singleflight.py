@@ -0,0 +1,109 @@
+import threading
+import time
+from src.utils.cache import LRUCache
+from src.utils.cache import TieredCache
+from src.utils.singleflight import SingleFlight
+
+
+class _LeaseRedis:
+    """In-process stand-in for RedisCache with lease support."""
+
+    def __init__(self):
+        self.data = {}
+        self.leases = {}
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def set(self, key, value, ex=None):
+        self.data[key] = value
+
+    def acquire_lease(self, key, token, ttl_ms):
+        if key in self.leases:
+            return False
+        self.leases[key] = token
+        return True
+
+    def release_lease(self, key, token):
+        if self.leases.get(key) == token:
+            del self.leases[key]
+
+
+def _make(l2=None, **kwargs):
+    cache = TieredCache(LRUCache(max_bytes=10_000), l2 or _LeaseRedis())
+    return cache, SingleFlight(cache, poll_interval=0.01, **kwargs)
+
+
+def test_concurrent_callers_share_one_computation():
+    cache, sf = _make()
+    calls = []
+    started = threading.Event()
+    release = threading.Event()
+
+    def compute():
+        calls.append(1)
+        started.set()
+        release.wait()
+        return 42
+
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(sf.do("k", 1, compute)))
+        for _ in range(5)
+    ]
+    threads[0].start()
+    started.wait()
+    for t in threads[1:]:
+        t.start()
+    time.sleep(0.05)
+    release.set()
+    for t in threads:
+        t.join()
+    assert results == [42] * 5
+    assert len(calls) == 1
+
+
+def test_errors_propagate_to_waiters_and_are_not_cached():
+    cache, sf = _make()
+
+    def boom():
+        raise RuntimeError("nope")
+
+    for _ in range(2):
+        try:
+            sf.do("k", 1, boom)
+        except RuntimeError:
+            pass
+    assert sf._calls == {}
+
+
+def test_other_worker_waits_for_leased_value():
+    l2 = _LeaseRedis()
+    cache, sf = _make(l2, lease_min_bits=0)
+    l2.leases["fact:9"] = "other-worker"
+
+    def publish():
+        time.sleep(0.05)
+        l2.data["fact:9"] = cache.codec.encode(362880)
+        del l2.leases["fact:9"]
+
+    threading.Thread(target=publish).start()
+    assert sf.do("fact:9", 10, lambda: 1 / 0) == 362880
+
+
+def test_freed_lease_without_value_falls_back_to_computing():
+    l2 = _LeaseRedis()
+    cache, sf = _make(l2, lease_min_bits=0)
+    l2.leases["fib:5"] = "crashed-worker"
+    threading.Timer(0.03, lambda: l2.leases.pop("fib:5")).start()
+    assert sf.do("fib:5", 10, lambda: 5) == 5
+    assert "fib:5" not in l2.leases
+
+
+def test_wait_timeout_falls_back_to_computing():
+    l2 = _LeaseRedis()
+    cache, sf = _make(l2, lease_min_bits=0, wait_timeout=0.05)
+    l2.leases["fib:6"] = "slow-worker"
+    assert sf.do("fib:6", 10, lambda: 8) == 8
+    # The other worker's lease is left alone
+    assert l2.leases["fib:6"] == "slow-worker"
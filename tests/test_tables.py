@@ -0,0 +1,84 @@
+import math
+import pytest
+from src.algorithms.fibonacci import fib_pair
+from src.utils.tables import ResultTable
+from src.utils.tables import TableError
+from src.utils.tables import build_table
+from src.utils.tables import load_table
+
+
+@pytest.fixture
+def table_path(tmp_path):
+    path = str(tmp_path / "tables.bin")
+    build_table(path, 300, 200)
+    return path
+
+
+def test_values_round_trip(table_path):
+    table = ResultTable(table_path)
+    assert [table.fib(n) for n in range(301)] == [fib_pair(n)[0] for n in range(301)]
+    assert [table.factorial(n) for n in range(201)] == [
+        math.factorial(n) for n in range(201)
+    ]
+    assert table.fib(301) is None and table.factorial(-1) is None
+    table.close()
+
+
+def test_rebuild_replaces_atomically(table_path):
+    old = ResultTable(table_path)
+    build_table(table_path, 10, 10)
+    # The old mapping stays valid while the new file covers less
+    assert old.fib(300) == fib_pair(300)[0]
+    assert ResultTable(table_path).fib(11) is None
+    old.close()
+
+
+def test_corrupt_table_is_rejected(table_path):
+    with open(table_path, "r+b") as f:
+        f.seek(-1, 2)
+        last = f.read(1)
+        f.seek(-1, 2)
+        f.write(bytes([last[0] ^ 0xFF]))
+    with pytest.raises(TableError, match="checksum"):
+        ResultTable(table_path)
+    assert load_table(table_path, 300, 200) is None
+    # Skipping verification trusts the contents
+    assert ResultTable(table_path, verify=False).fib(10) == 55
+
+
+@pytest.mark.parametrize(
+    "mangle,message",
+    [
+        (lambda data: data[:10], "truncated header"),
+        (lambda data: b"XXXX" + data[4:], "not a result table"),
+        (lambda data: data[:4] + b"\x09\x00" + data[6:], "format version"),
+        (lambda data: data[:-5], "size does not match"),
+    ],
+)
+def test_malformed_tables_are_rejected(table_path, mangle, message):
+    with open(table_path, "rb") as f:
+        data = f.read()
+    with open(table_path, "wb") as f:
+        f.write(mangle(data))
+    with pytest.raises(TableError, match=message):
+        ResultTable(table_path)
+
+
+def test_stale_or_missing_table_is_ignored(table_path, tmp_path):
+    assert load_table(table_path, 300, 200) is not None
+    assert load_table(table_path, 1000, 200) is None
+    assert load_table(str(tmp_path / "missing.bin"), 10, 10) is None
+
+
+def test_service_table_loads_on_first_use(table_path, monkeypatch):
+    from src import services
+    from src.config import Config
+
+    monkeypatch.setattr(Config, "TABLE_PATH", table_path)
+    monkeypatch.setattr(Config, "TABLE_FIB_MAX", 300)
+    monkeypatch.setattr(Config, "TABLE_FACT_MAX", 200)
+    monkeypatch.setattr(services, "tables", services._UNLOADED)
+    table = services.get_tables()
+    assert isinstance(table, ResultTable) and services.get_tables() is table
+    assert services.table_lookup("fib", (300,), 7) == fib_pair(300)[0] % 7
+    table.close()